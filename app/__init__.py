@@ -1,7 +1,12 @@
+import os
+
 from flask import Flask
+from app.api_clients.http_transport import HTTPTransport
+from app.api_clients.response_cache import ResponseCache
 from app.extensions import db
 from app.config import Config
 from app.routes import main as main_blueprint
+from app.sqlite_profile import SQLiteProfile
 
 
 def create_app(config_class=Config):
@@ -11,6 +16,30 @@ def create_app(config_class=Config):
     # Initialize extensions
     db.init_app(app)
 
+    SQLiteProfile.configure(
+        JOURNAL_MODE=app.config["SQLITE_JOURNAL_MODE"],
+        SYNCHRONOUS=app.config["SQLITE_SYNCHRONOUS"],
+        MMAP_SIZE=app.config["SQLITE_MMAP_SIZE"],
+        CACHE_SIZE=app.config["SQLITE_CACHE_SIZE"],
+        TEMP_STORE=app.config["SQLITE_TEMP_STORE"],
+        BUSY_TIMEOUT=app.config["SQLITE_BUSY_TIMEOUT"],
+    )
+
+    with app.app_context():
+        SQLiteProfile.register(db.engine)
+
+    HTTPTransport.configure(
+        CONNECT_TIMEOUT=app.config["HTTP_CONNECT_TIMEOUT"],
+        READ_TIMEOUT=app.config["HTTP_READ_TIMEOUT"],
+        MAX_RETRIES=app.config["HTTP_MAX_RETRIES"],
+        BACKOFF_BASE=app.config["HTTP_BACKOFF_BASE"],
+    )
+    ResponseCache.configure(
+        ENABLED=app.config["HTTP_CACHE_ENABLED"],
+        DIRECTORY=app.config["HTTP_CACHE_DIR"] or os.path.join(app.instance_path, "http_cache"),
+        CURRENT_TTL=app.config["HTTP_CACHE_CURRENT_TTL"],
+    )
+
     # Register blueprints
     app.register_blueprint(main_blueprint)
 
@@ -0,0 +1,96 @@
+# fetch_scheduler.py
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+class FetchScheduler:
+    """
+    Class for running blocking API fetches concurrently on a bounded thread pool, while keeping the
+    rate of requests started under a limit.
+
+    Methods:
+        run
+        _throttled
+        _throttle
+    """
+
+    def __init__(self, max_workers: int = 8, requests_per_second: float = 4.0):
+        """
+        Args:
+            max_workers (int) - max number of requests in flight at once
+            requests_per_second (float) - max number of requests started per second; 0 for no limit
+        """
+        self.max_workers = max_workers
+        self.interval = 1 / requests_per_second if requests_per_second else 0
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    def run(self, fetch, jobs: list[tuple], streamed: bool = False):
+        """
+        Runs fetch(*job) for every job and yields the results in completion order, so callers can
+        process responses while the remaining requests are still in flight.
+
+        Args:
+            fetch (callable) - blocking function sending a request
+            jobs (list[tuple]) - positional arguments of each fetch call
+            streamed (bool) - whether results are responses still being read, e.g. streamed bodies. Then
+                a request slot is only freed once the caller moves on to the next result, so at most
+                max_workers responses are open at once
+
+        Yields:
+            (tuple) - (job, result of fetch(*job))
+
+        Raises:
+            Exception - whatever a fetch raised, once its result is reached; the remaining jobs are cancelled
+        """
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        cancelled = threading.Event()
+        slots = threading.Semaphore(self.max_workers) if streamed else None
+
+        try:
+            futures = {
+                executor.submit(self._throttled, fetch, job, cancelled, slots): job for job in jobs
+            }
+
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result()
+                finally:
+                    if slots is not None:
+                        slots.release()
+        finally:
+            # If a fetch or the caller raised, or the caller stopped early, pending jobs are dropped
+            # instead of waited for
+            cancelled.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+            # Wake the workers waiting for a slot, so they see the run is cancelled
+            if slots is not None:
+                for _ in range(self.max_workers):
+                    slots.release()
+
+    def _throttled(self, fetch, job: tuple, cancelled: threading.Event, slots: threading.Semaphore = None):
+        """Helper method to wait for a free request slot, then fetch unless the run was cancelled meanwhile."""
+        if slots is not None:
+            slots.acquire()
+
+        self._throttle()
+
+        if cancelled.is_set():
+            return None
+
+        return fetch(*job)
+
+    def _throttle(self) -> None:
+        """Helper method to block until the next request is allowed to start."""
+        if not self.interval:
+            return
+
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.interval
+
+        time.sleep(max(0.0, start - now))
@@ -0,0 +1,207 @@
+# http_transport.py
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class HTTPTransport:
+    """
+    Class containing a shared, pooled HTTP session used by every API client. Connections are kept
+    alive between requests, and failed requests are retried with exponential backoff and jitter.
+
+    Retried: connection errors, timeouts, 429 and 5xx responses. A Retry-After header on the response
+    takes precedence over the computed backoff.
+
+    Methods:
+        configure
+        get
+        get_stats
+        _get_session
+        _backoff
+        _retry_after
+        _record
+        _record_retry
+    """
+
+    CONNECT_TIMEOUT = 5.0
+    READ_TIMEOUT = 30.0
+    MAX_RETRIES = 4
+    BACKOFF_BASE = 0.5
+    BACKOFF_MAX = 30.0
+    POOL_SIZE = 16
+
+    RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+    _session = None
+    _lock = threading.Lock()
+    _stats = {}
+
+    @classmethod
+    def configure(cls, **settings) -> None:
+        """
+        Overrides transport settings, e.g. configure(READ_TIMEOUT=60, MAX_RETRIES=2).
+        The session is recreated on the next request so pool settings take effect.
+
+        Args:
+            settings - class attribute names and their new values
+        """
+        for name, value in settings.items():
+            if not hasattr(cls, name):
+                raise AttributeError(f"Unknown HTTPTransport setting {name}")
+
+            setattr(cls, name, value)
+
+        with cls._lock:
+            cls._session = None
+
+    @classmethod
+    def get(
+        cls, url: str, params: dict = None, headers: dict = None, stream: bool = False
+    ) -> requests.Response:
+        """
+        Sends a GET request, retrying transient failures.
+
+        Args:
+            url (str) - request url
+            params (dict) - request params
+            headers (dict) - request headers
+            stream (bool) - return once the headers arrive and leave the body to be streamed
+
+        Returns:
+            (requests.Response) - the last response received, which may still be an error status
+                once retries are exhausted
+
+        Raises:
+            requests.RequestException - if the last attempt failed without a response
+        """
+        host = urlsplit(url).netloc
+
+        for attempt in range(cls.MAX_RETRIES + 1):
+            start = time.perf_counter()
+
+            try:
+                response = cls._get_session().get(
+                    url,
+                    params=params,
+                    headers=headers,
+                    timeout=(cls.CONNECT_TIMEOUT, cls.READ_TIMEOUT),
+                    stream=stream,
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                cls._record(host, time.perf_counter() - start, failed=True)
+
+                if attempt == cls.MAX_RETRIES:
+                    raise
+
+                cls._record_retry(host)
+                time.sleep(cls._backoff(attempt))
+                continue
+
+            cls._record(
+                host,
+                time.perf_counter() - start,
+                failed=response.status_code >= 400,
+            )
+
+            if (
+                response.status_code not in cls.RETRY_STATUS_CODES
+                or attempt == cls.MAX_RETRIES
+            ):
+                return response
+
+            cls._record_retry(host)
+
+            # Release the connection of a streamed response that won't be read
+            response.close()
+
+            retry_after = cls._retry_after(response)
+            time.sleep(retry_after if retry_after is not None else cls._backoff(attempt))
+
+    @classmethod
+    def get_stats(cls) -> dict:
+        """
+        Returns per host request counters.
+
+        Returns:
+            (dict) - host -> requests, failures, retries, total and average latency in seconds
+        """
+        with cls._lock:
+            return {
+                host: {
+                    **host_stats,
+                    "average_latency": host_stats["total_latency"] / host_stats["requests"],
+                }
+                for host, host_stats in cls._stats.items()
+            }
+
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        """Helper method to lazily create the shared keep-alive session."""
+        with cls._lock:
+            if cls._session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=cls.POOL_SIZE, pool_maxsize=cls.POOL_SIZE
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                cls._session = session
+
+            return cls._session
+
+    @classmethod
+    def _backoff(cls, attempt: int) -> float:
+        """Helper method for exponential backoff with full jitter."""
+        return random.uniform(0, min(cls.BACKOFF_MAX, cls.BACKOFF_BASE * 2**attempt))
+
+    @classmethod
+    def _retry_after(cls, response: requests.Response) -> float | None:
+        """
+        Helper method to read a Retry-After header given in seconds or as an HTTP date.
+
+        Returns:
+            (float or None) - seconds to wait, capped at BACKOFF_MAX; None if there is no valid header
+        """
+        retry_after = response.headers.get("Retry-After")
+
+        if retry_after is None:
+            return None
+
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                retry_at = parsedate_to_datetime(retry_after)
+            except (TypeError, ValueError):
+                return None
+
+            if retry_at.tzinfo is None:
+                retry_at = retry_at.replace(tzinfo=timezone.utc)
+
+            seconds = (retry_at - datetime.now(timezone.utc)).total_seconds()
+
+        return min(max(seconds, 0.0), cls.BACKOFF_MAX)
+
+    @classmethod
+    def _record(cls, host: str, latency: float, failed: bool) -> None:
+        """Helper method to update the counters of a host after an attempt."""
+        with cls._lock:
+            host_stats = cls._stats.setdefault(
+                host, {"requests": 0, "failures": 0, "retries": 0, "total_latency": 0.0}
+            )
+            host_stats["requests"] += 1
+            host_stats["failures"] += int(failed)
+            host_stats["total_latency"] += latency
+
+    @classmethod
+    def _record_retry(cls, host: str) -> None:
+        """Helper method to count a retry of a host."""
+        with cls._lock:
+            cls._stats[host]["retries"] += 1
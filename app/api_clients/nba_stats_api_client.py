@@ -1,20 +1,42 @@
 # nba_stats_api_client.py
 
+import json
+from datetime import date, datetime, timedelta
+
 import requests
 
+from app.api_clients.http_transport import HTTPTransport
+from app.api_clients.response_cache import ResponseCache
+from app.api_clients.result_set_parser import ResultSetParser
+
 
 class NBAStatsAPIClient:
     """
     Class containing methods for fetching data from NBA API.
 
+    Responses are cached on disk by ResponseCache. Box scores of completed seasons, or of date ranges
+    that ended more than SETTLED_DAYS ago, never expire; anything else expires after the cache's
+    CURRENT_TTL and is then revalidated with ETag / Last-Modified where the server supports it.
+
     Methods:
         get_players
         get_team_box_scores
         get_player_box_scores
         get_player_tracking_box_scores
+        stream_team_box_scores
+        stream_player_box_scores
         _fetch_data
+        _stream_data
+        _iter_result_set
+        _get_game_logs_params
+        _get_cache_ttl
     """
 
+    # Days after which stat corrections of a game are no longer expected
+    SETTLED_DAYS = 3
+    # Bytes read from the network at a time when streaming a response
+    STREAM_READ_SIZE = 2**16
+
     HEADERS = {
         "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
         "Referer": "https://www.nba.com/",
@@ -43,7 +65,10 @@ class NBAStatsAPIClient:
         }
 
         url = "https://stats.nba.com/stats/playerindex"
-        return cls._fetch_data(url, params, "Error fetching Players Index.")
+        # Rosters change during any season, so the player index always expires
+        return cls._fetch_data(
+            url, params, "Error fetching Players Index.", ttl=ResponseCache.CURRENT_TTL
+        )
 
     @classmethod
     def get_team_box_scores(
@@ -71,23 +96,17 @@ class NBAStatsAPIClient:
         Returns:
             json object containing Team Box Score data, or None in case of error.
         """
-        params = {
-            "MeasureType": measure_type,
-            "Season": season,
-            "SeasonType": season_type,
-            "Period": period,
-            "PORound": playoff_round,
-            "DateFrom": date_from,
-            "DateTo": date_to,
-            "LastNGames": 0,
-            "LeagueID": "00",
-            "Month": 0,
-            "OpponentTeamID": 0,
-            "PerMode": "Totals",
-        }
+        params = cls._get_game_logs_params(
+            measure_type, season, season_type, period, playoff_round, date_from, date_to
+        )
 
         url = "https://stats.nba.com/stats/teamgamelogs"
-        return cls._fetch_data(url, params, "Error fetching Team Box Scores.")
+        return cls._fetch_data(
+            url,
+            params,
+            "Error fetching Team Box Scores.",
+            ttl=cls._get_cache_ttl(season, date_to),
+        )
 
     @classmethod
     def get_player_box_scores(
@@ -115,28 +134,106 @@ class NBAStatsAPIClient:
         Returns:
             json object containing Player Box Score data, or None in case of error.
         """
-        params = {
-            "MeasureType": measure_type,
-            "Season": season,
-            "SeasonType": season_type,
-            "Period": period,
-            "PORound": playoff_round,
-            "DateFrom": date_from,
-            "DateTo": date_to,
-            "LastNGames": 0,
-            "LeagueID": "00",
-            "Month": 0,
-            "OpponentTeamID": 0,
-            "PerMode": "Totals",
-        }
+        params = cls._get_game_logs_params(
+            measure_type, season, season_type, period, playoff_round, date_from, date_to
+        )
         url = "https://stats.nba.com/stats/playergamelogs"
-        data = cls._fetch_data(url, params, "Error fetching Players Box Scores.")
+        data = cls._fetch_data(
+            url,
+            params,
+            "Error fetching Players Box Scores.",
+            ttl=cls._get_cache_ttl(season, date_to),
+        )
 
         print(
             f"fetched {url} {params['Season']} {params['SeasonType']} {params['Period']} {params['MeasureType']}"
         )
         return data
 
+    @classmethod
+    def stream_team_box_scores(
+            cls,
+            measure_type: str,
+            season: str,
+            season_type: str,
+            period: int,
+            playoff_round=None,
+            date_from=None,
+            date_to=None,
+            chunk_size: int = 5_000,
+    ):
+        """
+        Fetches Team Box Score data like get_team_box_scores, but decodes the rows incrementally while
+        they are read instead of holding the whole response in memory.
+
+        Args:
+            see get_team_box_scores
+            chunk_size (int) - max number of rows per chunk
+
+        Returns:
+            (Iterator[dict] or None) - json objects shaped like the get_team_box_scores response, each
+                holding a chunk of the rows; None in case of error.
+
+        Raises:
+            requests.RequestException or ValueError - while iterating, if the body is cut off or malformed
+        """
+        params = cls._get_game_logs_params(
+            measure_type, season, season_type, period, playoff_round, date_from, date_to
+        )
+
+        url = "https://stats.nba.com/stats/teamgamelogs"
+        return cls._stream_data(
+            url,
+            params,
+            "Error fetching Team Box Scores.",
+            ttl=cls._get_cache_ttl(season, date_to),
+            chunk_size=chunk_size,
+        )
+
+    @classmethod
+    def stream_player_box_scores(
+            cls,
+            measure_type: str,
+            season: str,
+            season_type: str,
+            period: int,
+            playoff_round=None,
+            date_from=None,
+            date_to=None,
+            chunk_size: int = 5_000,
+    ):
+        """
+        Fetches Player Box Score data like get_player_box_scores, but decodes the rows incrementally
+        while they are read instead of holding the whole response in memory.
+
+        Args:
+            see get_player_box_scores
+            chunk_size (int) - max number of rows per chunk
+
+        Returns:
+            (Iterator[dict] or None) - json objects shaped like the get_player_box_scores response, each
+                holding a chunk of the rows; None in case of error.
+
+        Raises:
+            requests.RequestException or ValueError - while iterating, if the body is cut off or malformed
+        """
+        params = cls._get_game_logs_params(
+            measure_type, season, season_type, period, playoff_round, date_from, date_to
+        )
+        url = "https://stats.nba.com/stats/playergamelogs"
+        chunks = cls._stream_data(
+            url,
+            params,
+            "Error fetching Players Box Scores.",
+            ttl=cls._get_cache_ttl(season, date_to),
+            chunk_size=chunk_size,
+        )
+
+        print(
+            f"fetched {url} {params['Season']} {params['SeasonType']} {params['Period']} {params['MeasureType']}"
+        )
+        return chunks
+
     @classmethod
     def get_player_tracking_box_scores(
             cls,
@@ -179,27 +276,222 @@ class NBAStatsAPIClient:
         }
 
         url = f"https://stats.nba.com/stats/leaguedashptstats"
-        data = cls._fetch_data(url, params, "Error fetching Players Tracking Box Scores.")
+        data = cls._fetch_data(
+            url,
+            params,
+            "Error fetching Players Tracking Box Scores.",
+            ttl=cls._get_cache_ttl(season, date_to),
+        )
 
         return data
 
     @classmethod
-    def _fetch_data(cls, url: str, params: dict, error_message: str) -> dict | None:
+    def _fetch_data(
+            cls,
+            url: str,
+            params: dict,
+            error_message: str,
+            ttl: float | None,
+    ) -> dict | None:
         """
-        Helper function to send requests.
+        Helper function to send requests. Fresh cached responses are returned without a request, and
+        expired ones are revalidated with a conditional request.
 
         Args:
             url (str) - request url
             params (dict) - request params for filtering and stuff
             error_message (str) - error message for logging purposes
+            ttl (float or None) - seconds to cache the response for, or None to cache it forever
 
         Returns:
             (dict or None) json object containing whatever data, or None if bad request
         """
+        cached = ResponseCache.get(url, params)
+
+        if cached is not None and cached["fresh"]:
+            return json.loads(cached["body"])
+
+        headers = cls.HEADERS
+
+        if cached is not None:
+            headers = dict(headers)
+
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
         try:
-            response = requests.get(url, params=params, headers=cls.HEADERS)
+            response = HTTPTransport.get(url, params=params, headers=headers)
+
+            if response.status_code == 304 and cached is not None:
+                ResponseCache.refresh(url, params, ttl)
+                return json.loads(cached["body"])
+
             response.raise_for_status()  # Raise an error for bad status codes
-            return response.json()
+            data = response.json()
         except requests.RequestException as e:
             print(f"{error_message}: {e}")
             return None
+
+        ResponseCache.put(
+            url,
+            params,
+            response.content,
+            ttl,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+        return data
+
+    @classmethod
+    def _stream_data(
+            cls,
+            url: str,
+            params: dict,
+            error_message: str,
+            ttl: float | None,
+            chunk_size: int,
+    ):
+        """
+        Helper function to send requests whose response body is streamed. The request is sent, or the
+        cache checked, right away; only reading and decoding the body is left to the returned iterator.
+
+        Args:
+            url (str) - request url
+            params (dict) - request params for filtering and stuff
+            error_message (str) - error message for logging purposes
+            ttl (float or None) - seconds to cache the response for, or None to cache it forever
+            chunk_size (int) - max number of rows per chunk
+
+        Returns:
+            (Iterator[dict] or None) - chunks of the first result set, or None if bad request
+        """
+        cached = ResponseCache.get(url, params, read_body=False)
+
+        if cached is not None and cached["fresh"]:
+            return cls._iter_result_set(
+                ResponseCache.iter_body(url, params), error_message, chunk_size
+            )
+
+        headers = cls.HEADERS
+
+        if cached is not None:
+            headers = dict(headers)
+
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = HTTPTransport.get(url, params=params, headers=headers, stream=True)
+
+            if response.status_code == 304 and cached is not None:
+                response.close()
+                ResponseCache.refresh(url, params, ttl)
+                return cls._iter_result_set(
+                    ResponseCache.iter_body(url, params), error_message, chunk_size
+                )
+
+            response.raise_for_status()  # Raise an error for bad status codes
+        except requests.RequestException as e:
+            print(f"{error_message}: {e}")
+            return None
+
+        body = ResponseCache.put_stream(
+            url,
+            params,
+            response.iter_content(cls.STREAM_READ_SIZE),
+            ttl,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+
+        return cls._iter_result_set(body, error_message, chunk_size, response)
+
+    @staticmethod
+    def _iter_result_set(body, error_message: str, chunk_size: int, response=None):
+        """
+        Helper function to decode a streamed response body into chunks of its first result set.
+        Errors while reading are logged and raised, so callers can discard the rows of a cut off body
+        instead of saving part of it.
+
+        Args:
+            body (Iterable[bytes]) - response body
+            error_message (str) - error message for logging purposes
+            chunk_size (int) - max number of rows per chunk
+            response (requests.Response or None) - response to close once the body is read
+
+        Yields:
+            (dict) - json object with a "resultSets" list holding headers and a chunk of rows
+
+        Raises:
+            requests.RequestException - if reading the body failed, e.g. the connection was cut
+            ValueError - if the body is malformed or truncated
+        """
+        try:
+            body = iter(body)
+
+            for headers, rows in ResultSetParser(body).iter_chunks(chunk_size):
+                yield {"resultSets": [{"headers": headers, "rowSet": rows}]}
+
+            # Read the rest of the body, so a streamed response is complete and gets cached
+            for _ in body:
+                pass
+        except (requests.RequestException, ValueError) as e:
+            print(f"{error_message}: {e}")
+            raise
+        finally:
+            if response is not None:
+                response.close()
+
+    @staticmethod
+    def _get_game_logs_params(
+            measure_type: str,
+            season: str,
+            season_type: str,
+            period: int,
+            playoff_round=None,
+            date_from=None,
+            date_to=None,
+    ) -> dict:
+        """Helper function to build the params of the teamgamelogs and playergamelogs endpoints."""
+        return {
+            "MeasureType": measure_type,
+            "Season": season,
+            "SeasonType": season_type,
+            "Period": period,
+            "PORound": playoff_round,
+            "DateFrom": date_from,
+            "DateTo": date_to,
+            "LastNGames": 0,
+            "LeagueID": "00",
+            "Month": 0,
+            "OpponentTeamID": 0,
+            "PerMode": "Totals",
+        }
+
+    @classmethod
+    def _get_cache_ttl(cls, season: str = None, date_to: str = None) -> float | None:
+        """
+        Helper function to get how long a box score response can be cached.
+
+        Args:
+            season (str or None) - season year e.g. 2024-25
+            date_to (str or None) - e.g. 10/03/2024
+
+        Returns:
+            (float or None) - None if the data is final, else the cache's CURRENT_TTL
+        """
+        settled = date.today() - timedelta(days=cls.SETTLED_DAYS)
+
+        # Regular season and playoffs are over by July 1st of the season's second year
+        if season and date(int(season[:4]) + 1, 7, 1) <= settled:
+            return None
+
+        if date_to and datetime.strptime(date_to, "%m/%d/%Y").date() < settled:
+            return None
+
+        return ResponseCache.CURRENT_TTL
@@ -1,8 +1,9 @@
 # prizepicks_api_client.py
 
-import requests
 import pandas as pd
 
+from app.api_clients.http_transport import HTTPTransport
+
 
 class PrizePicksAPIClient:
     @classmethod
@@ -23,7 +24,7 @@ class PrizePicksAPIClient:
         returns:
             - df (pd.DataFrame): a dataframe of the call response content
         """
-        resp = requests.get(url).json()
+        resp = HTTPTransport.get(url).json()
         data = pd.json_normalize(resp["data"], max_level=max_level)
         try:
             included = pd.json_normalize(resp["included"], max_level=max_level)
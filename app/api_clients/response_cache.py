@@ -0,0 +1,266 @@
+# response_cache.py
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Class containing an on-disk cache of API responses, keyed by a hash of the request url and params.
+
+    Each entry is a gzip compressed response body, <key>.json.gz, and a small <key>.meta.json holding
+    when the entry expires and the ETag / Last-Modified validators of the response. The meta file is
+    written last, so an entry without one is never read.
+
+    Entries are stored with a ttl in seconds, or None for responses that never change (e.g. completed
+    seasons). Expired entries are kept so the client can revalidate them with a conditional request.
+
+    Methods:
+        configure
+        get
+        iter_body
+        put
+        put_stream
+        refresh
+        _get_paths
+        _write_meta
+    """
+
+    ENABLED = False
+    DIRECTORY = None
+    CURRENT_TTL = 3600
+    COMPRESS_LEVEL = 6
+
+    _lock = threading.Lock()
+
+    @classmethod
+    def configure(cls, **settings) -> None:
+        """
+        Overrides cache settings, e.g. configure(ENABLED=True, DIRECTORY="instance/http_cache").
+
+        Args:
+            settings - class attribute names and their new values
+        """
+        for name, value in settings.items():
+            if not hasattr(cls, name):
+                raise AttributeError(f"Unknown ResponseCache setting {name}")
+
+            setattr(cls, name, value)
+
+    @classmethod
+    def get(cls, url: str, params: dict = None, read_body: bool = True) -> dict | None:
+        """
+        Reads a cached response.
+
+        Args:
+            url (str) - request url
+            params (dict) - request params
+            read_body (bool) - read the body; False to leave it for iter_body
+
+        Returns:
+            (dict or None) - containing "body" (bytes, or None if not read), "fresh" (bool), "etag" and
+                "last_modified", or None if the cache is disabled or there is no entry
+        """
+        if not cls.ENABLED or not cls.DIRECTORY:
+            return None
+
+        body_path, meta_path = cls._get_paths(url, params)
+
+        try:
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+
+            if read_body:
+                with gzip.open(body_path, "rb") as body_file:
+                    body = body_file.read()
+            elif os.path.exists(body_path):
+                body = None
+            else:
+                return None
+        except (OSError, ValueError, EOFError):
+            return None
+
+        return {
+            "body": body,
+            "fresh": meta["expires_at"] is None or meta["expires_at"] > time.time(),
+            "etag": meta["etag"],
+            "last_modified": meta["last_modified"],
+        }
+
+    @classmethod
+    def iter_body(cls, url: str, params: dict = None, chunk_size: int = 2**16):
+        """
+        Reads the body of a cached response in chunks, without holding it in memory.
+
+        Args:
+            url (str) - request url
+            params (dict) - request params
+            chunk_size (int) - max bytes per chunk
+
+        Yields:
+            (bytes) - chunks of the decompressed body
+        """
+        body_path, _ = cls._get_paths(url, params)
+
+        with gzip.open(body_path, "rb") as body_file:
+            while chunk := body_file.read(chunk_size):
+                yield chunk
+
+    @classmethod
+    def put(
+        cls,
+        url: str,
+        params: dict,
+        body: bytes,
+        ttl: float | None,
+        etag: str = None,
+        last_modified: str = None,
+    ) -> None:
+        """
+        Stores a response.
+
+        Args:
+            url (str) - request url
+            params (dict) - request params
+            body (bytes) - response body
+            ttl (float or None) - seconds until the entry expires, or None to never expire
+            etag (str or None) - ETag header of the response
+            last_modified (str or None) - Last-Modified header of the response
+
+        Returns:
+            None
+        """
+        for _ in cls.put_stream(url, params, [body], ttl, etag, last_modified):
+            pass
+
+    @classmethod
+    def put_stream(
+        cls,
+        url: str,
+        params: dict,
+        chunks,
+        ttl: float | None,
+        etag: str = None,
+        last_modified: str = None,
+    ):
+        """
+        Passes a streamed response body through while storing it. The entry is only stored once the
+        body has been read to the end.
+
+        Args:
+            url (str) - request url
+            params (dict) - request params
+            chunks (Iterable[bytes]) - response body
+            ttl (float or None) - seconds until the entry expires, or None to never expire
+            etag (str or None) - ETag header of the response
+            last_modified (str or None) - Last-Modified header of the response
+
+        Yields:
+            (bytes) - the chunks of the body
+        """
+        if not cls.ENABLED or not cls.DIRECTORY:
+            yield from chunks
+            return
+
+        body_path, meta_path = cls._get_paths(url, params)
+        tmp_path = f"{body_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+        try:
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            body_file = gzip.open(tmp_path, "wb", compresslevel=cls.COMPRESS_LEVEL)
+        except OSError as e:
+            print(f"Error caching response of {url}: {e}")
+            yield from chunks
+            return
+
+        stored = False
+
+        try:
+            for chunk in chunks:
+                # A failed cache write never interrupts the body passed through
+                if body_file is not None:
+                    try:
+                        body_file.write(chunk)
+                    except OSError as e:
+                        print(f"Error caching response of {url}: {e}")
+                        body_file.close()
+                        body_file = None
+
+                yield chunk
+
+            if body_file is not None:
+                body_file.close()
+
+                # Drop the old meta first, so the old validators never describe the new body
+                with cls._lock:
+                    if os.path.exists(meta_path):
+                        os.remove(meta_path)
+
+                    os.replace(tmp_path, body_path)
+                    cls._write_meta(meta_path, ttl, etag, last_modified)
+
+                stored = True
+        except OSError as e:
+            print(f"Error caching response of {url}: {e}")
+        finally:
+            if body_file is not None:
+                body_file.close()
+
+            if not stored and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    @classmethod
+    def refresh(cls, url: str, params: dict, ttl: float | None) -> None:
+        """
+        Extends the expiry of an entry that the server revalidated (304 Not Modified).
+
+        Args:
+            url (str) - request url
+            params (dict) - request params
+            ttl (float or None) - seconds until the entry expires, or None to never expire
+
+        Returns:
+            None
+        """
+        entry = cls.get(url, params, read_body=False)
+
+        if entry is None:
+            return
+
+        _, meta_path = cls._get_paths(url, params)
+
+        try:
+            with cls._lock:
+                cls._write_meta(meta_path, ttl, entry["etag"], entry["last_modified"])
+        except OSError as e:
+            print(f"Error caching response of {url}: {e}")
+
+    @classmethod
+    def _get_paths(cls, url: str, params: dict = None) -> tuple[str, str]:
+        """Helper method to get the body and meta file paths of a request."""
+        request = json.dumps([url, params or {}], sort_keys=True, default=str)
+        key = hashlib.sha256(request.encode()).hexdigest()
+
+        # Fan out over subdirectories so a full backfill doesn't put every entry in one directory
+        entry_path = os.path.join(cls.DIRECTORY, key[:2], key)
+
+        return f"{entry_path}.json.gz", f"{entry_path}.meta.json"
+
+    @staticmethod
+    def _write_meta(meta_path: str, ttl: float | None, etag: str, last_modified: str) -> None:
+        """Helper method to atomically write the meta file of an entry."""
+        meta = {
+            "expires_at": None if ttl is None else time.time() + ttl,
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        tmp_path = f"{meta_path}.tmp-{os.getpid()}-{threading.get_ident()}"
+
+        with open(tmp_path, "w") as meta_file:
+            json.dump(meta, meta_file)
+
+        os.replace(tmp_path, meta_path)
@@ -0,0 +1,132 @@
+# result_set_parser.py
+
+import codecs
+import json
+
+
+class ResultSetParser:
+    """
+    Class for incrementally decoding the first result set of a stats.nba.com response, e.g.
+    {"resource": ..., "parameters": {...}, "resultSets": [{"name": ..., "headers": [...], "rowSet": [...]}]},
+    from a stream of bytes. Only the headers, the rows not yet yielded and the current network chunk are
+    held in memory, so memory stays bounded however large the response is.
+
+    Methods:
+        iter_chunks
+        _skip_to
+        _next_char
+        _decode
+        _read
+    """
+
+    WHITESPACE = " \t\r\n"
+
+    _json_decoder = json.JSONDecoder()
+
+    def __init__(self, byte_chunks):
+        """
+        Args:
+            byte_chunks (Iterable[bytes]) - utf-8 encoded response body
+        """
+        self._byte_chunks = iter(byte_chunks)
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._text = ""
+        self._pos = 0
+        self._exhausted = False
+
+    def iter_chunks(self, chunk_size: int):
+        """
+        Decodes the headers and rows of the first result set.
+
+        Args:
+            chunk_size (int) - max number of rows per chunk
+
+        Yields:
+            (tuple[list, list]) - (headers, rows) of each chunk of rows, in response order
+
+        Raises:
+            ValueError - if the response is malformed or truncated
+        """
+        self._skip_to('"resultSets"')
+        self._skip_to('"headers"')
+        self._skip_to(":")
+        headers = self._decode()
+
+        self._skip_to('"rowSet"')
+        self._skip_to(":")
+        self._skip_to("[")
+
+        rows = []
+
+        while self._next_char(separators=self.WHITESPACE + ",") != "]":
+            rows.append(self._decode())
+
+            if len(rows) == chunk_size:
+                yield headers, rows
+                rows = []
+
+        if rows:
+            yield headers, rows
+
+    def _skip_to(self, token: str) -> None:
+        """Helper method to move past the next occurrence of token."""
+        while True:
+            found = self._text.find(token, self._pos)
+
+            if found != -1:
+                self._pos = found + len(token)
+                return
+
+            # Keep a possible partial token at the end of the text
+            self._pos = max(self._pos, len(self._text) - len(token) + 1)
+
+            if not self._read():
+                raise ValueError(f"Result set is missing {token}")
+
+    def _next_char(self, separators: str = WHITESPACE) -> str:
+        """Helper method to skip separators and return the next character, moving past "]"."""
+        while True:
+            while self._pos < len(self._text) and self._text[self._pos] in separators:
+                self._pos += 1
+
+            if self._pos < len(self._text):
+                char = self._text[self._pos]
+
+                if char == "]":
+                    self._pos += 1
+
+                return char
+
+            if not self._read():
+                raise ValueError("Result set is truncated")
+
+    def _decode(self) -> list:
+        """Helper method to decode the json array starting at the next character."""
+        self._next_char()
+
+        while True:
+            try:
+                value, self._pos = self._json_decoder.raw_decode(self._text, self._pos)
+                return value
+            except json.JSONDecodeError:
+                # Arrays end with "]", so a decode error is either a partial array or malformed json
+                if not self._read():
+                    raise ValueError("Result set is truncated or malformed")
+
+    def _read(self) -> bool:
+        """Helper method to append the next chunk to the text, dropping what was already consumed."""
+        if self._exhausted:
+            return False
+
+        chunk = next(self._byte_chunks, None)
+
+        if chunk is None:
+            self._exhausted = True
+            text = self._text_decoder.decode(b"", final=True)
+        else:
+            text = self._text_decoder.decode(chunk)
+
+        self._text = self._text[self._pos:] + text
+        self._pos = 0
+
+        return True
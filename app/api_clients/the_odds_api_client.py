@@ -1,15 +1,27 @@
 # the_odds_api_client.py
 
+import threading
+
 import requests
 
+from app.api_clients.fetch_scheduler import FetchScheduler
+from app.api_clients.http_transport import HTTPTransport
+
 
 class TheOddsAPIClient:
     """
     Class containing methods for interacting with The Odds API.
 
+    Every request costs credits of the API key's quota, one per market and region returned. The quota
+    left is tracked from the x-requests-remaining / x-requests-used headers of each response.
+
     Methods:
         get_events
         get_player_props
+        get_quota
+        _fetch_event_player_props
+        _reserve_quota
+        _update_quota
         _fetch_data
     """
 
@@ -20,6 +32,14 @@ class TheOddsAPIClient:
     ODDS_FORMAT = "american"
     DATE_FORMAT = "iso"
 
+    MAX_WORKERS = 4
+    REQUESTS_PER_SECOND = 0
+    # Credits never spent, so the quota isn't exhausted by a partial slate
+    QUOTA_RESERVE = 0
+
+    _quota = {"remaining": None, "used": None, "last_cost": None, "in_flight": 0}
+    _quota_lock = threading.Lock()
+
     @classmethod
     def get_events(cls, api_key: str):
         """
@@ -45,19 +65,78 @@ class TheOddsAPIClient:
         return odds
 
     @classmethod
-    def get_player_props(cls, api_key: str, region: str, event_ids: list[str]):
+    def get_player_props(
+        cls, api_key: str, region: str, event_ids: list[str], max_workers: int = None
+    ) -> list[dict]:
         """
-        Gets player prop data for each event id provided.
+        Gets player prop data for each event id provided, fetching up to max_workers events at once.
+        Events are no longer fetched once the quota left can't cover them, keeping QUOTA_RESERVE credits.
+        The first event is always fetched, since the quota known from earlier calls may be stale, e.g.
+        renewed since.
 
         Args:
-            api_key (str) - ...
-            region (str) - ...
+            api_key (str) - API key
+            region (str) - bookmaker region e.g. us, us2, us_dfs
+            event_ids (list[str]) - ids of events
+            max_workers (int) - max number of requests in flight at once, defaults to MAX_WORKERS; 1 to
+                fetch events one by one
+
+        Returns:
+            (list[dict]) - json data object of each event fetched, in event_ids order; events that
+                failed or were skipped for quota are left out
+        """
+        scheduler = FetchScheduler(
+            max_workers=max_workers or cls.MAX_WORKERS,
+            requests_per_second=cls.REQUESTS_PER_SECOND,
+        )
+
+        # The first event is fetched alone, so the quota is known before requests go out concurrently
+        odds_by_event_id = {
+            event_id: cls._fetch_event_player_props(api_key, region, event_id, probe=True)
+            for event_id in event_ids[:1]
+        }
+
+        for (event_id,), odds in scheduler.run(
+            lambda event_id: cls._fetch_event_player_props(api_key, region, event_id),
+            [(event_id,) for event_id in event_ids[1:]],
+        ):
+            odds_by_event_id[event_id] = odds
+
+        return [
+            odds_by_event_id[event_id]
+            for event_id in event_ids
+            if odds_by_event_id.get(event_id) is not None
+        ]
+
+    @classmethod
+    def get_quota(cls) -> dict:
+        """
+        Returns the quota of the API key, as of the last response.
+
+        Returns:
+            (dict) - containing "remaining" and "used" credits, None before the first response
+        """
+        with cls._quota_lock:
+            return {"remaining": cls._quota["remaining"], "used": cls._quota["used"]}
 
+    @classmethod
+    def _fetch_event_player_props(
+        cls, api_key: str, region: str, event_id: str, probe: bool = False
+    ) -> dict | None:
+        """
+        Helper method to fetch the player props of an event, if the quota left allows it or the request
+        is a probe refreshing the quota.
+
+        Returns:
+            (dict or None) - json data object, or None if error or skipped for quota; a failed request
+                only drops its own event
         """
-        odds_list = []
+        if not cls._reserve_quota(region, probe):
+            print(f"Skipping player props of event {event_id}: quota would drop below reserve")
+            return None
 
-        for event_id in event_ids:
-            odds = cls._fetch_data(
+        try:
+            return cls._fetch_data(
                 f"https://api.the-odds-api.com/v4/sports/{cls.SPORT}/events/{event_id}/odds",
                 {
                     "api_key": api_key,
@@ -67,12 +146,54 @@ class TheOddsAPIClient:
                     "dateFormat": cls.DATE_FORMAT,
                 },
             )
-            odds_list.append(odds)
+        except requests.RequestException as e:
+            print(f"Error fetching player props of event {event_id}: {e}")
+            return None
+        finally:
+            with cls._quota_lock:
+                cls._quota["in_flight"] -= 1
+
+    @classmethod
+    def _reserve_quota(cls, region: str, probe: bool = False) -> bool:
+        """
+        Helper method to claim quota for a request, counting the credits of requests still in flight.
+        A request is estimated to cost as much as the last one, or every market requested before any.
+        Probes are always let through, since the quota left is only refreshed by responses.
+
+        Returns:
+            (bool) - True if the request may be sent
+        """
+        with cls._quota_lock:
+            remaining = cls._quota["remaining"]
+
+            if remaining is not None and not probe:
+                cost = cls._quota["last_cost"]
+
+                if cost is None:
+                    cost = len(cls.PLAYER_PROP_MARKETS.split(",")) * len(region.split(","))
+
+                if remaining - (cls._quota["in_flight"] + 1) * cost < cls.QUOTA_RESERVE:
+                    return False
 
-        return odds_list
+            cls._quota["in_flight"] += 1
+            return True
 
-    @staticmethod
-    def _fetch_data(url: str, params: dict):
+    @classmethod
+    def _update_quota(cls, headers) -> None:
+        """Helper method to read the quota headers of a response."""
+        with cls._quota_lock:
+            for key, header in [
+                ("remaining", "x-requests-remaining"),
+                ("used", "x-requests-used"),
+                ("last_cost", "x-requests-last"),
+            ]:
+                try:
+                    cls._quota[key] = int(float(headers[header]))
+                except (KeyError, TypeError, ValueError):
+                    pass
+
+    @classmethod
+    def _fetch_data(cls, url: str, params: dict):
         """
         Helper method to fetch json data from The Odds API.
 
@@ -83,7 +204,9 @@ class TheOddsAPIClient:
         Returns:
             (dict or None) json object containing whatever data, or None if bad request
         """
-        res = requests.get(url, params)
+        res = HTTPTransport.get(url, params)
+
+        cls._update_quota(res.headers)
 
         if res.status_code != 200:
             print(
@@ -91,7 +214,7 @@ class TheOddsAPIClient:
             )
             return
 
-        print("Remaining requests", res.headers["x-requests-remaining"])
-        print("Used requests", res.headers["x-requests-used"])
+        print("Remaining requests", res.headers.get("x-requests-remaining"))
+        print("Used requests", res.headers.get("x-requests-used"))
 
         return res.json()
@@ -31,6 +31,12 @@ class Player(db.Model):
 
 
 class TeamBoxScoreTraditional(db.Model):
+    __table_args__ = (
+        db.Index("uq_team_box_score_traditional_team_game_type_period", "team_id", "game_id", "season_type", "period", unique=True),
+        db.Index("ix_team_box_score_traditional_team_period_date", "team_id", "period", "game_date"),
+        db.Index("ix_team_box_score_traditional_team_opponent_period", "team_id", "opponent_team_id", "period"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     season_year = db.Column(db.String(7), nullable=False)
     season_type = db.Column(db.String, nullable=False)
@@ -38,7 +44,7 @@ class TeamBoxScoreTraditional(db.Model):
     team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     opponent_team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     game_id = db.Column(db.String, nullable=False)  # NBA ID
-    game_date = db.Column(db.String, nullable=False)    # "09/28/2004"
+    game_date = db.Column(db.Date, nullable=False)  # 2004-09-28
     away_game = db.Column(db.Boolean, nullable=False)
     win_loss = db.Column(db.String(1), nullable=False)
     period = db.Column(db.Integer, nullable=False)
@@ -67,6 +73,12 @@ class TeamBoxScoreTraditional(db.Model):
 
 
 class TeamBoxScoreAdvanced(db.Model):
+    __table_args__ = (
+        db.Index("uq_team_box_score_advanced_team_game_type_period", "team_id", "game_id", "season_type", "period", unique=True),
+        db.Index("ix_team_box_score_advanced_team_period_date", "team_id", "period", "game_date"),
+        db.Index("ix_team_box_score_advanced_team_opponent_period", "team_id", "opponent_team_id", "period"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     season_year = db.Column(db.String(7), nullable=False)
     season_type = db.Column(db.String, nullable=False)
@@ -74,7 +86,7 @@ class TeamBoxScoreAdvanced(db.Model):
     team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     opponent_team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     game_id = db.Column(db.String, nullable=False)
-    game_date = db.Column(db.String, nullable=False)
+    game_date = db.Column(db.Date, nullable=False)
     away_game = db.Column(db.Boolean, nullable=False)
     win_loss = db.Column(db.String(1), nullable=False)
     period = db.Column(db.Integer, nullable=False)
@@ -96,6 +108,12 @@ class TeamBoxScoreAdvanced(db.Model):
 
 
 class TeamBoxScoreMiscellaneous(db.Model):
+    __table_args__ = (
+        db.Index("uq_team_box_score_miscellaneous_team_game_type_period", "team_id", "game_id", "season_type", "period", unique=True),
+        db.Index("ix_team_box_score_miscellaneous_team_period_date", "team_id", "period", "game_date"),
+        db.Index("ix_team_box_score_miscellaneous_team_opponent_period", "team_id", "opponent_team_id", "period"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     season_year = db.Column(db.String(7), nullable=False)
     season_type = db.Column(db.String, nullable=False)
@@ -103,7 +121,7 @@ class TeamBoxScoreMiscellaneous(db.Model):
     team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     opponent_team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     game_id = db.Column(db.String, nullable=False)
-    game_date = db.Column(db.String, nullable=False)
+    game_date = db.Column(db.Date, nullable=False)
     away_game = db.Column(db.Boolean, nullable=False)
     win_loss = db.Column(db.String(1), nullable=False)
     period = db.Column(db.Integer, nullable=False)
@@ -115,6 +133,12 @@ class TeamBoxScoreMiscellaneous(db.Model):
 
 
 class TeamBoxScoreScoring(db.Model):
+    __table_args__ = (
+        db.Index("uq_team_box_score_scoring_team_game_type_period", "team_id", "game_id", "season_type", "period", unique=True),
+        db.Index("ix_team_box_score_scoring_team_period_date", "team_id", "period", "game_date"),
+        db.Index("ix_team_box_score_scoring_team_opponent_period", "team_id", "opponent_team_id", "period"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     season_year = db.Column(db.String(7), nullable=False)
     season_type = db.Column(db.String, nullable=False)
@@ -122,7 +146,7 @@ class TeamBoxScoreScoring(db.Model):
     team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     opponent_team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     game_id = db.Column(db.String, nullable=False)
-    game_date = db.Column(db.String, nullable=False)
+    game_date = db.Column(db.Date, nullable=False)
 
     away_game = db.Column(db.Boolean, nullable=False)
     win_loss = db.Column(db.String(1), nullable=False)
@@ -151,6 +175,12 @@ class TeamBoxScoreScoring(db.Model):
 
 
 class PlayerBoxScoreTraditional(db.Model):
+    __table_args__ = (
+        db.Index("uq_player_box_score_traditional_player_game_type_period", "player_id", "game_id", "season_type", "period", unique=True),
+        db.Index("ix_player_box_score_traditional_player_period_date", "player_id", "period", "game_date"),
+        db.Index("ix_player_box_score_traditional_player_opponent_period", "player_id", "opponent_team_id", "period"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     season_year = db.Column(db.String(7), nullable=False)
     season_type = db.Column(db.String, nullable=False)
@@ -159,7 +189,7 @@ class PlayerBoxScoreTraditional(db.Model):
     team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     opponent_team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     game_id = db.Column(db.String, nullable=False)
-    game_date = db.Column(db.String, nullable=False)
+    game_date = db.Column(db.Date, nullable=False)
     away_game = db.Column(db.Boolean, nullable=False)
     win_loss = db.Column(db.String(1), nullable=False)
     period = db.Column(db.Integer, nullable=False)
@@ -189,6 +219,12 @@ class PlayerBoxScoreTraditional(db.Model):
 
 
 class PlayerBoxScoreAdvanced(db.Model):
+    __table_args__ = (
+        db.Index("uq_player_box_score_advanced_player_game_type_period", "player_id", "game_id", "season_type", "period", unique=True),
+        db.Index("ix_player_box_score_advanced_player_period_date", "player_id", "period", "game_date"),
+        db.Index("ix_player_box_score_advanced_player_opponent_period", "player_id", "opponent_team_id", "period"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     season_year = db.Column(db.String(7), nullable=False)
     season_type = db.Column(db.String, nullable=False)
@@ -197,7 +233,7 @@ class PlayerBoxScoreAdvanced(db.Model):
     team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     opponent_team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     game_id = db.Column(db.String, nullable=False)
-    game_date = db.Column(db.String, nullable=False)
+    game_date = db.Column(db.Date, nullable=False)
     away_game = db.Column(db.Boolean, nullable=False)
     win_loss = db.Column(db.String(1), nullable=False)
     period = db.Column(db.Integer, nullable=False)
@@ -220,6 +256,12 @@ class PlayerBoxScoreAdvanced(db.Model):
 
 
 class PlayerBoxScoreMiscellaneous(db.Model):
+    __table_args__ = (
+        db.Index("uq_player_box_score_miscellaneous_player_game_type_period", "player_id", "game_id", "season_type", "period", unique=True),
+        db.Index("ix_player_box_score_miscellaneous_player_period_date", "player_id", "period", "game_date"),
+        db.Index("ix_player_box_score_miscellaneous_player_opponent_period", "player_id", "opponent_team_id", "period"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     season_year = db.Column(db.String(7), nullable=False)
     season_type = db.Column(db.String, nullable=False)
@@ -228,7 +270,7 @@ class PlayerBoxScoreMiscellaneous(db.Model):
     team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     opponent_team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     game_id = db.Column(db.String, nullable=False)
-    game_date = db.Column(db.String, nullable=False)
+    game_date = db.Column(db.Date, nullable=False)
 
     away_game = db.Column(db.Boolean, nullable=False)
     win_loss = db.Column(db.String(1), nullable=False)
@@ -245,6 +287,12 @@ class PlayerBoxScoreMiscellaneous(db.Model):
 
 
 class PlayerBoxScoreScoring(db.Model):
+    __table_args__ = (
+        db.Index("uq_player_box_score_scoring_player_game_type_period", "player_id", "game_id", "season_type", "period", unique=True),
+        db.Index("ix_player_box_score_scoring_player_period_date", "player_id", "period", "game_date"),
+        db.Index("ix_player_box_score_scoring_player_opponent_period", "player_id", "opponent_team_id", "period"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     season_year = db.Column(db.String(7), nullable=False)
     season_type = db.Column(db.String, nullable=False)
@@ -253,7 +301,7 @@ class PlayerBoxScoreScoring(db.Model):
     team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     opponent_team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     game_id = db.Column(db.String, nullable=False)
-    game_date = db.Column(db.String, nullable=False)
+    game_date = db.Column(db.Date, nullable=False)
 
     away_game = db.Column(db.Boolean, nullable=False)
     win_loss = db.Column(db.String(1), nullable=False)
@@ -279,9 +327,13 @@ class PlayerBoxScoreScoring(db.Model):
 
 
 class PlayerBoxScoreRebounding(db.Model):
+    __table_args__ = (
+        db.Index("uq_player_box_score_rebounding_player_date", "player_id", "game_date", unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey("player.id"), nullable=False)
-    game_date = db.Column(db.String, nullable=False)
+    game_date = db.Column(db.Date, nullable=False)
 
     contested_defensive_rebounds = db.Column(db.Integer, nullable=False)
     contested_defensive_rebound_percentage = db.Column(db.Float, nullable=False)
@@ -301,9 +353,13 @@ class PlayerBoxScoreRebounding(db.Model):
 
 
 class PlayerBoxScorePassing(db.Model):
+    __table_args__ = (
+        db.Index("uq_player_box_score_passing_player_date", "player_id", "game_date", unique=True),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     player_id = db.Column(db.Integer, db.ForeignKey("player.id"), nullable=False)
-    game_date = db.Column(db.String, nullable=False)
+    game_date = db.Column(db.Date, nullable=False)
 
     passes_made = db.Column(db.Integer, nullable=False)
     passes_received = db.Column(db.Integer, nullable=False)
@@ -315,3 +371,20 @@ class PlayerBoxScorePassing(db.Model):
     adjusted_assist_to_pass_percentage = db.Column(db.Float, nullable=False)
     
 
+
+
+# Loader Checkpoints
+
+
+class LoaderCheckpoint(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    loader = db.Column(db.String, nullable=False)  # e.g. "player_tracking_box_scores"
+    key = db.Column(db.String, nullable=False)  # unit of work completed e.g. game date "09/28/2004"
+
+
+# Data Versions
+
+
+class DataVersion(db.Model):
+    table_name = db.Column(db.String, primary_key=True)
+    version = db.Column(db.Integer, nullable=False)  # bumped in the transaction of every change to the table
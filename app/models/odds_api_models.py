@@ -60,6 +60,7 @@ class PlayerProp(db.Model):
     player_id = db.Column(db.Integer, db.ForeignKey("player.id"), nullable=False)
     opponent_team_id = db.Column(db.Integer, db.ForeignKey("team.id"), nullable=False)
     market = db.Column(db.String, nullable=False)
+    outcome = db.Column(db.String)  # set for props priced per outcome, e.g. PrizePicks
     line = db.Column(db.Float, nullable=False)
     alternate = db.Column(db.Boolean, nullable=False)
     last_five_games_hits = db.Column(db.Integer)
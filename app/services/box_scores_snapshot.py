@@ -0,0 +1,146 @@
+# box_scores_snapshot.py
+
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+
+class BoxScoresSnapshot:
+    """
+    Class containing methods for persisting the in-memory box scores structures as a directory of .npy
+    files, so worker processes can load or memory-map them on startup instead of re-querying the db.
+
+    A snapshot directory holds one .npy file per df column (categorical columns store their codes) and
+    per array, and a meta.json with the snapshot version, the fingerprint of the source table, the
+    column dtypes and any extra json attributes.
+
+    Memory-mapped snapshots are opened read-only, so every process on a host attached to the same
+    snapshot shares a single copy of the data through the OS page cache.
+
+    Methods:
+        read
+        write
+    """
+
+    VERSION = 2
+    META_FILE = "meta.json"
+
+    @classmethod
+    def read(cls, path: str, fingerprint: str, mmap: bool = False) -> dict | None:
+        """
+        Reads a snapshot.
+
+        Args:
+            path (str) - snapshot directory
+            fingerprint (str) - fingerprint of the source table the snapshot must match
+            mmap (bool) - memory-map the files read-only instead of reading them into memory
+
+        Returns:
+            (dict or None) - containing "frames" (dict of pd.DataFrame), "arrays" (dict of np.ndarray)
+                and "attributes" (dict), or None if the snapshot is missing, from another version or stale.
+        """
+        try:
+            with open(os.path.join(path, cls.META_FILE)) as meta_file:
+                meta = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+        if meta.get("version") != cls.VERSION or meta.get("fingerprint") != fingerprint:
+            return None
+
+        mmap_mode = "r" if mmap else None
+
+        frames = {}
+
+        for frame_name, frame_columns in meta["frames"].items():
+            columns = {}
+
+            for column in frame_columns:
+                values = np.load(
+                    os.path.join(path, f"{frame_name}.{column['name']}.npy"),
+                    mmap_mode=mmap_mode,
+                )
+
+                if column["categories"] is not None:
+                    values = pd.Categorical.from_codes(values, categories=column["categories"])
+
+                columns[column["name"]] = values
+
+            # copy=False keeps each column backed by its own (possibly memory-mapped) array
+            frames[frame_name] = pd.DataFrame(columns, copy=False)
+
+        arrays = {
+            array_name: np.load(os.path.join(path, f"{array_name}.npy"), mmap_mode=mmap_mode)
+            for array_name in meta["arrays"]
+        }
+
+        return {"frames": frames, "arrays": arrays, "attributes": meta["attributes"]}
+
+    @classmethod
+    def write(
+        cls,
+        path: str,
+        fingerprint: str,
+        frames: dict,
+        arrays: dict,
+        attributes: dict,
+    ) -> None:
+        """
+        Writes a snapshot. The snapshot is built in a temporary directory and swapped in, so readers
+        never see a partially written snapshot.
+
+        Args:
+            path (str) - snapshot directory
+            fingerprint (str) - fingerprint of the source table
+            frames (dict) - dfs with numeric, datetime64 or categorical columns, keyed by name
+            arrays (dict) - numpy arrays keyed by name
+            attributes (dict) - json serializable values stored in meta.json
+
+        Returns:
+            None
+        """
+        tmp_path = f"{path}.tmp-{os.getpid()}"
+        old_path = f"{path}.old-{os.getpid()}"
+
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+
+        meta = {
+            "version": cls.VERSION,
+            "fingerprint": fingerprint,
+            "frames": {},
+            "arrays": list(arrays),
+            "attributes": attributes,
+        }
+
+        for frame_name, df in frames.items():
+            meta["frames"][frame_name] = []
+
+            for name, values in df.items():
+                if isinstance(values.dtype, pd.CategoricalDtype):
+                    categories = values.cat.categories.tolist()
+                    values = values.cat.codes
+                else:
+                    categories = None
+
+                np.save(
+                    os.path.join(tmp_path, f"{frame_name}.{name}.npy"),
+                    values.to_numpy(),
+                    allow_pickle=False,
+                )
+                meta["frames"][frame_name].append({"name": name, "categories": categories})
+
+        for array_name, values in arrays.items():
+            np.save(os.path.join(tmp_path, f"{array_name}.npy"), values, allow_pickle=False)
+
+        with open(os.path.join(tmp_path, cls.META_FILE), "w") as meta_file:
+            json.dump(meta, meta_file)
+
+        if os.path.exists(path):
+            os.rename(path, old_path)
+
+        os.rename(tmp_path, path)
+        shutil.rmtree(old_path, ignore_errors=True)
@@ -0,0 +1,224 @@
+# bulk_writer.py
+
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app.extensions import db
+
+
+class BulkWriter:
+    """
+    Class for writing parsed rows to the db with Core executemany statements, so no ORM object is
+    built per row.
+
+    Rows are mappings of column name -> value. Keys that aren't columns of the table are ignored and
+    columns missing from a row are written as NULL. Rows are written in batches of BATCH_SIZE, one
+    executemany of the table's INSERT per batch, in the session's transaction; the caller commits.
+
+    On PostgreSQL (psycopg driver), writes of at least COPY_MIN_ROWS rows are streamed with COPY
+    instead, as plain tuples. Upserts COPY the rows into a temporary staging table and merge it with
+    a single INSERT ... SELECT ... ON CONFLICT.
+
+    Methods:
+        insert
+        replace
+        upsert
+        get_natural_key
+        _upsert_statement
+        _copy_rows
+        _stage_rows
+        _use_copy
+        _get_params
+    """
+
+    BATCH_SIZE = 5_000
+    COPY_MIN_ROWS = 1_000
+
+    # Dialect specific INSERT constructs supporting ON CONFLICT
+    INSERTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+    @classmethod
+    def insert(cls, model: db.Model, rows: list[dict], batch_size: int = None) -> None:
+        """
+        Inserts rows into the table of a model.
+
+        Args:
+            model (db.Model) - model of the table
+            rows (list[dict]) - rows to insert
+            batch_size (int) - max rows per executemany, defaults to BATCH_SIZE
+
+        Returns:
+            None
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+        table = model.__table__
+
+        if cls._use_copy(rows):
+            params = cls._get_params(table, rows)
+            cls._copy_rows(table, [column for column in table.columns if column.name in params[0]], params)
+            return
+
+        for start in range(0, len(rows), batch_size):
+            db.session.execute(
+                table.insert(), cls._get_params(table, rows[start:start + batch_size])
+            )
+
+    @classmethod
+    def replace(cls, model: db.Model, rows: list[dict], batch_size: int = None) -> None:
+        """
+        Replaces every row of the table of a model. Readers keep seeing the old rows until the caller
+        commits, unlike when the table is dropped and recreated.
+
+        Args:
+            model (db.Model) - model of the table
+            rows (list[dict]) - new rows
+            batch_size (int) - max rows per executemany, defaults to BATCH_SIZE
+
+        Returns:
+            None
+        """
+        db.session.execute(model.__table__.delete())
+        cls.insert(model, rows, batch_size)
+
+    @classmethod
+    def upsert(cls, model: db.Model, rows: list[dict], batch_size: int = None) -> list:
+        """
+        Upserts rows into the table of a model with INSERT ... ON CONFLICT on its natural key. Stored rows
+        are only rewritten if a value changed. Of rows sharing a natural key, the last one is written.
+
+        Args:
+            model (db.Model) - model of the table
+            rows (list[dict]) - rows to upsert
+            batch_size (int) - max rows per executemany, defaults to BATCH_SIZE
+
+        Returns:
+            (list) - natural keys of the rows inserted or changed, e.g. row.game_id
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+        table = model.__table__
+        key_columns = cls.get_natural_key(table)
+
+        # PostgreSQL refuses to update a row twice in one statement
+        rows = list(
+            {tuple(row.get(column.name) for column in key_columns): row for row in rows}.values()
+        )
+
+        if cls._use_copy(rows):
+            return db.session.execute(cls._stage_rows(table, key_columns, rows)).all()
+
+        statement = cls._upsert_statement(
+            cls.INSERTS[db.session.get_bind().dialect.name](table), table, key_columns
+        )
+
+        upserted = []
+
+        for start in range(0, len(rows), batch_size):
+            upserted.extend(
+                db.session.execute(
+                    statement, cls._get_params(table, rows[start:start + batch_size])
+                ).all()
+            )
+
+        return upserted
+
+    @staticmethod
+    def get_natural_key(table: db.Table) -> list:
+        """
+        Returns the columns identifying a row of a table: those of its unique index, or its primary key.
+
+        Args:
+            table (db.Table) - table
+
+        Returns:
+            (list[db.Column]) - natural key columns
+        """
+        for index in table.indexes:
+            if index.unique:
+                return list(index.columns)
+
+        return list(table.primary_key.columns)
+
+    @staticmethod
+    def _upsert_statement(statement, table: db.Table, key_columns: list):
+        """Helper method to add the ON CONFLICT clause of an upsert, returning the keys written."""
+        updated_columns = [
+            column
+            for column in table.columns
+            if not column.primary_key and column not in key_columns
+        ]
+
+        if not updated_columns:
+            return statement.on_conflict_do_nothing(index_elements=key_columns).returning(*key_columns)
+
+        return statement.on_conflict_do_update(
+            index_elements=key_columns,
+            set_={column.name: statement.excluded[column.name] for column in updated_columns},
+            where=db.or_(
+                *(column.is_distinct_from(statement.excluded[column.name]) for column in updated_columns)
+            ),
+        ).returning(*key_columns)
+
+    @staticmethod
+    def _copy_rows(table: db.Table, columns: list, rows: list[dict]) -> None:
+        """Helper method to stream rows into a PostgreSQL table with COPY, in the session's transaction."""
+        connection = db.session.connection()
+        preparer = connection.dialect.identifier_preparer
+        names = ", ".join(preparer.quote(column.name) for column in columns)
+
+        cursor = connection.connection.cursor()
+
+        try:
+            with cursor.copy(f"COPY {preparer.format_table(table)} ({names}) FROM STDIN") as copy:
+                for row in rows:
+                    copy.write_row(tuple(row[column.name] for column in columns))
+        finally:
+            cursor.close()
+
+    @classmethod
+    def _stage_rows(cls, table: db.Table, key_columns: list, rows: list[dict]):
+        """
+        Helper method to COPY rows into a temporary staging table shaped like table, emptied on commit.
+
+        Returns:
+            (Insert) - INSERT ... SELECT ... ON CONFLICT statement merging the staging table into table
+        """
+        columns = [column for column in table.columns if not column.primary_key or column in key_columns]
+        staging = db.Table(
+            f"{table.name}_staging",
+            db.MetaData(),
+            *(db.Column(column.name, column.type) for column in columns),
+            prefixes=["TEMPORARY"],
+            postgresql_on_commit="DELETE ROWS",
+        )
+
+        connection = db.session.connection()
+
+        # A table staged earlier in the transaction still holds its rows
+        staging.create(connection, checkfirst=True)
+        connection.execute(staging.delete())
+
+        cls._copy_rows(staging, list(staging.columns), [
+            {column.name: row.get(column.name) for column in columns} for row in rows
+        ])
+
+        statement = postgresql.insert(table).from_select(
+            [column.name for column in columns], db.select(*staging.columns)
+        )
+
+        return cls._upsert_statement(statement, table, key_columns)
+
+    @classmethod
+    def _use_copy(cls, rows: list[dict]) -> bool:
+        """Helper method to check if rows are enough to COPY, on a backend and driver that support it."""
+        if len(rows) < cls.COPY_MIN_ROWS:
+            return False
+
+        dialect = db.session.get_bind().dialect
+        return dialect.name == "postgresql" and dialect.driver == "psycopg"
+
+    @staticmethod
+    def _get_params(table: db.Table, rows: list[dict]) -> list[dict]:
+        """Helper method to give every row of a batch the same table columns, as executemany requires."""
+        names = {name for row in rows for name in row}
+        names = [column.name for column in table.columns if column.name in names]
+
+        return [{name: row.get(name) for name in names} for row in rows]
@@ -1,12 +1,25 @@
 # nba_stats_api_service.py
 
 from datetime import datetime, timedelta
-from statistics import mean
-import Levenshtein
+from functools import lru_cache, partial
+import hashlib
+import os
+import resource
+import sys
+import time
+from types import MappingProxyType
+import numpy as np
 import pandas as pd
+import requests
+from flask import current_app
 
+from app.markets import MARKET_STATS_MAPPING
 from app.models.nba_models import *
+from app.api_clients.fetch_scheduler import FetchScheduler
 from app.api_clients.nba_stats_api_client import NBAStatsAPIClient
+from app.services.box_scores_snapshot import BoxScoresSnapshot
+from app.services.bulk_writer import BulkWriter
+from app.services.player_name_resolver import PlayerNameResolver
 
 
 class NBAStatsAPIService:
@@ -22,12 +35,20 @@ class NBAStatsAPIService:
 
         update_team_box_scores
         update_player_box_scores
+        migrate_box_scores
+
+        initialize_box_scores_df
+        get_player_box_scores
+        get_market_totals_cache_info
 
         get_team_id
 
         get_player_ids
         get_player_team_id
+        get_player_team_ids
 
+        compute_prop_stats
+        compute_prop_stats_ladder
         calculate_last_n_games_hit_rate_stats
         calculate_h2h_hit_rate_stats
         calculate_season_hit_rate_stats
@@ -187,35 +208,98 @@ class NBAStatsAPIService:
         },
     ]
 
+    # Other names and abbreviations teams go by: historical NBA ones and those of other data sources
+    TEAM_ALIASES = {
+        1610612740: ["NOH", "NOK", "NO", "New Orleans Hornets", "New Orleans/Oklahoma City Hornets"],
+        1610612744: ["GS", "GOS"],
+        1610612746: ["LA Clippers"],
+        1610612751: ["NJN", "BRK", "New Jersey Nets"],
+        1610612752: ["NY"],
+        1610612756: ["PHO"],
+        1610612759: ["SA", "SAN"],
+        1610612760: ["SEA", "Seattle SuperSonics"],
+        1610612762: ["UTAH", "UTH"],
+        1610612763: ["VAN", "Vancouver Grizzlies"],
+        1610612764: ["WSH"],
+        1610612766: ["CHH", "CHO", "Charlotte Bobcats"],
+    }
+    team_ids = None
+    player_name_resolvers = None
+
     SEASON_TYPES = ["Regular Season", "IST", "PlayIn", "Playoffs"]
+
+    # Box scores model of each measure type
+    TEAM_BOX_SCORE_MODELS = {
+        "Base": TeamBoxScoreTraditional,
+        "Advanced": TeamBoxScoreAdvanced,
+        "Misc": TeamBoxScoreMiscellaneous,
+        "Scoring": TeamBoxScoreScoring,
+    }
+    PLAYER_BOX_SCORE_MODELS = {
+        "Base": PlayerBoxScoreTraditional,
+        "Advanced": PlayerBoxScoreAdvanced,
+        "Misc": PlayerBoxScoreMiscellaneous,
+        "Scoring": PlayerBoxScoreScoring,
+    }
+    LAST_N_GAMES_WINDOWS = {5: "five", 10: "ten", 20: "twenty", 30: "thirty"}
+    MARKET_TOTALS_CACHE_SIZE = 4096
     current_season = "2024-25"
     current_season_type_idx = 2
 
+    BOX_SCORES_LOAD_CHUNK_SIZE = 50_000
+    BOX_SCORES_STREAM_CHUNK_SIZE = 5_000
+    SQL_IN_CHUNK_SIZE = 500
+
+    TRACKING_LOADER = "player_tracking_box_scores"
+    TRACKING_BATCH_SIZE = 20_000
+
+    # First and last game day (regular season through the Finals) of each season
+    SEASON_DATES = {
+        "2013-14": [("10/29/2013", "06/15/2014")],
+        "2014-15": [("10/28/2014", "06/16/2015")],
+        "2015-16": [("10/27/2015", "06/19/2016")],
+        "2016-17": [("10/25/2016", "06/12/2017")],
+        "2017-18": [("10/17/2017", "06/08/2018")],
+        "2018-19": [("10/16/2018", "06/13/2019")],
+        # Suspended from March 12th, resumed in the bubble on July 30th
+        "2019-20": [("10/22/2019", "03/11/2020"), ("07/30/2020", "10/11/2020")],
+        "2020-21": [("12/22/2020", "07/20/2021")],
+        "2021-22": [("10/19/2021", "06/16/2022")],
+        "2022-23": [("10/18/2022", "06/12/2023")],
+        "2023-24": [("10/24/2023", "06/17/2024")],
+        "2024-25": [("10/22/2024", "06/22/2025")],
+    }
+
     player_box_scores_traditional = None
+    player_box_scores_index = None
+    box_scores_load_stats = None
+
+    # One row per (player, game) with a column per (period, stat) used by a market
+    player_games = None
+    player_games_index = None
+    player_game_stats = None
+    player_game_stat_columns = None
 
     @classmethod
     def load_teams(cls) -> None:
-        """Method to load all NBA teams into Team table."""
-        Team.__table__.drop(db.engine, checkfirst=True)
-        Team.__table__.create(db.engine)
-
-        for team_data in cls.TEAMS_DATA:
-            team = Team(
-                id=team_data["id"],
-                name=team_data["name"],
-                abbreviation=team_data["abbreviation"],
-            )
-            db.session.add(team)
+        """
+        Method to load all NBA teams into Team table. Teams are upserted, since box scores and props
+        reference them.
+        """
+        Team.__table__.create(db.engine, checkfirst=True)
 
+        BulkWriter.upsert(Team, cls.TEAMS_DATA)
         db.session.commit()
 
         print("Finished Loading Teams")
 
-    @staticmethod
-    def load_players() -> None:
-        """Method to load Players Index data into Player table."""
-        Player.__table__.drop(db.engine, checkfirst=True)
-        Player.__table__.create(db.engine)
+    @classmethod
+    def load_players(cls) -> None:
+        """
+        Method to load Players Index data into Player table. Players are upserted, since box scores and
+        props reference them.
+        """
+        Player.__table__.create(db.engine, checkfirst=True)
 
         # Fetch data from the NBA API
         json_data = NBAStatsAPIClient.get_players()
@@ -254,361 +338,345 @@ class NBAStatsAPIService:
             players_bulk_data.append(player_data)
 
         # Bulk insert the player data
-        db.session.bulk_insert_mappings(Player, players_bulk_data)
+        BulkWriter.upsert(Player, players_bulk_data)
         db.session.commit()
 
+        # Name resolvers are rebuilt from the new players on next use
+        cls.player_name_resolvers = None
+
         print("Finished Loading Players")
 
     @classmethod
     def load_team_box_scores(cls) -> None:
-        """Method to load Team Box Scores into db."""
-        TeamBoxScoreTraditional.__table__.drop(db.engine, checkfirst=True)
-        TeamBoxScoreTraditional.__table__.create(db.engine)
+        """
+        Method to load Team Box Scores into db. Rows are upserted, so a reload only rewrites changed rows
+        and the tables stay readable meanwhile.
+        """
+        TeamBoxScoreTraditional.__table__.create(db.engine, checkfirst=True)
 
-        TeamBoxScoreAdvanced.__table__.drop(db.engine, checkfirst=True)
-        TeamBoxScoreAdvanced.__table__.create(db.engine)
+        TeamBoxScoreAdvanced.__table__.create(db.engine, checkfirst=True)
 
-        TeamBoxScoreMiscellaneous.__table__.drop(db.engine, checkfirst=True)
-        TeamBoxScoreMiscellaneous.__table__.create(db.engine)
+        TeamBoxScoreMiscellaneous.__table__.create(db.engine, checkfirst=True)
 
-        TeamBoxScoreScoring.__table__.drop(db.engine, checkfirst=True)
-        TeamBoxScoreScoring.__table__.create(db.engine)
+        TeamBoxScoreScoring.__table__.create(db.engine, checkfirst=True)
 
         for year in range(2023, 2025):
             season = f"{year}-{str(year + 1)[-2:]}"
 
-            for season_type in cls.SEASON_TYPES:
-                for period in range(0, 10):
-                    if season_type == "Playoffs":
-                        playoff_rounds = range(1, 5)
-                    else:
-                        playoff_rounds = [None]
-
-                    for playoff_round in playoff_rounds:
-                        bulk_data = []
-
-                        # Fetch, Process and Load Traditional Team Box Scores
-                        trad = NBAStatsAPIClient.get_team_box_scores(
-                            "Base", season, season_type, period, playoff_round
-                        )
-
-                        if trad is None or len(trad["resultSets"][0]["rowSet"]) == 0:
-                            continue
-
-                        trad_headers = trad["resultSets"][0]["headers"]
-                        trad_box_scores = trad["resultSets"][0]["rowSet"]
+            for season_type, period, playoff_round in cls._get_box_score_groups():
+                for measure_type in ["Base", "Advanced", "Misc", "Scoring"]:
+                    box_score_chunks = NBAStatsAPIClient.stream_team_box_scores(
+                        measure_type,
+                        season,
+                        season_type,
+                        period,
+                        playoff_round,
+                        chunk_size=cls.BOX_SCORES_STREAM_CHUNK_SIZE,
+                    )
 
-                        trad_indices = {
-                            header: i for i, header in enumerate(trad_headers)
-                        }
+                    n_rows = 0
 
-                        for box_score in trad_box_scores:
-                            game_date = datetime.strptime(
-                                box_score[trad_indices["GAME_DATE"]],
-                                "%Y-%m-%dT%H:%M:%S",
-                            )
-                            matchup = box_score[trad_indices["MATCHUP"]]
-                            away_game = "@" in matchup
-
-                            opponent_team_abbr = matchup.split(" ")[-1]
-                            opponent_team_id = cls.get_team_id(abbr=opponent_team_abbr)
-
-                            bulk_data.append(
-                                TeamBoxScoreTraditional(
-                                    season_year=season,
-                                    season_type=season_type,
-                                    playoff_round=playoff_round,
-                                    team_id=box_score[trad_indices["TEAM_ID"]],
-                                    opponent_team_id=opponent_team_id,
-                                    game_id=box_score[trad_indices["GAME_ID"]],
-                                    game_date=game_date,
-                                    away_game=away_game,
-                                    win_loss=box_score[trad_indices["WL"]],
-                                    period=period,
-                                    minutes_played=box_score[trad_indices["MIN"]],
-                                    field_goals_made=box_score[trad_indices["FGM"]],
-                                    field_goals_attempted=box_score[
-                                        trad_indices["FGA"]
-                                    ],
-                                    field_goal_percentage=box_score[
-                                        trad_indices["FG_PCT"]
-                                    ],
-                                    three_point_field_goals_made=box_score[
-                                        trad_indices["FG3M"]
-                                    ],
-                                    three_point_field_goals_attempted=box_score[
-                                        trad_indices["FG3A"]
-                                    ],
-                                    three_point_field_goal_percentage=box_score[
-                                        trad_indices["FG3_PCT"]
-                                    ],
-                                    free_throws_made=box_score[trad_indices["FTM"]],
-                                    free_throws_attempted=box_score[
-                                        trad_indices["FTA"]
-                                    ],
-                                    free_throw_percentage=box_score[
-                                        trad_indices["FT_PCT"]
-                                    ],
-                                    offensive_rebounds=box_score[trad_indices["OREB"]],
-                                    defensive_rebounds=box_score[trad_indices["DREB"]],
-                                    rebounds=box_score[trad_indices["REB"]],
-                                    assists=box_score[trad_indices["AST"]],
-                                    turnovers=box_score[trad_indices["TOV"]],
-                                    steals=box_score[trad_indices["STL"]],
-                                    blocks=box_score[trad_indices["BLK"]],
-                                    block_attempts=box_score[trad_indices["BLKA"]],
-                                    personal_fouls=box_score[trad_indices["PF"]],
-                                    personal_fouls_drawn=box_score[trad_indices["PFD"]],
-                                    points=box_score[trad_indices["PTS"]],
-                                    plus_minus=box_score[trad_indices["PLUS_MINUS"]],
-                                )
+                    # Rows are parsed and saved chunk by chunk while the response is still being read.
+                    # If the body is cut off, the chunks saved so far are rolled back
+                    try:
+                        for box_scores in box_score_chunks or []:
+                            bulk_data = cls._parse_team_box_scores(
+                                box_scores, measure_type, season, season_type, period, playoff_round
                             )
 
-                        db.session.bulk_save_objects(bulk_data)
-                        db.session.commit()
-
-                        bulk_data.clear()
-
-                        # Advanced Team Box Scores
-                        adv = NBAStatsAPIClient.get_team_box_scores(
-                            "Advanced", season, season_type, period, playoff_round
-                        )
+                            BulkWriter.upsert(cls.TEAM_BOX_SCORE_MODELS[measure_type], bulk_data)
+                            n_rows += len(bulk_data)
+                    except (requests.RequestException, ValueError):
+                        db.session.rollback()
+                        print(f"rolled back team box scores of {(measure_type, season, season_type, period)}")
+                        continue
 
-                        if adv is None or len(adv["resultSets"][0]["rowSet"]) == 0:
-                            continue
+                    db.session.commit()
 
-                        adv_headers = adv["resultSets"][0]["headers"]
-                        adv_box_scores = adv["resultSets"][0]["rowSet"]
+                    # No games in this group, so the other measure types are empty too
+                    if n_rows == 0:
+                        break
 
-                        adv_indices = {
-                            header: i for i, header in enumerate(adv_headers)
-                        }
+    @classmethod
+    def _parse_team_box_scores(cls, box_scores: dict | None, measure_type: str, season: str,
+                               season_type: str, period: int, playoff_round: int) -> list:
+        """
+        Method to turn a teamgamelogs response into box score rows.
 
-                        for box_score in adv_box_scores:
-                            game_date = datetime.strptime(
-                                box_score[adv_indices["GAME_DATE"]], "%Y-%m-%dT%H:%M:%S"
-                            )
-                            matchup = box_score[trad_indices["MATCHUP"]]
-                            away_game = "@" in matchup
-
-                            opponent_team_abbr = matchup.split(" ")[-1]
-                            opponent_team_id = cls.get_team_id(abbr=opponent_team_abbr)
-
-                            bulk_data.append(
-                                TeamBoxScoreAdvanced(
-                                    season_year=season,
-                                    season_type=season_type,
-                                    playoff_round=playoff_round,
-                                    team_id=box_score[adv_indices["TEAM_ID"]],
-                                    opponent_team_id=opponent_team_id,
-                                    game_id=box_score[adv_indices["GAME_ID"]],
-                                    game_date=game_date,
-                                    away_game=away_game,
-                                    win_loss=box_score[adv_indices["WL"]],
-                                    period=period,
-                                    minutes_played=box_score[adv_indices["MIN"]],
-                                    offensive_rating=box_score[
-                                        adv_indices["OFF_RATING"]
-                                    ],
-                                    defensive_rating=box_score[
-                                        adv_indices["DEF_RATING"]
-                                    ],
-                                    net_rating=box_score[adv_indices["NET_RATING"]],
-                                    assist_percentage=box_score[adv_indices["AST_PCT"]],
-                                    assist_turnover_ratio=box_score[
-                                        adv_indices["AST_TO"]
-                                    ],
-                                    assist_ratio=box_score[adv_indices["AST_RATIO"]],
-                                    offensive_rebound_percentage=box_score[
-                                        adv_indices["OREB_PCT"]
-                                    ],
-                                    defensive_rebound_percentage=box_score[
-                                        adv_indices["DREB_PCT"]
-                                    ],
-                                    rebound_percentage=box_score[
-                                        adv_indices["REB_PCT"]
-                                    ],
-                                    turnover_percentage=box_score[
-                                        adv_indices["TM_TOV_PCT"]
-                                    ],
-                                    effective_field_goal_percentage=box_score[
-                                        adv_indices["EFG_PCT"]
-                                    ],
-                                    true_shooting_percentage=box_score[
-                                        adv_indices["TS_PCT"]
-                                    ],
-                                    pace=box_score[adv_indices["PACE"]],
-                                    player_impact_estimate=box_score[
-                                        adv_indices["PIE"]
-                                    ],
-                                )
-                            )
+        Args:
+            box_scores (dict or None) - json response of NBAStatsAPIClient.get_team_box_scores
+            measure_type (str) - Base (Traditional), Advanced, Misc, Scoring
+            season (str) - season year e.g. 2024-25
+            season_type (str) - Regular Season, IST, PlayIn, or Playoffs
+            period (int) - 0 (full game), 1 (1st Quarter), ...
+            playoff_round (int or None) - None, 1, 2, 3, 4
 
-                        db.session.bulk_save_objects(bulk_data)
-                        db.session.commit()
+        Returns:
+            (list[dict]) - row mappings of the table matching measure_type, see TEAM_BOX_SCORE_MODELS
+        """
+        bulk_data = []
 
-                        bulk_data.clear()
+        if box_scores is None or len(box_scores["resultSets"][0]["rowSet"]) == 0:
+            return bulk_data
 
-                        # Misc Team Box Scores
-                        misc = NBAStatsAPIClient.get_team_box_scores(
-                            "Misc", season, season_type, period, playoff_round
-                        )
+        headers = box_scores["resultSets"][0]["headers"]
+        rows = box_scores["resultSets"][0]["rowSet"]
 
-                        if misc is None or len(misc["resultSets"][0]["rowSet"]) == 0:
-                            continue
+        indices = {
+            header: i for i, header in enumerate(headers)
+        }
 
-                        misc_headers = misc["resultSets"][0]["headers"]
-                        misc_box_scores = misc["resultSets"][0]["rowSet"]
+        for box_score in rows:
+            game_date = datetime.strptime(
+                box_score[indices["GAME_DATE"]],
+                "%Y-%m-%dT%H:%M:%S",
+            ).date()
+            matchup = box_score[indices["MATCHUP"]]
+            away_game = "@" in matchup
 
-                        misc_indices = {
-                            header: i for i, header in enumerate(misc_headers)
-                        }
+            opponent_team_abbr = matchup.split(" ")[-1]
+            opponent_team_id = cls.get_team_id(abbr=opponent_team_abbr)
 
-                        for box_score in misc_box_scores:
-                            game_date = datetime.strptime(
-                                box_score[misc_indices["GAME_DATE"]],
-                                "%Y-%m-%dT%H:%M:%S",
-                            )
-                            matchup = box_score[misc_indices["MATCHUP"]]
-                            away_game = "@" in matchup
-
-                            opponent_team_abbr = matchup.split(" ")[-1]
-                            opponent_team_id = cls.get_team_id(abbr=opponent_team_abbr)
-
-                            bulk_data.append(
-                                TeamBoxScoreMiscellaneous(
-                                    season_year=season,
-                                    season_type=season_type,
-                                    playoff_round=playoff_round,
-                                    team_id=box_score[misc_indices["TEAM_ID"]],
-                                    opponent_team_id=opponent_team_id,
-                                    game_id=box_score[misc_indices["GAME_ID"]],
-                                    game_date=game_date,
-                                    away_game=away_game,
-                                    win_loss=box_score[misc_indices["WL"]],
-                                    period=period,
-                                    minutes_played=box_score[misc_indices["MIN"]],
-                                    points_off_turnovers=box_score[
-                                        misc_indices["PTS_OFF_TOV"]
-                                    ],
-                                    second_chance_points=box_score[
-                                        misc_indices["PTS_2ND_CHANCE"]
-                                    ],
-                                    fast_break_points=box_score[misc_indices["PTS_FB"]],
-                                    points_in_paint=box_score[
-                                        misc_indices["PTS_PAINT"]
-                                    ],
-                                )
-                            )
+            if measure_type == "Base":
+                bulk_data.append(
+                    dict(
+                        season_year=season,
+                        season_type=season_type,
+                        playoff_round=playoff_round,
+                        team_id=box_score[indices["TEAM_ID"]],
+                        opponent_team_id=opponent_team_id,
+                        game_id=box_score[indices["GAME_ID"]],
+                        game_date=game_date,
+                        away_game=away_game,
+                        win_loss=box_score[indices["WL"]],
+                        period=period,
+                        minutes_played=box_score[indices["MIN"]],
+                        field_goals_made=box_score[indices["FGM"]],
+                        field_goals_attempted=box_score[
+                            indices["FGA"]
+                        ],
+                        field_goal_percentage=box_score[
+                            indices["FG_PCT"]
+                        ],
+                        three_point_field_goals_made=box_score[
+                            indices["FG3M"]
+                        ],
+                        three_point_field_goals_attempted=box_score[
+                            indices["FG3A"]
+                        ],
+                        three_point_field_goal_percentage=box_score[
+                            indices["FG3_PCT"]
+                        ],
+                        free_throws_made=box_score[indices["FTM"]],
+                        free_throws_attempted=box_score[
+                            indices["FTA"]
+                        ],
+                        free_throw_percentage=box_score[
+                            indices["FT_PCT"]
+                        ],
+                        offensive_rebounds=box_score[indices["OREB"]],
+                        defensive_rebounds=box_score[indices["DREB"]],
+                        rebounds=box_score[indices["REB"]],
+                        assists=box_score[indices["AST"]],
+                        turnovers=box_score[indices["TOV"]],
+                        steals=box_score[indices["STL"]],
+                        blocks=box_score[indices["BLK"]],
+                        block_attempts=box_score[indices["BLKA"]],
+                        personal_fouls=box_score[indices["PF"]],
+                        personal_fouls_drawn=box_score[indices["PFD"]],
+                        points=box_score[indices["PTS"]],
+                        plus_minus=box_score[indices["PLUS_MINUS"]],
+                    )
+                )
+                continue
 
-                        db.session.bulk_save_objects(bulk_data)
-                        db.session.commit()
+            if measure_type == "Advanced":
+                bulk_data.append(
+                    dict(
+                        season_year=season,
+                        season_type=season_type,
+                        playoff_round=playoff_round,
+                        team_id=box_score[indices["TEAM_ID"]],
+                        opponent_team_id=opponent_team_id,
+                        game_id=box_score[indices["GAME_ID"]],
+                        game_date=game_date,
+                        away_game=away_game,
+                        win_loss=box_score[indices["WL"]],
+                        period=period,
+                        minutes_played=box_score[indices["MIN"]],
+                        offensive_rating=box_score[
+                            indices["OFF_RATING"]
+                        ],
+                        defensive_rating=box_score[
+                            indices["DEF_RATING"]
+                        ],
+                        net_rating=box_score[indices["NET_RATING"]],
+                        assist_percentage=box_score[indices["AST_PCT"]],
+                        assist_turnover_ratio=box_score[
+                            indices["AST_TO"]
+                        ],
+                        assist_ratio=box_score[indices["AST_RATIO"]],
+                        offensive_rebound_percentage=box_score[
+                            indices["OREB_PCT"]
+                        ],
+                        defensive_rebound_percentage=box_score[
+                            indices["DREB_PCT"]
+                        ],
+                        rebound_percentage=box_score[
+                            indices["REB_PCT"]
+                        ],
+                        turnover_percentage=box_score[
+                            indices["TM_TOV_PCT"]
+                        ],
+                        effective_field_goal_percentage=box_score[
+                            indices["EFG_PCT"]
+                        ],
+                        true_shooting_percentage=box_score[
+                            indices["TS_PCT"]
+                        ],
+                        pace=box_score[indices["PACE"]],
+                        player_impact_estimate=box_score[
+                            indices["PIE"]
+                        ],
+                    )
+                )
+                continue
 
-                        bulk_data.clear()
+            if measure_type == "Misc":
+                bulk_data.append(
+                    dict(
+                        season_year=season,
+                        season_type=season_type,
+                        playoff_round=playoff_round,
+                        team_id=box_score[indices["TEAM_ID"]],
+                        opponent_team_id=opponent_team_id,
+                        game_id=box_score[indices["GAME_ID"]],
+                        game_date=game_date,
+                        away_game=away_game,
+                        win_loss=box_score[indices["WL"]],
+                        period=period,
+                        minutes_played=box_score[indices["MIN"]],
+                        points_off_turnovers=box_score[
+                            indices["PTS_OFF_TOV"]
+                        ],
+                        second_chance_points=box_score[
+                            indices["PTS_2ND_CHANCE"]
+                        ],
+                        fast_break_points=box_score[indices["PTS_FB"]],
+                        points_in_paint=box_score[
+                            indices["PTS_PAINT"]
+                        ],
+                    )
+                )
+                continue
 
-                        # Scoring Team Box Scores
-                        scoring = NBAStatsAPIClient.get_team_box_scores(
-                            "Scoring", season, season_type, period, playoff_round
-                        )
+            if measure_type == "Scoring":
+                bulk_data.append(
+                    dict(
+                        season_year=season,
+                        season_type=season_type,
+                        playoff_round=playoff_round,
+                        team_id=box_score[indices["TEAM_ID"]],
+                        opponent_team_id=opponent_team_id,
+                        game_id=box_score[indices["GAME_ID"]],
+                        game_date=game_date,
+                        away_game=away_game,
+                        win_loss=box_score[indices["WL"]],
+                        period=period,
+                        minutes_played=box_score[indices["MIN"]],
+                        percent_field_goals_attempted_two_pointers=box_score[
+                            indices["PCT_FGA_2PT"]
+                        ],
+                        percent_field_goals_attempted_three_pointers=box_score[
+                            indices["PCT_FGA_3PT"]
+                        ],
+                        percent_points_two_pointers=box_score[
+                            indices["PCT_PTS_2PT"]
+                        ],
+                        percent_points_mid_range=box_score[
+                            indices["PCT_PTS_2PT_MR"]
+                        ],
+                        percent_points_three_pointers=box_score[
+                            indices["PCT_PTS_3PT"]
+                        ],
+                        percent_points_fast_break=box_score[
+                            indices["PCT_PTS_FB"]
+                        ],
+                        percent_points_free_throws=box_score[
+                            indices["PCT_PTS_FT"]
+                        ],
+                        percent_points_off_turnovers=box_score[
+                            indices["PCT_PTS_OFF_TOV"]
+                        ],
+                        percent_points_in_paint=box_score[
+                            indices["PCT_PTS_PAINT"]
+                        ],
+                        percent_two_point_field_goals_made_assisted=box_score[
+                            indices["PCT_AST_2PM"]
+                        ],
+                        percent_two_point_field_goals_made_unassisted=box_score[
+                            indices["PCT_UAST_2PM"]
+                        ],
+                        percent_three_point_field_goals_made_assisted=box_score[
+                            indices["PCT_AST_3PM"]
+                        ],
+                        percent_three_point_field_goals_made_unassisted=box_score[
+                            indices["PCT_UAST_3PM"]
+                        ],
+                        percent_field_goals_made_assisted=box_score[
+                            indices["PCT_AST_FGM"]
+                        ],
+                        percent_field_goals_made_unassisted=box_score[
+                            indices["PCT_UAST_FGM"]
+                        ],
+                    ))
+                continue
 
-                        if (
-                            scoring is None
-                            or len(scoring["resultSets"][0]["rowSet"]) == 0
-                        ):
-                            continue
+        return bulk_data
 
-                        scoring_headers = scoring["resultSets"][0]["headers"]
-                        scoring_box_scores = scoring["resultSets"][0]["rowSet"]
+    @classmethod
+    def _process_player_box_scores(cls, measure_type: str, season: str, season_type: str, period: int,
+                                   playoff_round: int, date_from=None):
+        """
+        Method to fetch player box scores and turn them into box score rows, one chunk of rows
+        at a time while the response is read.
 
-                        scoring_indices = {
-                            header: i for i, header in enumerate(scoring_headers)
-                        }
+        Yields:
+            (list[dict]) - row mappings of a chunk of rows
+        """
+        box_score_chunks = NBAStatsAPIClient.stream_player_box_scores(
+            measure_type,
+            season,
+            season_type,
+            period,
+            playoff_round,
+            date_from,
+            chunk_size=cls.BOX_SCORES_STREAM_CHUNK_SIZE,
+        )
 
-                        for box_score in scoring_box_scores:
-                            game_date = datetime.strptime(
-                                box_score[misc_indices["GAME_DATE"]],
-                                "%Y-%m-%dT%H:%M:%S",
-                            )
-                            matchup = box_score[scoring_indices["MATCHUP"]]
-                            away_game = "@" in matchup
-
-                            opponent_team_abbr = matchup.split(" ")[-1]
-                            opponent_team_id = cls.get_team_id(abbr=opponent_team_abbr)
-
-                            bulk_data.append(
-                                TeamBoxScoreScoring(
-                                    season_year=season,
-                                    season_type=season_type,
-                                    playoff_round=playoff_round,
-                                    team_id=box_score[scoring_indices["TEAM_ID"]],
-                                    opponent_team_id=opponent_team_id,
-                                    game_id=box_score[scoring_indices["GAME_ID"]],
-                                    game_date=game_date,
-                                    away_game=away_game,
-                                    win_loss=box_score[scoring_indices["WL"]],
-                                    period=period,
-                                    minutes_played=box_score[scoring_indices["MIN"]],
-                                    percent_field_goals_attempted_two_pointers=box_score[
-                                        scoring_indices["PCT_FGA_2PT"]
-                                    ],
-                                    percent_field_goals_attempted_three_pointers=box_score[
-                                        scoring_indices["PCT_FGA_3PT"]
-                                    ],
-                                    percent_points_two_pointers=box_score[
-                                        scoring_indices["PCT_PTS_2PT"]
-                                    ],
-                                    percent_points_mid_range=box_score[
-                                        scoring_indices["PCT_PTS_2PT_MR"]
-                                    ],
-                                    percent_points_three_pointers=box_score[
-                                        scoring_indices["PCT_PTS_3PT"]
-                                    ],
-                                    percent_points_fast_break=box_score[
-                                        scoring_indices["PCT_PTS_FB"]
-                                    ],
-                                    percent_points_free_throws=box_score[
-                                        scoring_indices["PCT_PTS_FT"]
-                                    ],
-                                    percent_points_off_turnovers=box_score[
-                                        scoring_indices["PCT_PTS_OFF_TOV"]
-                                    ],
-                                    percent_points_in_paint=box_score[
-                                        scoring_indices["PCT_PTS_PAINT"]
-                                    ],
-                                    percent_two_point_field_goals_made_assisted=box_score[
-                                        scoring_indices["PCT_AST_2PM"]
-                                    ],
-                                    percent_two_point_field_goals_made_unassisted=box_score[
-                                        scoring_indices["PCT_UAST_2PM"]
-                                    ],
-                                    percent_three_point_field_goals_made_assisted=box_score[
-                                        scoring_indices["PCT_AST_3PM"]
-                                    ],
-                                    percent_three_point_field_goals_made_unassisted=box_score[
-                                        scoring_indices["PCT_UAST_3PM"]
-                                    ],
-                                    percent_field_goals_made_assisted=box_score[
-                                        scoring_indices["PCT_AST_FGM"]
-                                    ],
-                                    percent_field_goals_made_unassisted=box_score[
-                                        scoring_indices["PCT_UAST_FGM"]
-                                    ],
-                                )
-                            )
+        for box_scores in box_score_chunks or []:
+            yield cls._parse_player_box_scores(
+                box_scores, measure_type, season, season_type, period, playoff_round
+            )
 
-                        db.session.bulk_save_objects(bulk_data)
-                        db.session.commit()
+    @classmethod
+    def _parse_player_box_scores(cls, box_scores: dict | None, measure_type: str, season: str,
+                                 season_type: str, period: int, playoff_round: int) -> list:
+        """
+        Method to turn a playergamelogs response into box score rows.
 
-                        bulk_data.clear()
+        Args:
+            box_scores (dict or None) - json response of NBAStatsAPIClient.get_player_box_scores
+            measure_type (str) - Base (Traditional), Advanced, Misc, Scoring
+            season (str) - season year e.g. 2024-25
+            season_type (str) - Regular Season, IST, PlayIn, or Playoffs
+            period (int) - 0 (full game), 1 (1st Quarter), ...
+            playoff_round (int or None) - None, 1, 2, 3, 4
 
-    @classmethod
-    def _process_player_box_scores(cls, measure_type: str, season: str, season_type: str, period: int,
-                                   playoff_round: int, date_from=None):
+        Returns:
+            (list[dict]) - row mappings of the table matching measure_type, see PLAYER_BOX_SCORE_MODELS
+        """
         bulk_data = []
-        
-        box_scores = NBAStatsAPIClient.get_player_box_scores(
-            measure_type, season, season_type, period, playoff_round, date_from
-        )
 
         if box_scores is None or len(box_scores["resultSets"][0]["rowSet"]) == 0:
             return bulk_data
@@ -624,7 +692,7 @@ class NBAStatsAPIService:
             game_date = datetime.strptime(
                 box_score[indices["GAME_DATE"]],
                 "%Y-%m-%dT%H:%M:%S",
-            ).strftime("%m/%d/%Y")
+            ).date()
             matchup = box_score[indices["MATCHUP"]]
             away_game = "@" in matchup
 
@@ -633,7 +701,7 @@ class NBAStatsAPIService:
 
             if measure_type == "Base":
                 bulk_data.append(
-                    PlayerBoxScoreTraditional(
+                    dict(
                         season_year=season,
                         season_type=season_type,
                         playoff_round=playoff_round,
@@ -690,7 +758,7 @@ class NBAStatsAPIService:
 
             if measure_type == "Advanced":
                 bulk_data.append(
-                    PlayerBoxScoreAdvanced(
+                    dict(
                         season_year=season,
                         season_type=season_type,
                         playoff_round=playoff_round,
@@ -742,7 +810,7 @@ class NBAStatsAPIService:
 
             if measure_type == "Misc":
                 bulk_data.append(
-                    PlayerBoxScoreMiscellaneous(
+                    dict(
                         season_year=season,
                         season_type=season_type,
                         playoff_round=playoff_round,
@@ -783,7 +851,7 @@ class NBAStatsAPIService:
 
             if measure_type == "Scoring":
                 bulk_data.append(
-                    PlayerBoxScoreScoring(
+                    dict(
                         season_year=season,
                         season_type=season_type,
                         playoff_round=playoff_round,
@@ -848,267 +916,1450 @@ class NBAStatsAPIService:
 
     @classmethod
     def load_player_box_scores(cls) -> None:
-        """Method to load Player Box Scores into db."""
-        PlayerBoxScoreTraditional.__table__.drop(db.engine, checkfirst=True)
-        PlayerBoxScoreTraditional.__table__.create(db.engine)
+        """
+        Method to load Player Box Scores into db. Rows are upserted, so a reload only rewrites changed
+        rows and the tables stay readable meanwhile.
+        """
+        PlayerBoxScoreTraditional.__table__.create(db.engine, checkfirst=True)
+
+        PlayerBoxScoreAdvanced.__table__.create(db.engine, checkfirst=True)
+
+        PlayerBoxScoreMiscellaneous.__table__.create(db.engine, checkfirst=True)
+
+        PlayerBoxScoreScoring.__table__.create(db.engine, checkfirst=True)
+
+        DataVersion.__table__.create(db.engine, checkfirst=True)
+
+        jobs = []
+
+        for year in range(2023, 2025):
+            season = f"{year}-{str(year + 1)[-2:]}"
+
+            for season_type, period, playoff_round in cls._get_box_score_groups():
+                jobs.append(("Base", season, season_type, period, playoff_round))
+
+                # Advanced, Misc and Scoring box scores are not loaded for now
+                # jobs.append(("Advanced", season, season_type, period, playoff_round))
+                # jobs.append(("Misc", season, season_type, period, playoff_round))
+                # jobs.append(("Scoring", season, season_type, period, playoff_round))
+
+        scheduler = cls._get_fetch_scheduler()
+
+        # Requests run concurrently; each response is parsed and loaded as soon as it arrives. Responses
+        # are read by this thread, so the scheduler keeps at most max_workers of them open
+        stream_player_box_scores = partial(
+            NBAStatsAPIClient.stream_player_box_scores,
+            chunk_size=cls.BOX_SCORES_STREAM_CHUNK_SIZE,
+        )
+
+        failed_jobs = []
+
+        for job, box_score_chunks in scheduler.run(stream_player_box_scores, jobs, streamed=True):
+            measure_type, season, season_type, period, playoff_round = job
+
+            # Rows are parsed and saved chunk by chunk while the response is still being read.
+            # If the body is cut off, the chunks saved so far are rolled back
+            try:
+                for box_scores in box_score_chunks or []:
+                    bulk_data = cls._parse_player_box_scores(
+                        box_scores, measure_type, season, season_type, period, playoff_round
+                    )
+
+                    cls._upsert_player_box_scores(measure_type, bulk_data)
+            except (requests.RequestException, ValueError):
+                db.session.rollback()
+                failed_jobs.append(job)
+                print(f"rolled back player box scores of {job}")
+                continue
+
+            db.session.commit()
+
+        print(f"finished loading player box scores ({len(jobs)} requests, {len(failed_jobs)} failed)")
+
+    @classmethod
+    def _upsert_player_box_scores(cls, measure_type: str, bulk_data: list[dict]) -> list:
+        """
+        Method to upsert player box score rows. If any row was inserted or changed, the data version of
+        the table is bumped in the same transaction, so snapshots of it are detected as stale.
+
+        Args:
+            measure_type (str) - measure type of the rows e.g. Base
+            bulk_data (list[dict]) - box score rows
+
+        Returns:
+            (list) - natural keys of the rows inserted or changed
+        """
+        model = cls.PLAYER_BOX_SCORE_MODELS[measure_type]
+        upserted = BulkWriter.upsert(model, bulk_data)
+
+        if upserted:
+            cls._bump_data_version(model.__table__)
+
+        return upserted
+
+    @staticmethod
+    def _bump_data_version(table: db.Table, connection=None) -> None:
+        """
+        Helper method to bump the data version of a table, in the transaction of the session or of
+        connection. The DataVersion table must exist already.
+        """
+        versions = DataVersion.__table__
+        statement = BulkWriter.INSERTS[db.engine.dialect.name](versions).values(
+            table_name=table.name, version=1
+        )
+
+        (connection or db.session).execute(
+            statement.on_conflict_do_update(
+                index_elements=[versions.c.table_name],
+                set_={"version": versions.c.version + 1},
+            )
+        )
+
+    @classmethod
+    def _get_box_score_groups(cls) -> list[tuple]:
+        """
+        Helper method to list the groups box scores are fetched by within a season.
+
+        Returns:
+            (list[tuple]) - (season_type, period, playoff_round) of every group
+        """
+        groups = []
+
+        for season_type in cls.SEASON_TYPES:
+            for period in range(0, 10):
+                if season_type == "Playoffs":
+                    playoff_rounds = range(1, 5)
+                else:
+                    playoff_rounds = [None]
+
+                for playoff_round in playoff_rounds:
+                    groups.append((season_type, period, playoff_round))
+
+        return groups
+
+    @staticmethod
+    def _get_fetch_scheduler() -> FetchScheduler:
+        """Helper method to create a FetchScheduler with the stats.nba.com limits of the app config."""
+        return FetchScheduler(
+            max_workers=current_app.config.get("NBA_STATS_API_MAX_WORKERS", 8),
+            requests_per_second=current_app.config.get("NBA_STATS_API_REQUESTS_PER_SECOND", 4.0),
+        )
+
+    @classmethod
+    def load_player_tracking_box_scores(cls, restart: bool = False) -> None:
+        """
+        Method to backfill Passing and Rebounding tracking box scores, with one request per measure type
+        and game day from 10/29/2013 through yesterday. Offseason days are skipped.
+
+        Days are fetched concurrently and their rows inserted in large batches. Each batch is committed
+        together with checkpoints of the days it completes, so an interrupted backfill resumes where it
+        stopped instead of starting over.
+
+        Args:
+            restart (bool) - drop the tracking tables and checkpoints and backfill from scratch
+        """
+        start_time = time.perf_counter()
+
+        if restart:
+            PlayerBoxScoreRebounding.__table__.drop(db.engine, checkfirst=True)
+            PlayerBoxScorePassing.__table__.drop(db.engine, checkfirst=True)
+
+        PlayerBoxScoreRebounding.__table__.create(db.engine, checkfirst=True)
+        PlayerBoxScorePassing.__table__.create(db.engine, checkfirst=True)
+        LoaderCheckpoint.__table__.create(db.engine, checkfirst=True)
+
+        if restart:
+            LoaderCheckpoint.query.filter_by(loader=cls.TRACKING_LOADER).delete()
+            db.session.commit()
+
+        completed_days = {
+            checkpoint.key
+            for checkpoint in LoaderCheckpoint.query.filter_by(loader=cls.TRACKING_LOADER)
+        }
+
+        # Today's games are not over yet, so stop at yesterday
+        game_days = [
+            game_day
+            for game_day in cls._get_game_days(
+                datetime.strptime("10/29/2013", "%m/%d/%Y"),
+                datetime.today() - timedelta(days=1),
+            )
+            if game_day not in completed_days
+        ]
+
+        measure_types = {"Passing": PlayerBoxScorePassing, "Rebounding": PlayerBoxScoreRebounding}
+
+        jobs = [
+            (measure_type, game_day, game_day)
+            for game_day in game_days
+            for measure_type in measure_types
+        ]
+
+        # Rows of a day are held back until every measure type of the day is fetched, so a batch
+        # never holds part of a day
+        pending_rows = {game_day: [] for game_day in game_days}
+        batch_rows = {model: [] for model in measure_types.values()}
+        batch_days = []
+        failed_days = []
+        n_batch_rows = 0
+
+        for job, box_scores in cls._get_fetch_scheduler().run(
+            NBAStatsAPIClient.get_player_tracking_box_scores, jobs
+        ):
+            measure_type, game_day, _ = job
+
+            # A failed request leaves None, so the day is left unchecked and refetched on resume
+            pending_rows[game_day].append(
+                None
+                if box_scores is None
+                else (
+                    measure_types[measure_type],
+                    cls._parse_player_tracking_box_scores(box_scores, measure_type, game_day),
+                )
+            )
+
+            if len(pending_rows[game_day]) < len(measure_types):
+                continue
+
+            day_rows = pending_rows.pop(game_day)
+
+            if None in day_rows:
+                failed_days.append(game_day)
+                continue
+
+            for model, rows in day_rows:
+                batch_rows[model].extend(rows)
+                n_batch_rows += len(rows)
+
+            batch_days.append(game_day)
+
+            if n_batch_rows >= cls.TRACKING_BATCH_SIZE:
+                cls._save_player_tracking_batch(batch_rows, batch_days)
+                n_batch_rows = 0
+
+        cls._save_player_tracking_batch(batch_rows, batch_days)
+
+        print(
+            f"finished loading player tracking box scores of {len(game_days) - len(failed_days)} days "
+            f"({len(completed_days)} already loaded, {len(failed_days)} failed) "
+            f"in {time.perf_counter() - start_time:.2f}s"
+        )
+
+    @classmethod
+    def _save_player_tracking_batch(cls, batch_rows: dict, batch_days: list) -> None:
+        """
+        Method to insert a batch of tracking box scores and checkpoint the days it completes, in one
+        transaction. The batch is emptied afterwards.
+
+        Args:
+            batch_rows (dict) - model -> list of row mappings
+            batch_days (list) - game days whose rows are all in the batch
+
+        Returns:
+            None
+        """
+        # Upserted, since days completed after the last checkpoint of an interrupted backfill are refetched
+        for model, rows in batch_rows.items():
+            BulkWriter.upsert(model, rows)
+            rows.clear()
+
+        BulkWriter.insert(
+            LoaderCheckpoint,
+            [{"loader": cls.TRACKING_LOADER, "key": game_day} for game_day in batch_days],
+        )
+        db.session.commit()
+
+        if batch_days:
+            print(f"loaded player tracking box scores of {len(batch_days)} days")
+
+        batch_days.clear()
+
+    @staticmethod
+    def _parse_player_tracking_box_scores(box_scores: dict | None, measure_type: str, game_date: str) -> list[dict]:
+        """
+        Method to turn a leaguedashptstats response of a single day into row mappings.
+
+        Args:
+            box_scores (dict or None) - json response of NBAStatsAPIClient.get_player_tracking_box_scores
+            measure_type (str) - Passing or Rebounding
+            game_date (str) - e.g. 10/03/2024
+
+        Returns:
+            (list[dict]) - row mappings of the table matching measure_type
+        """
+        if box_scores is None or len(box_scores["resultSets"][0]["rowSet"]) == 0:
+            return []
+
+        headers = box_scores["resultSets"][0]["headers"]
+        rows = box_scores["resultSets"][0]["rowSet"]
+
+        indices = {
+            header: i for i, header in enumerate(headers)
+        }
+
+        game_date = datetime.strptime(game_date, "%m/%d/%Y").date()
+
+        if measure_type == "Rebounding":
+            return [
+                {
+                    "player_id": box_score[indices["PLAYER_ID"]],
+                    "game_date": game_date,
+
+                    # Defensive Rebounds
+                    "contested_defensive_rebounds": box_score[indices["DREB_CONTEST"]],
+                    "contested_defensive_rebound_percentage": box_score[indices["DREB_CONTEST_PCT"]],
+                    "defensive_rebound_chances": box_score[indices["DREB_CHANCES"]],
+                    "defensive_rebound_chance_percentage": box_score[indices["DREB_CHANCE_PCT"]],
+                    "deferred_defensive_rebound_chances": box_score[indices["DREB_CHANCE_DEFER"]],
+                    "adjusted_defensive_rebound_chance_percentage": box_score[indices["DREB_CHANCE_PCT_ADJ"]],
+                    "average_defensive_rebound_distance": box_score[indices["AVG_DREB_DIST"]],
+
+                    # Offensive Rebounds
+                    "contested_offensive_rebounds": box_score[indices["OREB_CONTEST"]],
+                    "contested_offensive_rebound_percentage": box_score[indices["OREB_CONTEST_PCT"]],
+                    "offensive_rebound_chances": box_score[indices["OREB_CHANCES"]],
+                    "offensive_rebound_chance_percentage": box_score[indices["OREB_CHANCE_PCT"]],
+                    "deferred_offensive_rebound_chances": box_score[indices["OREB_CHANCE_DEFER"]],
+                    "adjusted_offensive_rebound_chance_percentage": box_score[indices["OREB_CHANCE_PCT_ADJ"]],
+                    "average_offensive_rebound_distance": box_score[indices["AVG_OREB_DIST"]],
+                }
+                for box_score in rows
+            ]
+
+        return [
+            {
+                "player_id": box_score[indices["PLAYER_ID"]],
+                "game_date": game_date,
+                "passes_made": box_score[indices["PASSES_MADE"]],
+                "passes_received": box_score[indices["PASSES_RECEIVED"]],
+                "ft_assists": box_score[indices["FT_AST"]],
+                "secondary_assists": box_score[indices["SECONDARY_AST"]],
+                "potential_assists": box_score[indices["POTENTIAL_AST"]],
+                "assist_points_created": box_score[indices["AST_PTS_CREATED"]],
+                "assist_to_pass_percentage": box_score[indices["AST_TO_PASS_PCT"]],
+                "adjusted_assist_to_pass_percentage": box_score[indices["AST_TO_PASS_PCT_ADJ"]],
+            }
+            for box_score in rows
+        ]
+
+    @classmethod
+    def _get_game_days(cls, start_date: datetime, end_date: datetime) -> list[str]:
+        """
+        Helper method to list the in-season days between two dates. Seasons missing from SEASON_DATES
+        are assumed to run from mid October through June.
+
+        Args:
+            start_date (datetime) - first day
+            end_date (datetime) - last day
+
+        Returns:
+            (list[str]) - in-season days e.g. 10/03/2024, in order
+        """
+        game_days = []
+
+        for year in range(start_date.year - 1, end_date.year + 1):
+            season = f"{year}-{str(year + 1)[-2:]}"
+            date_ranges = cls.SEASON_DATES.get(season, [(f"10/15/{year}", f"06/30/{year + 1}")])
+
+            for range_start, range_end in date_ranges:
+                current_date = max(datetime.strptime(range_start, "%m/%d/%Y"), start_date)
+                range_end = min(datetime.strptime(range_end, "%m/%d/%Y"), end_date)
+
+                while current_date <= range_end:
+                    game_days.append(current_date.strftime("%m/%d/%Y"))
+                    current_date += timedelta(days=1)
+
+        return game_days
+
+    @classmethod
+    def initialize_box_scores_df(cls):
+        """
+        Function for to load relevant player box scores into pandas df for player props hr calculations.
+        Rows are streamed from the db straight into typed numpy columns, without building ORM objects.
+
+        If a snapshot of the same table is on disk, the df and the player game matrix are loaded from it
+        instead of querying the db, and a fresh snapshot is written whenever they are built from the db.
+        With BOX_SCORES_SHARED_MEMORY, the snapshot is memory-mapped read-only, so every worker process
+        on the host attaches to a single copy of the arrays.
+        """
+        start_time = time.perf_counter()
+
+        fingerprint = cls._get_box_scores_fingerprint()
+        snapshot_path = cls._get_box_scores_snapshot_path()
+        shared_memory = snapshot_path is not None and current_app.config.get(
+            "BOX_SCORES_SHARED_MEMORY", False
+        )
+
+        snapshot = None
+
+        if snapshot_path is not None:
+            snapshot = BoxScoresSnapshot.read(snapshot_path, fingerprint, mmap=shared_memory)
+
+        source = "snapshot" if snapshot is not None else "db"
+
+        if snapshot is None:
+            cls.player_box_scores_traditional = cls._sort_box_scores_df(
+                cls._compact_box_scores_df(
+                    cls._read_box_scores_columns(PlayerBoxScoreTraditional.__table__)
+                )
+            )
+            cls._build_player_game_matrix()
+
+            if snapshot_path is not None:
+                cls._save_box_scores_snapshot(snapshot_path, fingerprint, shared_memory)
+        else:
+            cls._use_box_scores_snapshot(snapshot)
+
+        cls._build_box_scores_index()
+
+        # Cached market totals were computed from the previous box scores
+        cls._get_cached_market_totals.cache_clear()
+
+        # ru_maxrss is the high-water mark of the process, in KB on Linux and bytes on macOS
+        peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        peak_memory *= 1 if sys.platform == "darwin" else 2**10
+
+        cls.box_scores_load_stats = {
+            "source": source,
+            "shared_memory": shared_memory,
+            "rows": len(cls.player_box_scores_traditional),
+            "seconds": time.perf_counter() - start_time,
+            "peak_memory_mb": peak_memory / 2**20,
+            "df_memory_mb": cls.player_box_scores_traditional.memory_usage(deep=True).sum() / 2**20,
+        }
+
+        print(
+            f"loaded {cls.box_scores_load_stats['rows']} player box scores from {source} in "
+            f"{cls.box_scores_load_stats['seconds']:.2f}s "
+            f"(peak memory {cls.box_scores_load_stats['peak_memory_mb']:.1f} MB, "
+            f"df memory {cls.box_scores_load_stats['df_memory_mb']:.1f} MB"
+            f"{', shared' if shared_memory else ''})"
+        )
+
+    @classmethod
+    def _save_box_scores_snapshot(cls, snapshot_path: str, fingerprint: str, shared_memory: bool) -> None:
+        """
+        Method to snapshot the box scores df and the player game matrix. With shared memory, the private
+        copies are then swapped for the memory-mapped snapshot.
+
+        Args:
+            snapshot_path (str) - snapshot directory
+            fingerprint (str) - fingerprint of the player box scores table
+            shared_memory (bool) - attach to the memory-mapped snapshot
+
+        Returns:
+            None
+        """
+        try:
+            cls._write_box_scores_snapshot(snapshot_path, fingerprint)
+        except OSError as e:
+            print(f"Error writing box scores snapshot: {e}")
+            return
+
+        if shared_memory:
+            snapshot = BoxScoresSnapshot.read(snapshot_path, fingerprint, mmap=True)
+
+            if snapshot is not None:
+                cls._use_box_scores_snapshot(snapshot)
+
+    @classmethod
+    def _use_box_scores_snapshot(cls, snapshot: dict) -> None:
+        """
+        Method to use the box scores df and the player game matrix of a snapshot.
+
+        Args:
+            snapshot (dict) - snapshot returned by BoxScoresSnapshot.read
+
+        Returns:
+            None
+        """
+        cls.player_box_scores_traditional = snapshot["frames"]["player_box_scores_traditional"]
+        cls.player_games = snapshot["frames"]["player_games"]
+        cls.player_game_stats = snapshot["arrays"]["player_game_stats"]
+        cls.player_game_stat_columns = {
+            tuple(column): j
+            for j, column in enumerate(snapshot["attributes"]["player_game_stat_columns"])
+        }
+
+    @classmethod
+    def _write_box_scores_snapshot(cls, snapshot_path: str, fingerprint: str) -> None:
+        """
+        Method to write the box scores df and the player game matrix to a snapshot.
+
+        Args:
+            snapshot_path (str) - snapshot directory
+            fingerprint (str) - fingerprint of the player box scores table
+
+        Returns:
+            None
+        """
+        BoxScoresSnapshot.write(
+            snapshot_path,
+            fingerprint,
+            frames={
+                "player_box_scores_traditional": cls.player_box_scores_traditional,
+                "player_games": cls.player_games,
+            },
+            arrays={"player_game_stats": cls.player_game_stats},
+            attributes={
+                "player_game_stat_columns": [
+                    list(column) for column in cls.player_game_stat_columns
+                ],
+            },
+        )
+
+    @staticmethod
+    def _get_box_scores_snapshot_path() -> str | None:
+        """
+        Method to get the snapshot directory of the player box scores df from the app config.
+
+        Returns:
+            (str or None) - snapshot directory, or None if snapshots are disabled
+        """
+        if not current_app.config.get("BOX_SCORES_SNAPSHOT_ENABLED", False):
+            return None
+
+        snapshot_dir = current_app.config.get("BOX_SCORES_SNAPSHOT_DIR") or os.path.join(
+            current_app.instance_path, "snapshots"
+        )
+
+        return os.path.join(snapshot_dir, PlayerBoxScoreTraditional.__tablename__)
+
+    @staticmethod
+    def _get_box_scores_fingerprint() -> str:
+        """
+        Method to fingerprint the player box scores table, so a snapshot of an older version of the
+        table is detected as stale. Rows are upserted in place, so the data version bumped with every
+        change by _upsert_player_box_scores is what catches stat corrections.
+
+        Returns:
+            (str) - hash of the table columns, row count, max id and data version
+        """
+        table = PlayerBoxScoreTraditional.__table__
+        DataVersion.__table__.create(db.engine, checkfirst=True)
+
+        summary = db.session.execute(
+            db.select(
+                db.func.count(),
+                db.func.max(table.c.id),
+                db.select(DataVersion.version)
+                .where(DataVersion.table_name == table.name)
+                .scalar_subquery(),
+            )
+        ).one()
+
+        return hashlib.sha256(
+            repr((list(table.columns.keys()), tuple(summary))).encode()
+        ).hexdigest()
+
+    @classmethod
+    def _read_box_scores_columns(cls, table: db.Table, where=None) -> pd.DataFrame:
+        """
+        Method to stream the rows of a box scores table into preallocated numpy columns.
+
+        Args:
+            table (db.Table) - box scores table
+            where (db.ColumnElement or None) - filter of the rows to read; None for every row
+
+        Returns:
+            (pd.DataFrame) - df with a column per table column, typed by _column_dtype
+        """
+        count_query = db.select(db.func.count()).select_from(table)
+        rows_query = db.select(table)
+
+        if where is not None:
+            count_query = count_query.where(where)
+            rows_query = rows_query.where(where)
+
+        with db.engine.connect() as connection:
+            n_rows = connection.execute(count_query).scalar()
+
+            columns = {
+                column.name: np.empty(n_rows, dtype=cls._column_dtype(column))
+                for column in table.columns
+            }
+            arrays = list(columns.values())
+
+            result = connection.execution_options(
+                stream_results=True, yield_per=cls.BOX_SCORES_LOAD_CHUNK_SIZE
+            ).execute(rows_query)
+
+            n_loaded = 0
+
+            for rows in result.partitions():
+                stop = n_loaded + len(rows)
+
+                # Rows inserted after counting; grow the columns to fit them
+                if stop > len(arrays[0]):
+                    arrays = [
+                        np.concatenate((array, np.empty(stop - len(array), array.dtype)))
+                        for array in arrays
+                    ]
+
+                for array, values in zip(arrays, zip(*rows)):
+                    array[n_loaded:stop] = values
+
+                n_loaded = stop
+
+        return pd.DataFrame(
+            {name: array[:n_loaded] for name, array in zip(columns, arrays)}
+        )
+
+    @staticmethod
+    def _column_dtype(column: db.Column) -> np.dtype:
+        """
+        Helper method to pick the numpy dtype used to hold a table column in memory.
+
+        Args:
+            column (db.Column) - table column
+
+        Returns:
+            (np.dtype) - int64 or bool for non-null integers and booleans, float64 for floats and
+                nullable integers (None becomes NaN), object for strings
+        """
+        if isinstance(column.type, db.Boolean):
+            return np.dtype(bool)
+
+        if isinstance(column.type, db.Integer):
+            return np.dtype(np.float64 if column.nullable else np.int64)
+
+        if isinstance(column.type, db.Float):
+            return np.dtype(np.float64)
+
+        return np.dtype(object)
+
+    @staticmethod
+    def _compact_box_scores_df(box_scores_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Helper method to shrink the in-memory box scores df: repeated strings become categoricals,
+        game dates become datetime64, game ids become integer keys and integers use the smallest dtype
+        that fits the data.
+
+        Args:
+            box_scores_df (pd.DataFrame) - box scores as read from the db
+
+        Returns:
+            (pd.DataFrame) - compacted box scores df
+        """
+        compact_columns = {}
+
+        for name, values in box_scores_df.items():
+            if name in ["season_year", "season_type", "win_loss"]:
+                compact_columns[name] = values.astype("category")
+            elif name == "game_date":
+                compact_columns[name] = pd.to_datetime(values)
+            elif name == "game_id":
+                # e.g. "0022400123" -> 22400123
+                compact_columns[name] = values.astype(np.int32)
+            elif pd.api.types.is_integer_dtype(values):
+                compact_columns[name] = pd.to_numeric(values, downcast="integer")
+            elif name == "playoff_round" or name.endswith("percentage") or name == "minutes_played":
+                compact_columns[name] = values.astype(np.float32)
+            else:
+                # Float stats summed into market totals (e.g. nba_fantasy_points) keep full precision
+                compact_columns[name] = values
+
+        return pd.DataFrame(compact_columns)
+
+    @staticmethod
+    def _sort_box_scores_df(box_scores_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Helper method to sort the box scores df by player, period and game date (descending),
+        so the rows of each player and each (player, period) pair are contiguous.
+
+        Args:
+            box_scores_df (pd.DataFrame) - box scores df
+
+        Returns:
+            (pd.DataFrame) - sorted box scores df
+        """
+        order = np.lexsort(
+            (
+                -box_scores_df["game_date"].to_numpy().astype("int64"),
+                box_scores_df["period"].to_numpy(),
+                box_scores_df["player_id"].to_numpy(),
+            )
+        )
+
+        return box_scores_df.iloc[order].reset_index(drop=True)
+
+    @classmethod
+    def _build_box_scores_index(cls) -> None:
+        """
+        Method to index the contiguous row ranges of each player and each (player, period) pair in the
+        sorted box scores df, and of each player in the player game matrix.
+        """
+        box_scores_df = cls.player_box_scores_traditional
+
+        player_ids = box_scores_df["player_id"].to_numpy()
+        periods = box_scores_df["period"].to_numpy()
+
+        # Row ranges of each (player, period) group
+        starts, stops = cls._group_boundaries(player_ids, periods)
+
+        index = {}
+
+        for start, stop in zip(starts, stops):
+            player_id = int(player_ids[start])
+            index[(player_id, int(periods[start]))] = slice(start, stop)
+
+            # Rows of a player are contiguous, so extend the player's range to this group
+            player_rows = index.get(player_id)
+            index[player_id] = slice(
+                start if player_rows is None else player_rows.start, stop
+            )
+
+        cls.player_box_scores_index = index
+
+        game_player_ids = cls.player_games["player_id"].to_numpy()
+        starts, stops = cls._group_boundaries(game_player_ids)
+
+        cls.player_games_index = {
+            int(game_player_ids[start]): slice(start, stop)
+            for start, stop in zip(starts, stops)
+        }
+
+    @classmethod
+    def _build_player_game_matrix(cls) -> None:
+        """
+        Method to pivot the sorted box scores df into a matrix with one row per (player, game) and a
+        column per (period, stat) used by a market, so multi-period market totals are a single row sum.
+        Rows follow the order of the full game box scores: by player, then game date descending.
+        """
+        (
+            cls.player_games,
+            cls.player_game_stats,
+            cls.player_game_stat_columns,
+        ) = cls._pivot_player_games(cls.player_box_scores_traditional)
+
+    @staticmethod
+    def _pivot_player_games(box_scores_df: pd.DataFrame) -> tuple[pd.DataFrame, np.ndarray, dict]:
+        """
+        Helper method to pivot sorted box scores into the player game matrix.
+
+        Args:
+            box_scores_df (pd.DataFrame) - box scores sorted by player, period and game date descending
+
+        Returns:
+            (tuple[pd.DataFrame, np.ndarray, dict]) - player games df, stats matrix and the matrix
+                column of each (period, stat)
+        """
+        stat_columns = sorted(
+            {
+                (period, stat)
+                for market_stats in MARKET_STATS_MAPPING.values()
+                for period, stat_categories in market_stats
+                for stat in stat_categories
+            }
+        )
+
+        # Full game box scores define which games the player has played; a game stored under two season
+        # types (e.g. an IST game also in the Regular Season) is one game
+        games_df = (
+            box_scores_df[box_scores_df["period"] == 0]
+            .drop_duplicates(subset=["player_id", "game_id"])
+            .reset_index(drop=True)
+        )
+        game_keys = games_df[["player_id", "game_id"]]
+
+        stats = np.zeros((len(games_df), len(stat_columns)), dtype=np.float64)
+
+        for period in sorted({period for period, _ in stat_columns}):
+            js = [j for j, column in enumerate(stat_columns) if column[0] == period]
+            stat_categories = [stat_columns[j][1] for j in js]
+
+            if period == 0:
+                period_stats = games_df[stat_categories]
+            else:
+                # Align the period box scores to the full game rows; missing periods count as 0
+                period_df = box_scores_df[box_scores_df["period"] == period].drop_duplicates(
+                    subset=["player_id", "game_id"]
+                )
+                period_stats = game_keys.merge(
+                    period_df[["player_id", "game_id", *stat_categories]],
+                    how="left",
+                    on=["player_id", "game_id"],
+                )[stat_categories].fillna(0)
+
+            stats[:, js] = period_stats.to_numpy(dtype=np.float64)
+
+        player_games = games_df[
+            ["player_id", "game_id", "game_date", "season_year", "opponent_team_id"]
+        ]
+
+        return player_games, stats, {column: j for j, column in enumerate(stat_columns)}
+
+    @staticmethod
+    def _group_boundaries(*keys: np.ndarray) -> tuple[list[int], list[int]]:
+        """
+        Helper method to find the row ranges of consecutive equal keys in sorted arrays.
+
+        Args:
+            keys (np.ndarray) - sorted key arrays of equal length
+
+        Returns:
+            (tuple[list[int], list[int]]) - start and stop positions of each group
+        """
+        n = len(keys[0])
+
+        if n == 0:
+            return [], []
+
+        changed = np.zeros(n - 1, dtype=bool)
+
+        for key in keys:
+            changed |= key[1:] != key[:-1]
+
+        boundaries = np.flatnonzero(changed) + 1
+
+        return np.r_[0, boundaries].tolist(), np.r_[boundaries, n].tolist()
+
+    @classmethod
+    def get_player_box_scores(cls, player_id: int, period: int = None) -> pd.DataFrame:
+        """
+        Method to get a player's box scores from the indexed box scores df.
+
+        Args:
+            player_id (int) - id of player
+            period (int or None) - period of box scores; None for every period
+
+        Returns:
+            (pd.DataFrame) - the player's box scores sorted by period and game date descending;
+                empty if the player has no box scores.
+        """
+        key = player_id if period is None else (player_id, period)
+        rows = cls.player_box_scores_index.get(key, slice(0, 0))
+
+        return cls.player_box_scores_traditional.iloc[rows]
+
+    @classmethod
+    def update_team_box_scores(cls) -> None:
+        """
+        Method to load the team box scores of the current season's games played since the last load.
+        Games on the latest stored date of each group are refetched too, since they may not have been
+        final at the last load.
+        """
+        start_time = time.perf_counter()
+
+        latest_game_dates = cls._get_latest_game_dates(TeamBoxScoreTraditional, cls.current_season)
+        date_to = datetime.today().strftime("%m/%d/%Y")
+
+        jobs = [
+            (
+                "Base",
+                cls.current_season,
+                season_type,
+                period,
+                playoff_round,
+                latest_game_dates.get((season_type, period, playoff_round)),
+                date_to,
+            )
+            for season_type, period, playoff_round in cls._get_box_score_groups()
+        ]
+
+        scheduler = cls._get_fetch_scheduler()
+        updated_game_ids = set()
+
+        while jobs:
+            next_jobs = []
+
+            for job, box_scores in scheduler.run(NBAStatsAPIClient.get_team_box_scores, jobs):
+                measure_type, season, season_type, period, playoff_round, _, _ = job
 
-        PlayerBoxScoreAdvanced.__table__.drop(db.engine, checkfirst=True)
-        PlayerBoxScoreAdvanced.__table__.create(db.engine)
+                bulk_data = cls._parse_team_box_scores(
+                    box_scores, measure_type, season, season_type, period, playoff_round
+                )
 
-        PlayerBoxScoreMiscellaneous.__table__.drop(db.engine, checkfirst=True)
-        PlayerBoxScoreMiscellaneous.__table__.create(db.engine)
+                if len(bulk_data) == 0:
+                    continue
 
-        PlayerBoxScoreScoring.__table__.drop(db.engine, checkfirst=True)
-        PlayerBoxScoreScoring.__table__.create(db.engine)
+                upserted = BulkWriter.upsert(cls.TEAM_BOX_SCORE_MODELS[measure_type], bulk_data)
+                db.session.commit()
 
-        for year in range(2023, 2025):
-            season = f"{year}-{str(year + 1)[-2:]}"
+                updated_game_ids.update(box_score.game_id for box_score in upserted)
 
-            for season_type in cls.SEASON_TYPES:
-                for period in range(0, 10):
-                    if season_type == "Playoffs":
-                        playoff_rounds = range(1, 5)
-                    else:
-                        playoff_rounds = [None]
-
-                    for playoff_round in playoff_rounds:
-                        trad_box_scores = cls._process_player_box_scores("Base", season, season_type, period, playoff_round)
-
-                        db.session.bulk_save_objects(trad_box_scores)
-                        db.session.commit()
-
-                        # adv_box_scores = cls._process_player_box_scores("Advanced", season, season_type, period,
-                        #                                                  playoff_round)
-                        #
-                        # db.session.bulk_save_objects(adv_box_scores)
-                        # db.session.commit()
-                        #
-                        # misc_box_scores = cls._process_player_box_scores("Misc", season, season_type, period,
-                        #                                                  playoff_round)
-                        #
-                        # db.session.bulk_save_objects(misc_box_scores)
-                        # db.session.commit()
-                        #
-                        # scoring_box_scores = cls._process_player_box_scores("Scoring", season, season_type, period,
-                        #                                                  playoff_round)
-                        #
-                        # db.session.bulk_save_objects(scoring_box_scores)
-                        # db.session.commit()
-
-                        # Offensive Rebounding
-
-                print(f"finished loading player box scores for {season} {season_type}")
+                # Only groups with new or changed traditional box scores have new box scores of other
+                # measure types; refetched games that are unchanged don't count
+                if measure_type == "Base" and upserted:
+                    next_jobs.extend(
+                        (next_measure_type, *job[1:])
+                        for next_measure_type in ["Advanced", "Misc", "Scoring"]
+                    )
+
+            jobs = next_jobs
+
+        print(
+            f"updated team box scores of {len(updated_game_ids)} games in "
+            f"{time.perf_counter() - start_time:.2f}s"
+        )
 
     @classmethod
-    def load_player_tracking_box_scores(cls):
-        PlayerBoxScoreRebounding.__table__.drop(db.engine, checkfirst=True)
-        PlayerBoxScoreRebounding.__table__.create(db.engine)
-        
-        PlayerBoxScorePassing.__table__.drop(db.engine, checkfirst=True)
-        PlayerBoxScorePassing.__table__.create(db.engine)
-        
-        start_date = datetime.strptime("10/29/2013", "%m/%d/%Y")
-        end_date = datetime.today()
-        time_difference = timedelta(days=1)
-
-        current_date = start_date
-        
-        while current_date <= end_date:
-            current_date_formatted = current_date.strftime("%m/%d/%Y")
-            passing_box_scores = NBAStatsAPIClient.get_player_tracking_box_scores(measure_type="Passing", date_from=current_date, date_to=current_date)
-            rebounding_box_scores = NBAStatsAPIClient.get_player_tracking_box_scores(measure_type="Rebounding", date_from=current_date, date_to=current_date)
-
-            if rebounding_box_scores is not None and len(rebounding_box_scores["resultSets"][0]["rowSet"]) != 0:
-                headers = rebounding_box_scores["resultSets"][0]["headers"]
-                rows = rebounding_box_scores["resultSets"][0]["rowSet"]
-
-                indices = {
-                    header: i for i, header in enumerate(headers)
-                }
+    def update_player_box_scores(cls) -> None:
+        """
+        Method to load the player box scores of the current season's games played since the last load.
+        Games on the latest stored date of each group are refetched too, since they may not have been
+        final at the last load.
 
-                for box_score in rows:
-                    db.session.add(PlayerBoxScoreRebounding(
-                        player_id=box_score[indices["PLAYER_ID"]],
-                        game_date=current_date_formatted,
-                        
-                        # Defensive Rebounds
-                        contested_defensive_rebounds=box_score[indices["DREB_CONTEST"]],
-                        contested_defensive_rebound_percentage=box_score[indices["DREB_CONTEST_PCT"]],
-                        defensive_rebound_chances=box_score[indices["DREB_CHANCES"]],
-                        defensive_rebound_chance_percentage=box_score[indices["DREB_CHANCE_PCT"]],
-                        deferred_defensive_rebound_chances=box_score[indices["DREB_CHANCE_DEFER"]],
-                        adjusted_defensive_rebound_chance_percentage=box_score[indices["DREB_CHANCE_PCT_ADJ"]],
-                        average_defensive_rebound_distance=box_score[indices["AVG_DREB_DIST"]],
-                        
-                        # Offensive Rebounds
-                        contested_offensive_rebounds=box_score[indices["OREB_CONTEST"]],
-                        contested_offensive_rebound_percentage=box_score[indices["OREB_CONTEST_PCT"]],
-                        offensive_rebound_chances=box_score[indices["OREB_CHANCES"]],
-                        offensive_rebound_chance_percentage=box_score[indices["OREB_CHANCE_PCT"]],
-                        deferred_offensive_rebound_chances=box_score[indices["OREB_CHANCE_DEFER"]],
-                        adjusted_offensive_rebound_chance_percentage=box_score[indices["OREB_CHANCE_PCT_ADJ"]],
-                        average_offensive_rebound_distance=box_score[indices["AVG_OREB_DIST"]]
-                    ))
-                    
-                db.session.commit()
-            
-            if passing_box_scores is not None and len(passing_box_scores["resultSets"][0]["rowSet"]) != 0:
-                headers = passing_box_scores["resultSets"][0]["headers"]
-                rows = passing_box_scores["resultSets"][0]["rowSet"]
+        If the box scores df is initialized, the rows of the updated games are patched into it and only
+        the player game matrix rows of players in those games are recomputed.
+        """
+        start_time = time.perf_counter()
+
+        DataVersion.__table__.create(db.engine, checkfirst=True)
+
+        latest_game_dates = cls._get_latest_game_dates(PlayerBoxScoreTraditional, cls.current_season)
+        date_to = datetime.today().strftime("%m/%d/%Y")
+
+        jobs = [
+            (
+                "Base",
+                cls.current_season,
+                season_type,
+                period,
+                playoff_round,
+                latest_game_dates.get((season_type, period, playoff_round)),
+                date_to,
+            )
+            for season_type, period, playoff_round in cls._get_box_score_groups()
+        ]
 
-                indices = {
-                    header: i for i, header in enumerate(headers)
-                }
+        updated_game_ids = set()
 
-                for box_score in rows:
-                    db.session.add(PlayerBoxScorePassing(
-                        player_id=box_score[indices["PLAYER_ID"]],
-                        game_date=current_date_formatted,
-                        passes_made=box_score[indices["PASSES_MADE"]],
-                        passes_received=box_score[indices["PASSES_RECEIVED"]],
-                        ft_assists=box_score[indices["FT_AST"]],
-                        secondary_assists=box_score[indices["SECONDARY_AST"]],
-                        potential_assists=box_score[indices["POTENTIAL_AST"]],
-                        assist_points_created=box_score[indices["AST_PTS_CREATED"]],
-                        assist_to_pass_percentage=box_score[indices["AST_TO_PASS_PCT"]],
-                        adjusted_assist_to_pass_percentage=box_score[indices["AST_TO_PASS_PCT_ADJ"]]
-                    ))
-                    
-                db.session.commit()
-            
-            print("done withi", current_date)
-                
-            current_date += timedelta(days=1)
+        for job, box_scores in cls._get_fetch_scheduler().run(
+            NBAStatsAPIClient.get_player_box_scores, jobs
+        ):
+            measure_type, season, season_type, period, playoff_round, _, _ = job
+
+            bulk_data = cls._parse_player_box_scores(
+                box_scores, measure_type, season, season_type, period, playoff_round
+            )
+
+            if len(bulk_data) == 0:
+                continue
+
+            updated_game_ids.update(
+                box_score.game_id
+                for box_score in cls._upsert_player_box_scores(measure_type, bulk_data)
+            )
+            db.session.commit()
+
+        if updated_game_ids and cls.player_box_scores_traditional is not None:
+            cls._patch_box_scores_df(sorted(updated_game_ids))
+
+        print(
+            f"updated player box scores of {len(updated_game_ids)} games in "
+            f"{time.perf_counter() - start_time:.2f}s"
+        )
 
     @classmethod
-    def initialize_box_scores_df(cls):
-        """Function for to load relevant player box scores into pandas df for player props hr calculations."""
-        query = PlayerBoxScoreTraditional.query.all()
+    def migrate_box_scores(cls) -> None:
+        """
+        Method to migrate box score tables created before game dates were stored as dates: "MM/DD/YYYY"
+        (and "YYYY-MM-DD HH:MM:SS") game dates are rewritten in place as "YYYY-MM-DD", the format SQLite
+        stores dates in, duplicate rows of a natural key are dropped and the indexes of each table are
+        created. Unique indexes of natural keys since redefined, e.g. before season_type was part of
+        them, are dropped. Must run on an existing db before box scores are upserted, since upserts
+        need the unique index of the current natural key. Safe to run more than once.
 
-        # Convert the list of objects into a list of dictionaries
-        data = [
-            {
-                "id": record.id,
-                "season_year": record.season_year,
-                "season_type": record.season_type,
-                "playoff_round": record.playoff_round,
-                "player_id": record.player_id,
-                "team_id": record.team_id,
-                "opponent_team_id": record.opponent_team_id,
-                "game_id": record.game_id,
-                "game_date": record.game_date,
-                "away_game": record.away_game,
-                "win_loss": record.win_loss,
-                "period": record.period,
-                "minutes_played": record.minutes_played,
-                "field_goals_made": record.field_goals_made,
-                "field_goals_attempted": record.field_goals_attempted,
-                "field_goal_percentage": record.field_goal_percentage,
-                "three_point_field_goals_made": record.three_point_field_goals_made,
-                "three_point_field_goals_attempted": record.three_point_field_goals_attempted,
-                "three_point_field_goal_percentage": record.three_point_field_goal_percentage,
-                "free_throws_made": record.free_throws_made,
-                "free_throws_attempted": record.free_throws_attempted,
-                "free_throw_percentage": record.free_throw_percentage,
-                "offensive_rebounds": record.offensive_rebounds,
-                "defensive_rebounds": record.defensive_rebounds,
-                "rebounds": record.rebounds,
-                "assists": record.assists,
-                "steals": record.steals,
-                "blocks": record.blocks,
-                "block_attempts": record.block_attempts,
-                "turnovers": record.turnovers,
-                "personal_fouls": record.personal_fouls,
-                "personal_fouls_drawn": record.personal_fouls_drawn,
-                "points": record.points,
-                "plus_minus": record.plus_minus,
-                "nba_fantasy_points": record.nba_fantasy_points,
-            }
-            for record in query
+        Returns:
+            None
+        """
+        models = [
+            TeamBoxScoreTraditional,
+            TeamBoxScoreAdvanced,
+            TeamBoxScoreMiscellaneous,
+            TeamBoxScoreScoring,
+            PlayerBoxScoreTraditional,
+            PlayerBoxScoreAdvanced,
+            PlayerBoxScoreMiscellaneous,
+            PlayerBoxScoreScoring,
+            PlayerBoxScoreRebounding,
+            PlayerBoxScorePassing,
         ]
 
-        # Load the list of dictionaries into a pandas DataFrame
-        cls.player_box_scores_traditional = pd.DataFrame(data)
+        DataVersion.__table__.create(db.engine, checkfirst=True)
 
-    @classmethod
-    def update_team_box_scores(cls):
-        pass
+        with db.engine.begin() as connection:
+            for model in models:
+                table = model.__table__
+
+                if not db.inspect(connection).has_table(table.name):
+                    continue
+
+                if connection.dialect.name == "sqlite":
+                    # Raw SQL, since the Date column type only accepts date objects
+                    connection.execute(
+                        db.text(
+                            f"UPDATE {table.name} SET game_date = substr(game_date, 7, 4) || '-' "
+                            f"|| substr(game_date, 1, 2) || '-' || substr(game_date, 4, 2) "
+                            f"WHERE game_date LIKE '__/__/____'"
+                        )
+                    )
+                    connection.execute(
+                        db.text(
+                            f"UPDATE {table.name} SET game_date = substr(game_date, 1, 10) "
+                            f"WHERE length(game_date) > 10"
+                        )
+                    )
+
+                # Unique indexes of natural keys since redefined
+                index_names = {index.name for index in table.indexes}
+
+                for index in db.inspect(connection).get_indexes(table.name):
+                    if index["name"].startswith("uq_") and index["name"] not in index_names:
+                        connection.execute(
+                            db.text(f"DROP INDEX {connection.dialect.identifier_preparer.quote(index['name'])}")
+                        )
+
+                # Loads before the natural keys were unique may have stored a row more than once; keep
+                # the last stored copy, so the unique index can be created
+                key_columns = BulkWriter.get_natural_key(table)
+                connection.execute(
+                    table.delete().where(
+                        table.c.id.not_in(
+                            db.select(db.func.max(table.c.id)).group_by(*key_columns)
+                        )
+                    )
+                )
+
+                for index in table.indexes:
+                    index.create(connection, checkfirst=True)
+
+                cls._bump_data_version(table, connection)
+
+                print(f"Migrated {table.name}")
+
+            # Refresh the planner statistics so the new indexes are used
+            connection.execute(db.text("ANALYZE"))
+
+    @staticmethod
+    def _get_latest_game_dates(model: db.Model, season: str) -> dict:
+        """
+        Method to get the latest stored game date of each group of a season.
+
+        Args:
+            model (db.Model) - box scores model
+            season (str) - season year e.g. 2024-25
+
+        Returns:
+            (dict) - (season_type, period, playoff_round) -> latest game date e.g. "01/31/2025"
+        """
+        rows = db.session.execute(
+            db.select(
+                model.season_type,
+                model.period,
+                model.playoff_round,
+                db.func.max(model.game_date),
+            )
+            .where(model.season_year == season)
+            .group_by(model.season_type, model.period, model.playoff_round)
+        ).all()
+
+        return {
+            (season_type, period, playoff_round): game_date.strftime("%m/%d/%Y")
+            for season_type, period, playoff_round, game_date in rows
+        }
 
     @classmethod
-    def update_player_box_scores(cls):
-        pass
+    def _patch_box_scores_df(cls, game_ids: list[str]) -> None:
+        """
+        Method to replace the rows of some games in the box scores df with their stored rows, and
+        recompute the player game matrix rows of the players in those games. The index, cached market
+        totals and snapshot are refreshed afterwards.
+
+        Args:
+            game_ids (list[str]) - ids of the updated games
+
+        Returns:
+            None
+        """
+        table = PlayerBoxScoreTraditional.__table__
+
+        new_df = cls._compact_box_scores_df(
+            pd.concat(
+                [
+                    cls._read_box_scores_columns(
+                        table,
+                        table.c.game_id.in_(game_ids[start:start + cls.SQL_IN_CHUNK_SIZE]),
+                    )
+                    for start in range(0, len(game_ids), cls.SQL_IN_CHUNK_SIZE)
+                ],
+                ignore_index=True,
+            )
+        )
+
+        box_scores_df = cls.player_box_scores_traditional
+        replaced = np.isin(
+            box_scores_df["game_id"].to_numpy(), [int(game_id) for game_id in game_ids]
+        )
+        player_ids = np.union1d(
+            box_scores_df["player_id"].to_numpy()[replaced], new_df["player_id"].to_numpy()
+        )
+
+        cls.player_box_scores_traditional = cls._sort_box_scores_df(
+            cls._concat_box_scores_dfs([box_scores_df[~replaced], new_df])
+        )
+
+        # Only the matrix rows of players in the updated games change
+        box_scores_df = cls.player_box_scores_traditional
+        player_games, player_game_stats, _ = cls._pivot_player_games(
+            box_scores_df[np.isin(box_scores_df["player_id"].to_numpy(), player_ids)]
+        )
+
+        kept = ~np.isin(cls.player_games["player_id"].to_numpy(), player_ids)
+        player_games = cls._concat_box_scores_dfs([cls.player_games[kept], player_games])
+        player_game_stats = np.concatenate((cls.player_game_stats[kept], player_game_stats))
+
+        # Each player's rows are already in game date order, so a stable sort restores the player order
+        order = np.argsort(player_games["player_id"].to_numpy(), kind="stable")
+        cls.player_games = player_games.iloc[order].reset_index(drop=True)
+        cls.player_game_stats = player_game_stats[order]
+
+        cls._build_box_scores_index()
+        cls._get_cached_market_totals.cache_clear()
+
+        snapshot_path = cls._get_box_scores_snapshot_path()
+
+        if snapshot_path is not None:
+            cls._save_box_scores_snapshot(
+                snapshot_path,
+                cls._get_box_scores_fingerprint(),
+                current_app.config.get("BOX_SCORES_SHARED_MEMORY", False),
+            )
 
     @staticmethod
-    def get_team_id(team_name=None, abbr=None) -> int:
+    def _concat_box_scores_dfs(dfs: list[pd.DataFrame]) -> pd.DataFrame:
+        """
+        Helper method to concatenate compacted box scores dfs, keeping string columns categorical
+        when the dfs have different categories.
+
+        Args:
+            dfs (list[pd.DataFrame]) - compacted box scores dfs with the same columns
+
+        Returns:
+            (pd.DataFrame) - concatenated df
+        """
+        box_scores_df = pd.concat(dfs, ignore_index=True)
+
+        for name in ["season_year", "season_type", "win_loss"]:
+            if name in box_scores_df and not isinstance(
+                box_scores_df[name].dtype, pd.CategoricalDtype
+            ):
+                box_scores_df[name] = box_scores_df[name].astype("category")
+
+        return box_scores_df
+
+    @classmethod
+    def get_team_id(cls, team_name=None, abbr=None) -> int:
         """
-        Get ID of team with given name or abbreviation.
+        Get ID of team with given name or abbreviation, from an in-memory lookup table, so no db query
+        is made per box score row or event.
 
         Args:
-            team_name (str) - name of team
-            abbr (str) - 3 letter team abbreviation e.g. LAL, GSW, BOS
+            team_name (str) - name of team e.g. Los Angeles Lakers, LA Clippers, Seattle SuperSonics
+            abbr (str) - team abbreviation e.g. LAL, GSW, BOS, or historical / other sources' e.g. NJN, GS
 
         Returns:
             (int) id of team
+
+        Raises:
+            KeyError - if no team goes by the name or abbreviation
         """
-        if team_name:
-            team = Team.query.filter_by(name=team_name).first()
-            return team.id
+        key = team_name or abbr
 
-        if abbr:
-            team = Team.query.filter_by(abbreviation=abbr).first()
-            return team.id
+        try:
+            return cls._get_team_ids()[key.strip().casefold()]
+        except KeyError:
+            raise KeyError(f"Unknown team {key}") from None
 
-    @staticmethod
-    def get_player_ids(player_name: str, active=True) -> list[int]:
+    @classmethod
+    def _get_team_ids(cls) -> MappingProxyType:
+        """
+        Helper method to get the read-only lookup table of team ids by casefolded name, abbreviation and
+        alias, built from TEAMS_DATA and TEAM_ALIASES on first use.
+
+        Returns:
+            (MappingProxyType) - casefolded name / abbreviation / alias -> team id
+        """
+        if cls.team_ids is None:
+            team_ids = {}
+
+            for team_data in cls.TEAMS_DATA:
+                for key in [
+                    team_data["name"],
+                    team_data["abbreviation"],
+                    *cls.TEAM_ALIASES.get(team_data["id"], []),
+                ]:
+                    team_ids[key.casefold()] = team_data["id"]
+
+            cls.team_ids = MappingProxyType(team_ids)
+
+        return cls.team_ids
+
+    @classmethod
+    def get_player_ids(cls, player_name: str, active=True, source: str = None) -> list[int]:
         """
-        Method to get ID of player with given name. If no exact match, we select player with the
-        closest name calculated via Levenshtein distance.
+        Method to get ID of player with given name. If no exact match, we match the normalized name
+        (accents, suffixes like Jr. and nicknames ignored), then select player with the closest name
+        calculated via Levenshtein distance. Names are resolved in memory, without a db query.
 
         Args:
             player_name (str) - name of player
             active (bool) - if this player is currently on a team roster
+            source (str) - data source of the name e.g. the_odds_api, prizepicks, resolutions are memoized per source
 
         Returns:
             (list[int]) - list containing ids of players with given name
         """
-        # Get all players that match the full name exactly
-        if active:
-            players = (
-                db.session.query(Player)
-                .filter_by(full_name=player_name, on_roster=True)
-                .all()
-            )
-        else:
-            players = db.session.query(Player).filter_by(full_name=player_name).all()
+        return cls._get_player_name_resolver(active).resolve(player_name, source)
 
-        if len(players) == 1:
-            return [players[0].id]
+    @classmethod
+    def _get_player_name_resolver(cls, active: bool) -> PlayerNameResolver:
+        """
+        Helper method to get the name resolver of active or all players, built from one Player query
+        on first use and dropped when players are reloaded.
 
-        if len(players) > 1:
-            return [
-                player.id for player in players
-            ]  # more than one player with given name
-
-        # If no exact match, find the closest player using Levenshtein distance
-        if active:
-            all_players = (
-                db.session.query(Player.id, Player.full_name)
-                .filter(Player.on_roster == True)
-                .all()
+        Args:
+            active (bool) - only resolve to players currently on a team roster
+
+        Returns:
+            (PlayerNameResolver) - resolver of the players' names
+        """
+        if cls.player_name_resolvers is None:
+            cls.player_name_resolvers = {}
+
+        if active not in cls.player_name_resolvers:
+            query = db.session.query(Player.id, Player.full_name)
+
+            if active:
+                query = query.filter(Player.on_roster == True)
+
+            cls.player_name_resolvers[active] = PlayerNameResolver(
+                query.order_by(Player.id).all()
             )
-        else:
-            all_players = db.session.query(Player.id, Player.full_name).all()
 
-        closest_player = min(
-            all_players, key=lambda p: Levenshtein.distance(player_name, p.full_name)
-        )
-        return [closest_player[0]]
+        return cls.player_name_resolvers[active]
 
     @staticmethod
     def get_player_team_id(player_id: int) -> int:
         player = db.session.query(Player).filter_by(id=player_id).first()
         return player.team_id
 
+    @classmethod
+    def get_player_team_ids(cls, player_ids: list[int]) -> dict:
+        """
+        Method to get the team ids of many players in bulk, one query per SQL_IN_CHUNK_SIZE players.
+
+        Args:
+            player_ids (list[int]) - ids of players
+
+        Returns:
+            (dict) - player id -> team id, for the players that exist
+        """
+        player_ids = list(dict.fromkeys(player_ids))
+        team_ids = {}
+
+        for start in range(0, len(player_ids), cls.SQL_IN_CHUNK_SIZE):
+            rows = (
+                db.session.query(Player.id, Player.team_id)
+                .filter(Player.id.in_(player_ids[start:start + cls.SQL_IN_CHUNK_SIZE]))
+                .all()
+            )
+            team_ids.update(dict(rows))
+
+        return team_ids
+
+    @classmethod
+    def _get_market_totals(cls, player_id: int, market_stats: list) -> dict:
+        """
+        Method to compute a player's market total for every game they have played.
+
+        Args:
+            player_id (int) - id of player
+            market_stats (list) - (period, stat categories) pairs relevant to market
+
+        Returns:
+            (dict) - containing numpy arrays of market totals, opponent team ids and season years,
+                aligned by game and sorted by game date descending (most recent game first).
+        """
+        rows = cls.player_games_index.get(player_id, slice(0, 0))
+        columns = [
+            cls.player_game_stat_columns[(period, stat)]
+            for period, stat_categories in market_stats
+            for stat in stat_categories
+        ]
+
+        games_df = cls.player_games.iloc[rows]
+
+        return {
+            "totals": cls.player_game_stats[rows, columns].sum(axis=1),
+            "opponent_team_ids": games_df["opponent_team_id"].to_numpy(),
+            "season_years": games_df["season_year"].to_numpy(),
+        }
+
+    @classmethod
+    @lru_cache(maxsize=MARKET_TOTALS_CACHE_SIZE)
+    def _get_cached_market_totals(cls, player_id: int, market: str) -> dict:
+        """
+        Memoized version of _get_market_totals keyed by (player_id, market). The same pair shows up for
+        many bookmakers, lines and outcomes across a slate, so its totals are only computed once.
+        Least recently used entries are evicted, and the cache is cleared whenever the box scores are reloaded.
+
+        Args:
+            player_id (int) - id of player
+            market (str) - market key, e.g. player_points or 1H Points
+
+        Returns:
+            (dict) - same as _get_market_totals, with read-only arrays since they are shared between callers.
+        """
+        market_totals = cls._get_market_totals(player_id, MARKET_STATS_MAPPING[market])
+
+        for array in market_totals.values():
+            array.setflags(write=False)
+
+        return market_totals
+
+    @classmethod
+    def get_market_totals_cache_info(cls) -> dict:
+        """
+        Method to get the hit/miss counters of the market totals cache.
+
+        Returns:
+            (dict) - containing hits, misses, current size and max size of the cache.
+        """
+        cache_info = cls._get_cached_market_totals.cache_info()
+
+        return {
+            "hits": cache_info.hits,
+            "misses": cache_info.misses,
+            "size": cache_info.currsize,
+            "max_size": cache_info.maxsize,
+        }
+
+    @staticmethod
+    def _summarize_totals(totals: np.ndarray, line: float) -> dict:
+        """
+        Helper method to count hits and average of an array of market totals.
+
+        Args:
+            totals (np.ndarray) - market totals
+            line (float) - threshold
+
+        Returns:
+            (dict) - containing number of games, number of totals over the line and their average.
+        """
+        return {
+            "games": len(totals),
+            "hits": int(np.count_nonzero(totals > line)),
+            "average": float(totals.mean()),
+        }
+
+    @classmethod
+    def compute_prop_stats(
+        cls, player_id: int, market: str, line: float, opponent_team_id: int
+    ) -> dict:
+        """
+        Method to calculate every hit rate stat of a player prop (last 5, 10, 20, 30 games, season,
+        head-to-head and hot streak) from a single pass over the player's games.
+
+        Args:
+            player_id (int) - id of player
+            market (str) - market key, e.g. player_points or 1H Points
+            line (float) - threshold
+            opponent_team_id (int) - id of opponent team
+
+        Returns:
+            (dict) - containing "Over" and "Under" dicts of stats keyed by PlayerProp column names.
+        """
+        return cls.compute_prop_stats_ladder(
+            player_id, market, [line], opponent_team_id
+        )[0]
+
+    @classmethod
+    def compute_prop_stats_ladder(
+        cls, player_id: int, market: str, lines: list[float], opponent_team_id: int
+    ) -> list[dict]:
+        """
+        Method to calculate the hit rate stats of a ladder of lines for the same player and market,
+        e.g. alternate lines. Each window of market totals is sorted once and every line is answered
+        with a binary search, so a ladder costs little more than a single line.
+
+        Args:
+            player_id (int) - id of player
+            market (str) - market key, e.g. player_points_alternate
+            lines (list[float]) - thresholds
+            opponent_team_id (int) - id of opponent team
+
+        Returns:
+            (list[dict]) - for each line, "Over" and "Under" dicts of stats keyed by PlayerProp column names;
+                None where the player has not played enough games.
+        """
+        market_totals = cls._get_cached_market_totals(player_id, market)
+        totals = market_totals["totals"]
+        lines = np.asarray(lines, dtype=np.float64)
+
+        h2h_games = market_totals["opponent_team_ids"] == opponent_team_id
+        season_games = market_totals["season_years"] == cls.current_season
+
+        # (column prefix, window of totals, column holding the number of games in the window)
+        windows = [
+            (f"last_{window}_games", totals[:n] if len(totals) >= n else None, None)
+            for n, window in cls.LAST_N_GAMES_WINDOWS.items()
+        ]
+        windows.append(("season", totals[season_games], "season_games"))
+        windows.append(("head_to_head", totals[h2h_games], "head_to_head_matchups"))
+
+        ladder = [{"Over": {}, "Under": {}} for _ in range(len(lines))]
+
+        for prefix, window_totals, games_key in windows:
+            if games_key is not None:
+                for prop_stats in ladder:
+                    prop_stats["Over"][games_key] = len(window_totals)
+                    prop_stats["Under"][games_key] = len(window_totals)
+
+            # If the player has not played enough games, the window has no stats
+            if window_totals is None or len(window_totals) == 0:
+                for prop_stats in ladder:
+                    for outcome_stats in prop_stats.values():
+                        outcome_stats[f"{prefix}_hits"] = None
+                        outcome_stats[f"{prefix}_hit_rate"] = None
+                        outcome_stats[f"{prefix}_average"] = None
+                continue
+
+            games = len(window_totals)
+            average = float(window_totals.mean())
+
+            sorted_totals = np.sort(window_totals)
+            over_hits = games - np.searchsorted(sorted_totals, lines, side="right")
+            under_hits = np.searchsorted(sorted_totals, lines, side="left")
+
+            for prop_stats, over, under in zip(
+                ladder, over_hits.tolist(), under_hits.tolist()
+            ):
+                for outcome, hits in [("Over", over), ("Under", under)]:
+                    prop_stats[outcome][f"{prefix}_hits"] = hits
+                    prop_stats[outcome][f"{prefix}_hit_rate"] = hits / games
+                    prop_stats[outcome][f"{prefix}_average"] = average
+
+        # A streak lasts while the running min (Over) or max (Under) of the totals stays past the line
+        if len(totals) == 0:
+            over_streaks = under_streaks = [None] * len(lines)
+        else:
+            over_streaks = np.searchsorted(
+                -np.minimum.accumulate(totals), -lines, side="left"
+            ).tolist()
+            under_streaks = np.searchsorted(
+                np.maximum.accumulate(totals), lines, side="left"
+            ).tolist()
+
+        for prop_stats, over_streak, under_streak in zip(
+            ladder, over_streaks, under_streaks
+        ):
+            prop_stats["Over"]["hot_streak"] = over_streak
+            prop_stats["Under"]["hot_streak"] = under_streak
+
+        return ladder
+
     @classmethod
     def calculate_last_n_games_hit_rate_stats(
         cls, player_id: int, market_stats: dict, line: float, n: int
@@ -1126,55 +2377,15 @@ class NBAStatsAPIService:
             (dict) - containing number of times the player has hit this line in the last n games,
                 as well as average; None if player has not played n games.
         """
-        player_games_df = cls.player_box_scores_traditional[
-            (cls.player_box_scores_traditional["player_id"] == player_id)
-            & (cls.player_box_scores_traditional["period"] == 0)
-        ]
-
-        # Sort by game_date descending and select the last n games
-        player_games_df = player_games_df.sort_values(
-            by="game_date", ascending=False
-        ).head(n)
+        totals = cls._get_market_totals(player_id, market_stats)["totals"]
 
         # If the player has played fewer than n games, return None
-        if len(player_games_df) < n:
+        if len(totals) < n:
             return {"hits": None, "average": None}
 
-        hits = 0
-        totals_list = []
-
-        # Iterate over the filtered games to calculate totals
-        for _, game in player_games_df.iterrows():
-            total = 0
-
-            # Loop over market_stats (key = period, value = list of stat categories)
-            for period, stat_categories in market_stats:
-                if period == 0:
-                    # Add the stats for the full game (period 0)
-                    for stat in stat_categories:
-                        total += game[stat]
-                else:
-                    # Add the stats for specific periods
-                    period_box_score = cls.player_box_scores_traditional[
-                        (cls.player_box_scores_traditional["player_id"] == player_id)
-                        & (
-                            cls.player_box_scores_traditional["game_id"]
-                            == game["game_id"]
-                        )
-                        & (cls.player_box_scores_traditional["period"] == period)
-                    ]
-
-                    if not period_box_score.empty:
-                        for stat in stat_categories:
-                            total += period_box_score.iloc[0][stat]
-
-            totals_list.append(total)
+        stats = cls._summarize_totals(totals[:n], line)
 
-            # Check if the outcome matches
-            if total > line:
-                hits += 1
-
-        return {"hits": hits, "average": mean(totals_list)}
+        return {"hits": stats["hits"], "average": stats["average"]}
 
     @classmethod
     def calculate_h2h_hit_rate_stats(
@@ -1185,7 +2396,7 @@ class NBAStatsAPIService:
         opponent_team_id: int,
     ) -> dict:
         """
-        Calculate hit rate of a player prop against a particular opponent team using pandas DataFrame.
+        Calculate hit rate of a player prop against a particular opponent team.
 
         Args:
             player_id (int) - id of player
@@ -1197,54 +2408,16 @@ class NBAStatsAPIService:
             (dict) - containing number of times the player has hit this line against opponent,
                      as well as the average; None if the player has not played any games against the opponent.
         """
-        # Filter DataFrame for games against the specific opponent where period == 0 (full game stats)
-        h2h_games_df = cls.player_box_scores_traditional[
-            (cls.player_box_scores_traditional["player_id"] == player_id)
-            & (
-                cls.player_box_scores_traditional["opponent_team_id"]
-                == opponent_team_id
-            )
-            & (cls.player_box_scores_traditional["period"] == 0)
-        ].sort_values(by="game_date", ascending=False)
+        market_totals = cls._get_market_totals(player_id, market_stats)
+        totals = market_totals["totals"][
+            market_totals["opponent_team_ids"] == opponent_team_id
+        ]
 
         # If there are no games, return the appropriate values
-        if h2h_games_df.empty:
+        if len(totals) == 0:
             return {"games": 0, "hits": None, "average": None}
 
-        hits = 0
-        totals_list = []
-
-        # Iterate over the filtered games to calculate totals
-        for _, game in h2h_games_df.iterrows():
-            total = 0
-
-            # Loop through each period and stat category in market_stats
-            for period, stat_categories in market_stats:
-                if period == 0:
-                    # For the full game (period 0), add the stats from the game row
-                    for stat in stat_categories:
-                        total += game[stat]
-                else:
-                    # For specific periods, filter the DataFrame for the same game and period
-                    period_box_score = cls.player_box_scores_traditional[
-                        (cls.player_box_scores_traditional["player_id"] == player_id)
-                        & (
-                            cls.player_box_scores_traditional["game_id"]
-                            == game["game_id"]
-                        )
-                        & (cls.player_box_scores_traditional["period"] == period)
-                    ]
-
-                    if not period_box_score.empty:
-                        for stat in stat_categories:
-                            total += period_box_score.iloc[0][stat]
-
-            totals_list.append(total)
-
-            if total > line:
-                hits += 1
-
-        return {"games": len(h2h_games_df), "hits": hits, "average": mean(totals_list)}
+        return cls._summarize_totals(totals, line)
 
     @classmethod
     def calculate_season_hit_rate_stats(
@@ -1254,7 +2427,7 @@ class NBAStatsAPIService:
         line: float,
     ) -> dict:
         """
-        Calculate hit rate of a player prop for the current season using pandas DataFrame.
+        Calculate hit rate of a player prop for the current season.
 
         Args:
             player_id (int) - id of player
@@ -1265,56 +2438,16 @@ class NBAStatsAPIService:
             (dict) - containing number of times the player has hit this line this season,
                      as well as the average; None if the player has not played any games.
         """
-        # Filter DataFrame for games in the current season (period = 0 for full-game stats)
-        season_games_df = cls.player_box_scores_traditional[
-            (cls.player_box_scores_traditional["player_id"] == player_id)
-            & (cls.player_box_scores_traditional["season_year"] == cls.current_season)
-            & (cls.player_box_scores_traditional["period"] == 0)
-        ].sort_values(by="game_date", ascending=False)
+        market_totals = cls._get_market_totals(player_id, market_stats)
+        totals = market_totals["totals"][
+            market_totals["season_years"] == cls.current_season
+        ]
 
         # If no games are found for the player this season, return appropriate values
-        if season_games_df.empty:
+        if len(totals) == 0:
             return {"games": 0, "hits": None, "average": None}
 
-        hits = 0
-        totals_list = []
-
-        # Iterate through the filtered games to calculate totals
-        for _, game in season_games_df.iterrows():
-            total = 0
-
-            # Loop through the periods and stat categories in market_stats
-            for period, stat_categories in market_stats:
-                if period == 0:
-                    # For full game (period = 0), directly sum the relevant stats
-                    for stat in stat_categories:
-                        total += game[stat]
-                else:
-                    # For specific periods, filter DataFrame for the same game and period
-                    period_box_score = cls.player_box_scores_traditional[
-                        (cls.player_box_scores_traditional["player_id"] == player_id)
-                        & (
-                            cls.player_box_scores_traditional["game_id"]
-                            == game["game_id"]
-                        )
-                        & (cls.player_box_scores_traditional["period"] == period)
-                    ]
-
-                    if not period_box_score.empty:
-                        for stat in stat_categories:
-                            total += period_box_score.iloc[0][stat]
-
-            totals_list.append(total)
-
-            # Check if the total exceeds or is below the line based on the outcome (Over/Under)
-            if total > line:
-                hits += 1
-
-        return {
-            "games": len(season_games_df),
-            "hits": hits,
-            "average": mean(totals_list),
-        }
+        return cls._summarize_totals(totals, line)
 
     @classmethod
     def calculate_hot_streak(
@@ -1324,7 +2457,7 @@ class NBAStatsAPIService:
         line: float,
     ) -> int | None:
         """
-        Calculate hot streak of a player prop using pandas DataFrame.
+        Calculate hot streak of a player prop.
 
         Args:
             player_id (int) - id of player
@@ -1334,47 +2467,13 @@ class NBAStatsAPIService:
         Returns:
             (int) - the hot streak, or None if no games played
         """
-        # Filter the DataFrame for the player's games where period == 0 (full game stats)
-        games_df = cls.player_box_scores_traditional[
-            (cls.player_box_scores_traditional["player_id"] == player_id)
-            & (cls.player_box_scores_traditional["period"] == 0)
-        ].sort_values(by="game_date", ascending=False)
+        totals = cls._get_market_totals(player_id, market_stats)["totals"]
 
         # If no games are found, return None
-        if games_df.empty:
+        if len(totals) == 0:
             return None
 
-        hot_streak = 0
-
-        # Iterate through the filtered games to calculate totals and check streak
-        for _, game in games_df.iterrows():
-            total = 0
-
-            # Loop through the periods and stat categories in market_stats
-            for period, stat_categories in market_stats:
-                if period == 0:
-                    # For the full game, sum the relevant stats
-                    for stat in stat_categories:
-                        total += game[stat]
-                else:
-                    # For specific periods, filter the DataFrame for the same game and period
-                    period_box_score = cls.player_box_scores_traditional[
-                        (cls.player_box_scores_traditional["player_id"] == player_id)
-                        & (
-                            cls.player_box_scores_traditional["game_id"]
-                            == game["game_id"]
-                        )
-                        & (cls.player_box_scores_traditional["period"] == period)
-                    ]
-
-                    if not period_box_score.empty:
-                        for stat in stat_categories:
-                            total += period_box_score.iloc[0][stat]
-
-            # Check if the total is over or under the line, and update the streak
-            if total > line:
-                hot_streak += 1
-            else:
-                break  # Streak is broken
+        # The streak ends at the most recent game where the total did not go over the line
+        misses = np.flatnonzero(totals <= line)
 
-        return hot_streak
+        return int(misses[0]) if len(misses) else len(totals)
@@ -0,0 +1,148 @@
+# player_name_resolver.py
+
+import heapq
+import re
+import unicodedata
+
+import Levenshtein
+
+
+class PlayerNameResolver:
+    """
+    Class for resolving the player names used by other data sources (sportsbooks, PrizePicks) to player ids.
+
+    A name first matches full names exactly, then normalized names: accents, case, punctuation and suffixes
+    like Jr. or III are dropped, and common first name nicknames are expanded, so e.g. "Nic Claxton" matches
+    "Nicolas Claxton" and "Alperen Sengun" matches "Alperen Şengün". Names without a match fall back to the
+    closest normalized name by Levenshtein distance, among the few names sharing the most trigrams with it.
+
+    Resolutions are memoized per source, since a source keeps spelling a player the same way.
+
+    Methods:
+        resolve
+        normalize
+        _find_closest
+        _get_trigrams
+    """
+
+    SUFFIXES = {"jr", "sr", "ii", "iii", "iv", "v"}
+
+    # Short first names -> the first name they are short for; applied to both sides of a match
+    NICKNAMES = {
+        "cam": "cameron",
+        "herb": "herbert",
+        "moe": "moritz",
+        "nic": "nicolas",
+        "gg": "gregory",
+        "kj": "kenyon",
+        "bones": "nahshon",
+    }
+
+    MAX_CANDIDATES = 10
+
+    def __init__(self, players: list[tuple[int, str]]):
+        """
+        Args:
+            players (list[tuple[int, str]]) - (id, full name) of each player
+        """
+        self._ids_by_full_name = {}
+        self._ids_by_name = {}
+        self._names = []
+        self._trigram_index = {}
+        self._resolved = {}
+
+        for player_id, full_name in players:
+            self._ids_by_full_name.setdefault(full_name, []).append(player_id)
+
+            name = self.normalize(full_name)
+
+            if name not in self._ids_by_name:
+                self._ids_by_name[name] = []
+
+                for trigram in self._get_trigrams(name):
+                    self._trigram_index.setdefault(trigram, []).append(len(self._names))
+
+                self._names.append(name)
+
+            self._ids_by_name[name].append(player_id)
+
+    def resolve(self, player_name: str, source: str = None) -> list[int]:
+        """
+        Resolves a player name.
+
+        Args:
+            player_name (str) - name of player
+            source (str or None) - data source the name comes from, e.g. prizepicks
+
+        Returns:
+            (list[int]) - ids of the players with the name, more than one if the name is ambiguous, or
+                of the players with the closest name if none match; empty if there are no players
+        """
+        key = (source, player_name)
+
+        if key not in self._resolved:
+            player_ids = self._ids_by_full_name.get(player_name)
+            name = self.normalize(player_name)
+
+            if player_ids is None:
+                player_ids = self._ids_by_name.get(name)
+
+            if player_ids is None:
+                closest_name = self._find_closest(name)
+                player_ids = [] if closest_name is None else self._ids_by_name[closest_name]
+
+            self._resolved[key] = player_ids
+
+        return list(self._resolved[key])
+
+    @classmethod
+    def normalize(cls, player_name: str) -> str:
+        """
+        Normalizes a player name, e.g. "P.J. Tucker Jr." -> "pj tucker", "Nikola Jokić" -> "nikola jokic".
+
+        Args:
+            player_name (str) - name of player
+
+        Returns:
+            (str) - normalized name
+        """
+        name = unicodedata.normalize("NFKD", player_name)
+        name = "".join(char for char in name if not unicodedata.combining(char)).casefold()
+
+        # Initials and apostrophes are joined, e.g. "P.J." -> "pj", "Nah'Shon" -> "nahshon"
+        name = re.sub(r"[.'’`]", "", name)
+        tokens = re.sub(r"[\W_]+", " ", name).split()
+
+        if not tokens:
+            return ""
+
+        first_name = cls.NICKNAMES.get(tokens[0], tokens[0])
+
+        return " ".join([first_name, *(token for token in tokens[1:] if token not in cls.SUFFIXES)])
+
+    def _find_closest(self, name: str) -> str | None:
+        """Helper method to find the closest normalized name, among those sharing the most trigrams."""
+        shared_trigrams = {}
+
+        for trigram in self._get_trigrams(name):
+            for position in self._trigram_index.get(trigram, []):
+                shared_trigrams[position] = shared_trigrams.get(position, 0) + 1
+
+        if shared_trigrams:
+            candidates = heapq.nlargest(
+                self.MAX_CANDIDATES, shared_trigrams, key=shared_trigrams.get
+            )
+        else:
+            candidates = range(len(self._names))
+
+        return min(
+            (self._names[position] for position in candidates),
+            key=lambda candidate: Levenshtein.distance(name, candidate),
+            default=None,
+        )
+
+    @staticmethod
+    def _get_trigrams(name: str) -> set[str]:
+        """Helper method to get the trigrams of a name, padded so short names and word starts count."""
+        padded = f"  {name} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
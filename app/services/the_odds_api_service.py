@@ -5,8 +5,8 @@ from datetime import datetime
 import pytz
 
 from app.api_clients.the_odds_api_client import TheOddsAPIClient
-from app.markets import MARKET_STATS_MAPPING
 from app.models.odds_api_models import *
+from app.services.bulk_writer import BulkWriter
 from app.services.nba_stats_api_service import NBAStatsAPIService
 
 
@@ -17,22 +17,24 @@ class TheOddsAPIService:
     Methods:
         load_bookmakers
         load_events_and_odds
+        _delete_stale_events
         load_player_props_and_odds
+        migrate_player_props
         _process_events
         _process_player_props
+        _preload_player_props_context
         get_event_by_team_id
         _format_event_time
     """
 
     @staticmethod
     def load_bookmakers() -> None:
-        """Method to load all Bookmakers into db.
+        """Method to load all Bookmakers into db. Bookmakers are upserted, since odds reference them.
 
         Returns:
             None
         """
-        Bookmaker.__table__.drop(db.engine, checkfirst=True)
-        Bookmaker.__table__.create(db.engine)
+        Bookmaker.__table__.create(db.engine, checkfirst=True)
 
         bookmakers_data = [
             {
@@ -177,16 +179,7 @@ class TheOddsAPIService:
             },
         ]
 
-        for bookmaker_data in bookmakers_data:
-            bookmaker = Bookmaker(
-                key=bookmaker_data["key"],
-                region=bookmaker_data["region"],
-                title=bookmaker_data["title"],
-                link=bookmaker_data["link"],
-                image_path=bookmaker_data["image_path"],
-            )
-            db.session.add(bookmaker)
-
+        BulkWriter.upsert(Bookmaker, bookmakers_data)
         db.session.commit()
 
     @classmethod
@@ -199,18 +192,6 @@ class TheOddsAPIService:
         Returns:
             None
         """
-        TheOddsAPIEvent.__table__.drop(db.engine, checkfirst=True)
-        TheOddsAPIEvent.__table__.create(db.engine)
-
-        MoneylineOdds.__table__.drop(db.engine, checkfirst=True)
-        MoneylineOdds.__table__.create(db.engine)
-
-        PointsSpreadOdds.__table__.drop(db.engine, checkfirst=True)
-        PointsSpreadOdds.__table__.create(db.engine)
-
-        TotalPointsOdds.__table__.drop(db.engine, checkfirst=True)
-        TotalPointsOdds.__table__.create(db.engine)
-
         # Fetch and process events data
 
         events_json = TheOddsAPIClient.get_events(api_key)
@@ -221,61 +202,57 @@ class TheOddsAPIService:
         processed_spread_odds = processed_events_and_odds["spread_odds"]
         processed_totals_odds = processed_events_and_odds["totals_odds"]
 
-        # Inserting Events
+        # Tables are only created if missing and written in one transaction, so the previous events
+        # stay readable until the new ones are committed
+        for model in [TheOddsAPIEvent, MoneylineOdds, PointsSpreadOdds, TotalPointsOdds, PlayerProp,
+                      PlayerPropOdds]:
+            model.__table__.create(db.engine, checkfirst=True)
 
-        for event in processed_events:
-            db.session.add(
-                TheOddsAPIEvent(
-                    id=event["id"],
-                    start_time=event["start_time"],
-                    formatted_start_time=event["formatted_start_time"],
-                    home_team_id=event["home_team_id"],
-                    away_team_id=event["away_team_id"],
-                )
-            )
+        # Upserting Events first, so the new odds reference existing events and the props of events
+        # still in the feed are kept
 
-        # Inserting MoneylineOdds
+        BulkWriter.upsert(TheOddsAPIEvent, processed_events)
 
-        for moneyline_odds in processed_moneyline_odds:
-            db.session.add(
-                MoneylineOdds(
-                    event_id=moneyline_odds["event_id"],
-                    bookmaker_key=moneyline_odds["bookmaker_key"],
-                    home_team_odds=moneyline_odds["home_team_odds"],
-                    away_team_odds=moneyline_odds["away_team_odds"],
-                )
-            )
+        # Replacing MoneylineOdds
 
-        # Inserting PointsSpreadOdds
-
-        for spread_odds in processed_spread_odds:
-            db.session.add(
-                PointsSpreadOdds(
-                    event_id=spread_odds["event_id"],
-                    bookmaker_key=spread_odds["bookmaker_key"],
-                    home_team_line=spread_odds["home_team_line"],
-                    home_team_odds=spread_odds["home_team_odds"],
-                    away_team_line=spread_odds["away_team_line"],
-                    away_team_odds=spread_odds["away_team_odds"],
-                )
-            )
+        BulkWriter.replace(MoneylineOdds, processed_moneyline_odds)
 
-        # Inserting TotalPointsOdds
+        # Replacing PointsSpreadOdds
 
-        for total_points_odds in processed_totals_odds:
-            db.session.add(
-                TotalPointsOdds(
-                    event_id=total_points_odds["event_id"],
-                    bookmaker_key=total_points_odds["bookmaker_key"],
-                    line=total_points_odds["line"],
-                    over_odds=total_points_odds["over_odds"],
-                    under_odds=total_points_odds["under_odds"],
-                )
-            )
+        BulkWriter.replace(PointsSpreadOdds, processed_spread_odds)
+
+        # Replacing TotalPointsOdds
+
+        BulkWriter.replace(TotalPointsOdds, processed_totals_odds)
+
+        # Deleting events no longer in the feed, after the odds and props referencing them
+
+        cls._delete_stale_events([event["id"] for event in processed_events])
 
         # Commit the changes to the database
         db.session.commit()
 
+    @staticmethod
+    def _delete_stale_events(event_ids: list[str]) -> None:
+        """
+        Helper method to delete the events not in event_ids, with their player props and props odds.
+        Odds of events are expected to be replaced already.
+
+        Args:
+            event_ids (list[str]) - ids of the events to keep
+
+        Returns:
+            None
+        """
+        stale_event_ids = db.select(TheOddsAPIEvent.id).where(TheOddsAPIEvent.id.not_in(event_ids))
+        stale_prop_ids = db.select(PlayerProp.id).where(PlayerProp.event_id.in_(stale_event_ids))
+
+        db.session.execute(
+            db.delete(PlayerPropOdds).where(PlayerPropOdds.player_prop_id.in_(stale_prop_ids))
+        )
+        db.session.execute(db.delete(PlayerProp).where(PlayerProp.event_id.in_(stale_event_ids)))
+        db.session.execute(db.delete(TheOddsAPIEvent).where(TheOddsAPIEvent.id.not_in(event_ids)))
+
     @classmethod
     def load_player_props_and_odds(cls, api_key: str) -> None:
         """
@@ -287,11 +264,10 @@ class TheOddsAPIService:
         Returns:
             None
         """
-        PlayerProp.__table__.drop(db.engine, checkfirst=True)
-        PlayerProp.__table__.create(db.engine)
-
-        PlayerPropOdds.__table__.drop(db.engine, checkfirst=True)
-        PlayerPropOdds.__table__.create(db.engine)
+        # Tables are only created if missing, so an older player_prop table is migrated first
+        PlayerProp.__table__.create(db.engine, checkfirst=True)
+        PlayerPropOdds.__table__.create(db.engine, checkfirst=True)
+        cls.migrate_player_props()
 
         event_ids = [event.id for event in TheOddsAPIEvent.query.all()]
 
@@ -315,12 +291,52 @@ class TheOddsAPIService:
             "player_props_odds"
         ]
 
-        db.session.bulk_insert_mappings(PlayerProp, processed_player_props)
-        db.session.bulk_insert_mappings(PlayerPropOdds, processed_player_props_odds)
+        # Rows are replaced in one transaction, so the previous props stay readable until the new ones
+        # are committed
+        # Odds go before the props they reference and come back after them
+        db.session.execute(db.delete(PlayerPropOdds))
+        BulkWriter.replace(PlayerProp, processed_player_props)
+        BulkWriter.insert(PlayerPropOdds, processed_player_props_odds)
 
         # Commit the session to save everything to the database
         db.session.commit()
 
+    @staticmethod
+    def migrate_player_props() -> None:
+        """
+        Method to migrate a player_prop table created before props had an outcome column, by adding the
+        columns it is missing. Since props tables are no longer dropped and recreated, this must run on
+        an existing db before props are written; load_player_props_and_odds and
+        PrizePicksAPIService.load_player_props run it first. Running it again does nothing.
+
+        Returns:
+            None
+        """
+        table = PlayerProp.__table__
+
+        with db.engine.begin() as connection:
+            inspector = db.inspect(connection)
+
+            if not inspector.has_table(table.name):
+                return
+
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            preparer = connection.dialect.identifier_preparer
+
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+
+                # Only nullable columns were added, so existing rows need no default
+                connection.execute(
+                    db.text(
+                        f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN "
+                        f"{preparer.format_column(column)} {column.type.compile(connection.dialect)}"
+                    )
+                )
+
+                print(f"Added {table.name}.{column.name}")
+
     @classmethod
     def _process_events(cls, events_json: list[dict]) -> dict:
         """
@@ -441,13 +457,18 @@ class TheOddsAPIService:
         player_props_dict = {}
         player_props_odds_list = []
 
+        # Look up every event, player and team of the slate up front, so the loops below run no queries
+        context = cls._preload_player_props_context(player_props_json_list)
+
         for player_props_json in player_props_json_list:
             for event_json in player_props_json:
                 event_id = event_json["id"]
-                event = TheOddsAPIEvent.query.filter_by(id=event_id).first()
 
-                home_team_id = event.home_team_id
-                away_team_id = event.away_team_id
+                if event_id not in context["event_team_ids"]:
+                    print(f"Unknown event {event_id}")
+                    continue
+
+                home_team_id, away_team_id = context["event_team_ids"][event_id]
 
                 for bookmaker in event_json["bookmakers"]:
                     bookmaker_key = bookmaker["key"]
@@ -461,14 +482,14 @@ class TheOddsAPIService:
                             point = outcome["point"]
                             price = outcome["price"]
 
-                            player_ids = NBAStatsAPIService.get_player_ids(description)
+                            player_ids = context["player_ids"][description]
 
                             if len(player_ids) != 1:
                                 continue
 
                             player_id = player_ids[0]
 
-                            player_team_id = NBAStatsAPIService.get_player_team_id(player_id)
+                            player_team_id = context["player_team_ids"].get(player_id)
                             opponent_team_id = None
 
                             if player_team_id == home_team_id:
@@ -504,111 +525,94 @@ class TheOddsAPIService:
 
         player_props = []
 
+        # Group props that only differ by line, so alternate lines are evaluated as one ladder
+        prop_ladders = {}
+
         for key, player_prop_id in player_props_dict.items():
             event_id, player_id, opponent_team_id, line, market_key, alt = key
-
-            # Calculate stats (last 5, 10, 20, 30 games, season, head-to-head, etc.)
-            last_5_hr_stats = NBAStatsAPIService.calculate_last_n_games_hit_rate_stats(
-                player_id, MARKET_STATS_MAPPING[market_key], line, 5
+            prop_ladders.setdefault((player_id, market_key, opponent_team_id), []).append(
+                (key, player_prop_id)
             )
 
-            last_5_hits = last_5_hr_stats["hits"]
-            last_5_avg = last_5_hr_stats["average"]
-
-            last_10_hr_stats = NBAStatsAPIService.calculate_last_n_games_hit_rate_stats(
-                player_id, MARKET_STATS_MAPPING[market_key], line, 10
+        for (player_id, market_key, opponent_team_id), ladder_props in prop_ladders.items():
+            # Calculate stats (last 5, 10, 20, 30 games, season, head-to-head, etc.) for every line at once
+            ladder_stats = NBAStatsAPIService.compute_prop_stats_ladder(
+                player_id,
+                market_key,
+                [key[3] for key, _ in ladder_props],
+                opponent_team_id,
             )
 
-            last_10_hits = last_10_hr_stats["hits"]
-            last_10_avg = last_10_hr_stats["average"]
+            for (key, player_prop_id), prop_stats in zip(ladder_props, ladder_stats):
+                event_id, player_id, opponent_team_id, line, market_key, alt = key
 
-            last_20_hr_stats = NBAStatsAPIService.calculate_last_n_games_hit_rate_stats(
-                player_id, MARKET_STATS_MAPPING[market_key], line, 20
-            )
+                # Create a dictionary for each player prop record
+                player_prop_data = {
+                    "id": player_prop_id,
+                    "event_id": event_id,
+                    "player_id": player_id,
+                    "opponent_team_id": opponent_team_id,
+                    "market": market_key,
+                    "line": line,
+                    "alternate": alt,
+                    **prop_stats["Over"],
+                }
 
-            last_20_hits = last_20_hr_stats["hits"]
-            last_20_avg = last_20_hr_stats["average"]
+                # Append the dictionary to bulk_data
+                player_props.append(player_prop_data)
 
-            last_30_hr_stats = NBAStatsAPIService.calculate_last_n_games_hit_rate_stats(
-                player_id, MARKET_STATS_MAPPING[market_key], line, 30
-            )
+        return {
+            "player_props": player_props,
+            "player_props_odds": player_props_odds_list,
+        }
 
-            last_30_hits = last_30_hr_stats["hits"]
-            last_30_avg = last_30_hr_stats["average"]
+    @staticmethod
+    def _preload_player_props_context(player_props_json_list: list[list[dict]]) -> dict:
+        """
+        Helper method to look up, in a few bulk queries, everything _process_player_props needs per outcome.
+        Each distinct player description is resolved once.
 
-            season_hr_stats = NBAStatsAPIService.calculate_season_hit_rate_stats(
-                player_id, MARKET_STATS_MAPPING[market_key], line
-            )
+        Args:
+            player_props_json_list (list[list[dict]]) - player props of each event, per region
 
-            season_games = season_hr_stats["games"]
-            season_hits = season_hr_stats["hits"]
-            season_avg = season_hr_stats["average"]
+        Returns:
+            (dict) - containing "event_team_ids" (event id -> (home team id, away team id)), "player_ids"
+                (description -> player ids) and "player_team_ids" (player id -> team id)
+        """
+        event_ids = set()
+        descriptions = set()
 
-            h2h_hr_stats = NBAStatsAPIService.calculate_h2h_hit_rate_stats(
-                player_id,
-                MARKET_STATS_MAPPING[market_key],
-                line,
-                opponent_team_id,
-            )
+        for player_props_json in player_props_json_list:
+            for event_json in player_props_json:
+                event_ids.add(event_json["id"])
 
-            h2h_games = h2h_hr_stats["games"]
-            h2h_hits = h2h_hr_stats["hits"]
-            h2h_avg = h2h_hr_stats["average"]
+                for bookmaker in event_json["bookmakers"]:
+                    for market in bookmaker["markets"]:
+                        for outcome in market["outcomes"]:
+                            descriptions.add(outcome["description"])
 
-            hot_streak = NBAStatsAPIService.calculate_hot_streak(
-                player_id, MARKET_STATS_MAPPING[market_key], line
+        events = (
+            db.session.query(
+                TheOddsAPIEvent.id, TheOddsAPIEvent.home_team_id, TheOddsAPIEvent.away_team_id
             )
+            .filter(TheOddsAPIEvent.id.in_(event_ids))
+            .all()
+        )
 
-            # Create a dictionary for each player prop record
-            player_prop_data = {
-                "id": player_prop_id,  # Assuming this comes from player_props_dict
-                "event_id": event_id,
-                "player_id": player_id,
-                "opponent_team_id": opponent_team_id,
-                "market": market_key,
-                "line": line,
-                "alternate": alt,
-                "last_five_games_hits": last_5_hits,
-                "last_five_games_hit_rate": (
-                    last_5_hits / 5 if last_5_hits is not None else None
-                ),
-                "last_five_games_average": last_5_avg,
-                "last_ten_games_hits": last_10_hits,
-                "last_ten_games_hit_rate": (
-                    last_10_hits / 10 if last_10_hits is not None else None
-                ),
-                "last_ten_games_average": last_10_avg,
-                "last_twenty_games_hits": last_20_hits,
-                "last_twenty_games_hit_rate": (
-                    last_20_hits / 20 if last_20_hits is not None else None
-                ),
-                "last_twenty_games_average": last_20_avg,
-                "last_thirty_games_hits": last_30_hits,
-                "last_thirty_games_hit_rate": (
-                    last_30_hits / 30 if last_30_hits is not None else None
-                ),
-                "last_thirty_games_average": last_30_avg,
-                "season_games": season_games,
-                "season_hits": season_hits,
-                "season_hit_rate": (
-                    season_hits / season_games if season_hits is not None else None
-                ),
-                "season_average": season_avg,
-                "head_to_head_matchups": h2h_games,
-                "head_to_head_hits": h2h_hits,
-                "head_to_head_hit_rate": (
-                    h2h_hits / h2h_games if h2h_hits is not None else None
-                ),
-                "head_to_head_average": h2h_avg,
-                "hot_streak": hot_streak,
-            }
-
-            # Append the dictionary to bulk_data
-            player_props.append(player_prop_data)
+        player_ids = {
+            description: NBAStatsAPIService.get_player_ids(description, source="the_odds_api")
+            for description in descriptions
+        }
 
         return {
-            "player_props": player_props,
-            "player_props_odds": player_props_odds_list,
+            "event_team_ids": {
+                event_id: (home_team_id, away_team_id)
+                for event_id, home_team_id, away_team_id in events
+            },
+            "player_ids": player_ids,
+            "player_team_ids": NBAStatsAPIService.get_player_team_ids(
+                [ids[0] for ids in player_ids.values() if len(ids) == 1]
+            ),
         }
 
     @staticmethod
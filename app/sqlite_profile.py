@@ -0,0 +1,75 @@
+# sqlite_profile.py
+
+from sqlalchemy import event
+
+
+class SQLiteProfile:
+    """
+    Class applying a performance profile of pragmas to every new connection of a SQLite engine.
+
+    WAL journal mode lets page requests keep reading while an ingestion job writes, and with
+    synchronous=NORMAL a commit no longer waits on an fsync. Reads of large tables are served from a
+    memory map and a larger page cache, and temporary tables / sort buffers are kept in memory.
+    Writers that find the db locked wait up to BUSY_TIMEOUT instead of failing right away.
+
+    Methods:
+        configure
+        register
+        _set_pragmas
+    """
+
+    JOURNAL_MODE = "WAL"
+    SYNCHRONOUS = "NORMAL"
+    MMAP_SIZE = 256 * 2**20
+    # Negative sizes are in KiB, i.e. 64 MiB
+    CACHE_SIZE = -64 * 2**10
+    TEMP_STORE = "MEMORY"
+    BUSY_TIMEOUT = 5000
+
+    @classmethod
+    def configure(cls, **settings) -> None:
+        """
+        Overrides profile settings, e.g. configure(MMAP_SIZE=0, SYNCHRONOUS="FULL").
+
+        Args:
+            settings - class attribute names and their new values
+        """
+        for name, value in settings.items():
+            if not hasattr(cls, name):
+                raise AttributeError(f"Unknown SQLiteProfile setting {name}")
+
+            setattr(cls, name, value)
+
+    @classmethod
+    def register(cls, engine) -> None:
+        """
+        Applies the profile to every connection the engine opens from now on. Engines of other
+        backends are left as they are.
+
+        Args:
+            engine (sqlalchemy.Engine) - engine of the app's db
+
+        Returns:
+            None
+        """
+        if engine.dialect.name != "sqlite":
+            return
+
+        if not event.contains(engine, "connect", cls._set_pragmas):
+            event.listen(engine, "connect", cls._set_pragmas)
+
+    @classmethod
+    def _set_pragmas(cls, dbapi_connection, connection_record) -> None:
+        """Helper method to set the pragmas of a new DBAPI connection."""
+        cursor = dbapi_connection.cursor()
+
+        try:
+            # journal_mode is persistent, the other pragmas only last for the connection
+            cursor.execute(f"PRAGMA journal_mode={cls.JOURNAL_MODE}")
+            cursor.execute(f"PRAGMA synchronous={cls.SYNCHRONOUS}")
+            cursor.execute(f"PRAGMA mmap_size={int(cls.MMAP_SIZE)}")
+            cursor.execute(f"PRAGMA cache_size={int(cls.CACHE_SIZE)}")
+            cursor.execute(f"PRAGMA temp_store={cls.TEMP_STORE}")
+            cursor.execute(f"PRAGMA busy_timeout={int(cls.BUSY_TIMEOUT)}")
+        finally:
+            cursor.close()
@@ -0,0 +1,95 @@
+# conftest.py
+
+"""
+Tests run against SQLite with PRAGMA foreign_keys=ON, and against PostgreSQL on both its COPY and
+executemany paths when TEST_DATABASE_URL is set, e.g.
+TEST_DATABASE_URL=postgresql+psycopg://postgres@localhost/nba_test. Every table is dropped before and
+after each test.
+"""
+
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app
+from app.config import Config
+from app.extensions import db
+from app.services.bulk_writer import BulkWriter
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# (backend, COPY path)
+BACKENDS = [("sqlite", False)]
+
+if TEST_DATABASE_URL:
+    BACKENDS += [("postgresql", True), ("postgresql", False)]
+
+
+def _enforce_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+@pytest.fixture(params=BACKENDS, ids=lambda backend: f"{backend[0]}{'-copy' if backend[1] else ''}")
+def app(request, tmp_path, monkeypatch):
+    backend, copy = request.param
+
+    class TestConfig(Config):
+        SQLALCHEMY_DATABASE_URI = (
+            f"sqlite:///{tmp_path / 'data.db'}" if backend == "sqlite" else TEST_DATABASE_URL
+        )
+        BOX_SCORES_SNAPSHOT_ENABLED = False
+        HTTP_CACHE_ENABLED = False
+
+    # Every write takes the COPY path, or none does
+    monkeypatch.setattr(BulkWriter, "COPY_MIN_ROWS", 1 if copy else 10**9)
+
+    copies = []
+    copy_rows = BulkWriter._copy_rows
+    monkeypatch.setattr(
+        BulkWriter,
+        "_copy_rows",
+        staticmethod(lambda table, columns, rows: copies.append(table.name) or copy_rows(table, columns, rows)),
+    )
+
+    app = create_app(TestConfig)
+    app.copies = copies
+
+    with app.app_context():
+        if backend == "sqlite":
+            event.listen(db.engine, "connect", _enforce_foreign_keys)
+
+        db.drop_all()
+
+        yield app
+
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+
+
+
+
+@pytest.fixture
+def box_score():
+    """Returns a function building a PlayerBoxScoreTraditional row, with stats overridable by keyword."""
+    def build(player_id: int, team_id: int, game_id: str, period: int, **stats) -> dict:
+        row = dict(
+            season_year="2024-25", season_type="Regular Season", playoff_round=None, player_id=player_id,
+            team_id=team_id, opponent_team_id=1610612737 + 1610612738 - team_id, game_id=game_id,
+            game_date=date(2024, 11, 1), away_game=False, win_loss="W", period=period, minutes_played=30.0,
+            field_goals_made=8, field_goals_attempted=16, field_goal_percentage=0.5,
+            three_point_field_goals_made=2, three_point_field_goals_attempted=6,
+            three_point_field_goal_percentage=0.333, free_throws_made=4, free_throws_attempted=5,
+            free_throw_percentage=0.8, offensive_rebounds=1, defensive_rebounds=5, rebounds=6, assists=4,
+            steals=1, blocks=0, block_attempts=0, turnovers=2, personal_fouls=2, personal_fouls_drawn=3,
+            points=20, plus_minus=5, nba_fantasy_points=40.5,
+        )
+        row.update(stats)
+
+        return row
+
+    return build
@@ -0,0 +1,72 @@
+# test_box_scores_snapshot.py
+
+from app.extensions import db
+from app.models.nba_models import DataVersion, Player, PlayerBoxScoreTraditional
+from app.services.bulk_writer import BulkWriter
+from app.services.nba_stats_api_service import NBAStatsAPIService
+
+PLAYER_TEAMS = [(1, 1610612737), (2, 1610612738)]
+
+
+def _box_scores(box_score, rebounds_change: int = 0) -> list[dict]:
+    return [
+        box_score(player_id, team_id, f"00224000{game}", period, rebounds=game + period + rebounds_change)
+        for player_id, team_id in PLAYER_TEAMS
+        for game in range(10, 13)
+        for period in range(5)
+    ]
+
+
+def _load_box_scores(box_score) -> None:
+    NBAStatsAPIService.load_teams()
+    Player.__table__.create(db.engine, checkfirst=True)
+    PlayerBoxScoreTraditional.__table__.create(db.engine, checkfirst=True)
+    DataVersion.__table__.create(db.engine, checkfirst=True)
+
+    BulkWriter.insert(Player, [
+        dict(id=player_id, first_name="F", last_name=f"L{player_id}", full_name=f"F L{player_id}",
+             team_id=team_id, on_roster=True)
+        for player_id, team_id in PLAYER_TEAMS
+    ])
+    NBAStatsAPIService._upsert_player_box_scores("Base", _box_scores(box_score))
+    db.session.commit()
+
+
+def _correct_rebounds(box_score, player_id: int, change: int) -> list:
+    upserted = NBAStatsAPIService._upsert_player_box_scores(
+        "Base",
+        [row for row in _box_scores(box_score, change) if row["player_id"] == player_id],
+    )
+    db.session.commit()
+
+    return upserted
+
+
+def test_stat_corrections_change_the_fingerprint(app, box_score):
+    _load_box_scores(box_score)
+    fingerprint = NBAStatsAPIService._get_box_scores_fingerprint()
+
+    # Refetching unchanged rows keeps the fingerprint
+    assert _correct_rebounds(box_score, 1, 0) == []
+    assert NBAStatsAPIService._get_box_scores_fingerprint() == fingerprint
+
+    assert len(_correct_rebounds(box_score, 1, 5)) == 15
+    assert NBAStatsAPIService._get_box_scores_fingerprint() != fingerprint
+
+
+def test_snapshot_is_rebuilt_after_stat_corrections(app, box_score, tmp_path):
+    app.config["BOX_SCORES_SNAPSHOT_ENABLED"] = True
+    app.config["BOX_SCORES_SNAPSHOT_DIR"] = str(tmp_path / "snapshots")
+    _load_box_scores(box_score)
+
+    NBAStatsAPIService.initialize_box_scores_df()
+    NBAStatsAPIService.initialize_box_scores_df()
+
+    assert NBAStatsAPIService.box_scores_load_stats["source"] == "snapshot"
+    rebounds = NBAStatsAPIService.get_player_box_scores(1)["rebounds"].sum()
+
+    _correct_rebounds(box_score, 1, 5)
+    NBAStatsAPIService.initialize_box_scores_df()
+
+    assert NBAStatsAPIService.box_scores_load_stats["source"] == "db"
+    assert NBAStatsAPIService.get_player_box_scores(1)["rebounds"].sum() == rebounds + 5 * 15
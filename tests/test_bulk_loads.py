@@ -0,0 +1,353 @@
+# test_bulk_loads.py
+
+"""
+Loads teams, players, events, props and box scores through BulkWriter into a db enforcing foreign keys.
+"""
+
+import json
+from unittest import mock
+
+import pytest
+import requests
+
+from app.api_clients.http_transport import HTTPTransport
+from app.api_clients.nba_stats_api_client import NBAStatsAPIClient
+from app.api_clients.the_odds_api_client import TheOddsAPIClient
+from app.extensions import db
+from app.models.nba_models import Player, PlayerBoxScoreTraditional, Team
+from app.models.odds_api_models import (
+    MoneylineOdds,
+    PlayerProp,
+    PlayerPropOdds,
+    TheOddsAPIEvent,
+    TotalPointsOdds,
+)
+from app.services.bulk_writer import BulkWriter
+from app.services.nba_stats_api_service import NBAStatsAPIService
+from app.services.the_odds_api_service import TheOddsAPIService
+
+# (player id, first name, last name, team id): two Hawks, two Celtics
+PLAYERS = [
+    (1, "Trae", "Young", 1610612737),
+    (2, "Dyson", "Daniels", 1610612737),
+    (3, "Jayson", "Tatum", 1610612738),
+    (4, "Jaylen", "Brown", 1610612738),
+]
+
+PLAYER_HEADERS = [
+    "PERSON_ID", "PLAYER_LAST_NAME", "PLAYER_FIRST_NAME", "TEAM_ID", "JERSEY_NUMBER", "POSITION",
+    "HEIGHT", "WEIGHT", "COLLEGE", "COUNTRY", "DRAFT_YEAR", "DRAFT_ROUND", "DRAFT_NUMBER", "ROSTER_STATUS",
+]
+
+
+@pytest.fixture
+def feeds(monkeypatch):
+    """Fakes The Odds API and stats.nba.com responses, returning the feeds to edit between loads."""
+    feeds = {
+        "players": [
+            [player_id, last_name, first_name, team_id, "0", "G", "6-1", "180", None, "USA", 2018, 1, 5, 1]
+            for player_id, first_name, last_name, team_id in PLAYERS
+        ],
+        "events": [_event("ev1", "Atlanta Hawks", "Boston Celtics", -150), _event("ev2", "Boston Celtics", "Atlanta Hawks", 120)],
+        "player_props": [_player_props("ev1", 20.5), _player_props("ev2", 22.5)],
+    }
+
+    monkeypatch.setattr(
+        NBAStatsAPIClient,
+        "get_players",
+        staticmethod(lambda: {"resultSets": [{"headers": PLAYER_HEADERS, "rowSet": feeds["players"]}]}),
+    )
+    monkeypatch.setattr(TheOddsAPIClient, "get_events", staticmethod(lambda api_key: feeds["events"]))
+    monkeypatch.setattr(
+        TheOddsAPIClient,
+        "get_player_props",
+        staticmethod(
+            lambda api_key, region, event_ids, max_workers=None: [
+                player_props for player_props in feeds["player_props"] if player_props["id"] in event_ids
+            ]
+        ),
+    )
+    monkeypatch.setattr(
+        NBAStatsAPIService,
+        "compute_prop_stats_ladder",
+        classmethod(lambda cls, player_id, market, lines, opponent_team_id: [{"Over": {"season_games": 10}} for _ in lines]),
+    )
+
+    return feeds
+
+
+def _event(event_id: str, home_team: str, away_team: str, home_team_odds: int) -> dict:
+    return {
+        "id": event_id,
+        "commence_time": "2025-01-01T00:30:00Z",
+        "home_team": home_team,
+        "away_team": away_team,
+        "bookmakers": [
+            {
+                "key": "draftkings",
+                "markets": [
+                    {
+                        "key": "h2h",
+                        "outcomes": [
+                            {"name": home_team, "price": home_team_odds},
+                            {"name": away_team, "price": -home_team_odds},
+                        ],
+                    },
+                    {
+                        "key": "totals",
+                        "outcomes": [
+                            {"name": "Over", "price": -110, "point": 230.5},
+                            {"name": "Under", "price": -110, "point": 230.5},
+                        ],
+                    },
+                ],
+            }
+        ],
+    }
+
+
+def _player_props(event_id: str, line: float) -> dict:
+    return {
+        "id": event_id,
+        "bookmakers": [
+            {
+                "key": "prizepicks",
+                "markets": [
+                    {
+                        "key": "player_points",
+                        "outcomes": [
+                            {"name": outcome, "description": f"{first_name} {last_name}", "point": line, "price": -137}
+                            for _, first_name, last_name, _ in PLAYERS
+                            for outcome in ["Over", "Under"]
+                        ],
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def test_loaders_keep_foreign_keys(app, feeds):
+    if db.engine.dialect.name == "sqlite":
+        assert db.session.execute(db.text("PRAGMA foreign_keys")).scalar() == 1
+
+    NBAStatsAPIService.load_teams()
+    NBAStatsAPIService.load_players()
+    TheOddsAPIService.load_bookmakers()
+    TheOddsAPIService.load_events_and_odds("key")
+    TheOddsAPIService.load_player_props_and_odds("key")
+
+    assert Team.query.count() == 30
+    assert Player.query.count() == 4
+    assert TheOddsAPIEvent.query.count() == 2
+    assert MoneylineOdds.query.count() == 2
+    assert TotalPointsOdds.query.count() == 2
+    assert PlayerProp.query.count() == 8
+    assert PlayerPropOdds.query.count() == 16
+
+    # Referenced rows are upserted in place
+    feeds["players"][0][3] = 1610612738
+    NBAStatsAPIService.load_teams()
+    NBAStatsAPIService.load_players()
+    TheOddsAPIService.load_bookmakers()
+
+    assert db.session.get(Player, 1).team_id == 1610612738
+
+    # ev2 left the feed and ev1's odds moved: ev1's props stay, ev2's go with it
+    ev1_prop_ids = {prop.id for prop in PlayerProp.query.filter_by(event_id="ev1")}
+    feeds["events"] = [_event("ev1", "Atlanta Hawks", "Boston Celtics", -170)]
+    TheOddsAPIService.load_events_and_odds("key")
+
+    assert [event.id for event in TheOddsAPIEvent.query] == ["ev1"]
+    assert [odds.home_team_odds for odds in MoneylineOdds.query] == [-170]
+    assert {prop.id for prop in PlayerProp.query} == ev1_prop_ids
+    assert PlayerPropOdds.query.count() == 8
+
+    TheOddsAPIService.load_player_props_and_odds("key")
+
+    assert PlayerProp.query.count() == 4
+    assert PlayerPropOdds.query.count() == 8
+
+    if db.engine.dialect.name == "postgresql" and BulkWriter.COPY_MIN_ROWS == 1:
+        assert {"team_staging", "player_staging", "player_prop", "player_prop_odds"} <= set(app.copies)
+    else:
+        assert app.copies == []
+
+
+def test_box_score_upserts(app, feeds, box_score):
+    NBAStatsAPIService.load_teams()
+    NBAStatsAPIService.load_players()
+    PlayerBoxScoreTraditional.__table__.create(db.engine, checkfirst=True)
+
+    rows = [
+        box_score(player_id, PLAYERS[player_id - 1][3], game_id, period, points=20)
+        for player_id in [1, 3]
+        for game_id in ["0022400001", "0022400002"]
+        for period in range(5)
+    ]
+
+    assert len(BulkWriter.upsert(PlayerBoxScoreTraditional, rows)) == 20
+
+    # Unchanged rows aren't rewritten
+    assert BulkWriter.upsert(PlayerBoxScoreTraditional, rows) == []
+
+    # Of rows sharing a natural key, the last one is written
+    changed = [
+        box_score(3, 1610612738, "0022400002", 0, points=25),
+        box_score(3, 1610612738, "0022400002", 0, points=31),
+    ]
+
+    assert BulkWriter.upsert(PlayerBoxScoreTraditional, changed) == [(3, "0022400002", "Regular Season", 0)]
+
+    # The same game under another season type is another row
+    ist = [box_score(3, 1610612738, "0022400002", 0, season_type="IST", points=31)]
+
+    assert BulkWriter.upsert(PlayerBoxScoreTraditional, ist) == [(3, "0022400002", "IST", 0)]
+    assert BulkWriter.upsert(PlayerBoxScoreTraditional, changed[1:] + ist) == []
+    db.session.commit()
+
+    assert PlayerBoxScoreTraditional.query.count() == 21
+    assert [
+        box_score.points
+        for box_score in PlayerBoxScoreTraditional.query.filter_by(player_id=3, game_id="0022400002", period=0)
+    ] == [31, 31]
+
+    if db.engine.dialect.name == "postgresql" and BulkWriter.COPY_MIN_ROWS == 1:
+        assert "player_box_score_traditional_staging" in app.copies
+    else:
+        assert app.copies == []
+
+
+def test_migrate_box_scores_redefines_natural_keys(app, feeds, box_score):
+    NBAStatsAPIService.load_teams()
+    NBAStatsAPIService.load_players()
+
+    # Table as created before season_type was part of the natural key
+    table = PlayerBoxScoreTraditional.__table__
+    table.create(db.engine)
+
+    for index in table.indexes:
+        if index.unique:
+            index.drop(db.engine)
+
+    with db.engine.begin() as connection:
+        connection.execute(db.text(
+            "CREATE UNIQUE INDEX uq_player_box_score_traditional_player_game_period "
+            "ON player_box_score_traditional (player_id, game_id, period)"
+        ))
+
+    BulkWriter.insert(PlayerBoxScoreTraditional, [box_score(1, 1610612737, "0022400001", 0)])
+    db.session.commit()
+
+    NBAStatsAPIService.migrate_box_scores()
+    NBAStatsAPIService.migrate_box_scores()
+
+    index_names = {index["name"] for index in db.inspect(db.engine).get_indexes(table.name)}
+
+    assert "uq_player_box_score_traditional_player_game_type_period" in index_names
+    assert "uq_player_box_score_traditional_player_game_period" not in index_names
+
+    ist = [box_score(1, 1610612737, "0022400001", 0, season_type="IST")]
+
+    assert BulkWriter.upsert(PlayerBoxScoreTraditional, ist) == [(1, "0022400001", "IST", 0)]
+
+
+def test_migrate_player_props_adds_outcome(app, feeds):
+    NBAStatsAPIService.load_teams()
+    NBAStatsAPIService.load_players()
+    TheOddsAPIService.load_bookmakers()
+    TheOddsAPIService.load_events_and_odds("key")
+
+    # player_prop as created before props had an outcome
+    PlayerPropOdds.__table__.drop(db.engine)
+    PlayerProp.__table__.drop(db.engine)
+    db.Table(
+        PlayerProp.__tablename__,
+        db.MetaData(),
+        *(
+            db.Column(column.name, column.type, primary_key=column.primary_key, nullable=column.nullable)
+            for column in PlayerProp.__table__.columns
+            if column.name != "outcome"
+        ),
+    ).create(db.engine)
+
+    TheOddsAPIService.migrate_player_props()
+    TheOddsAPIService.migrate_player_props()
+
+    BulkWriter.insert(PlayerProp, [
+        dict(id="prop1", event_id="ev1", player_id=1, opponent_team_id=1610612738, market="1H Points",
+             outcome="Over", line=10.5, alternate=False),
+    ])
+    db.session.commit()
+
+    assert db.session.get(PlayerProp, "prop1").outcome == "Over"
+
+
+def test_team_box_score_updates_follow_changed_games(app, feeds, box_score, monkeypatch):
+    NBAStatsAPIService.load_teams()
+    db.create_all()
+
+    team_box_score = box_score(0, 1610612737, "0022400001", 0)
+    del team_box_score["player_id"], team_box_score["nba_fantasy_points"]
+    fetched = []
+
+    monkeypatch.setattr(NBAStatsAPIService, "_get_box_score_groups", classmethod(lambda cls: [("Regular Season", 0, None)]))
+    monkeypatch.setattr(NBAStatsAPIClient, "get_team_box_scores", staticmethod(lambda *job: fetched.append(job[0])))
+    monkeypatch.setattr(
+        NBAStatsAPIService,
+        "_parse_team_box_scores",
+        classmethod(lambda cls, box_scores, measure_type, *group: [team_box_score] if measure_type == "Base" else []),
+    )
+
+    NBAStatsAPIService.update_team_box_scores()
+
+    assert sorted(fetched) == ["Advanced", "Base", "Misc", "Scoring"]
+
+    # The refetched game is unchanged, so its other measure types aren't refetched
+    fetched.clear()
+    NBAStatsAPIService.update_team_box_scores()
+
+    assert fetched == ["Base"]
+
+
+def test_cut_off_box_score_streams_roll_back(app, feeds, box_score, monkeypatch):
+    NBAStatsAPIService.load_teams()
+    NBAStatsAPIService.load_players()
+    app.config["NBA_STATS_API_REQUESTS_PER_SECOND"] = 0
+
+    def get(url, params=None, headers=None, stream=False):
+        rows = [[player_id, f"00224000{game}"] for player_id in [1, 3] for game in range(10, 13)]
+        body = json.dumps({"resultSets": [{"headers": ["PLAYER_ID", "GAME_ID"], "rowSet": rows}]}).encode()
+        chunks = [body[start:start + 16] for start in range(0, len(body), 16)]
+
+        def iter_content(chunk_size):
+            # Last season's full game stream is cut off by the server, its first quarter one just ends
+            if params["Season"] == "2023-24" and params["Period"] == 0:
+                yield from chunks[:6]
+                raise requests.exceptions.ChunkedEncodingError("connection broken")
+
+            yield from chunks[:6] if params["Season"] == "2023-24" else chunks
+
+        return mock.Mock(status_code=200, headers={}, iter_content=iter_content)
+
+    monkeypatch.setattr(HTTPTransport, "get", staticmethod(get))
+    monkeypatch.setattr(NBAStatsAPIService, "BOX_SCORES_STREAM_CHUNK_SIZE", 1)
+    monkeypatch.setattr(NBAStatsAPIService, "_get_box_score_groups", classmethod(lambda cls: [("Regular Season", 0, None), ("Regular Season", 1, None)]))
+    monkeypatch.setattr(
+        NBAStatsAPIService,
+        "_parse_player_box_scores",
+        classmethod(
+            lambda cls, box_scores, measure_type, season, season_type, period, playoff_round: [
+                box_score(player_id, PLAYERS[player_id - 1][3], game_id, period, season_year=season)
+                for player_id, game_id in box_scores["resultSets"][0]["rowSet"]
+            ]
+        ),
+    )
+
+    NBAStatsAPIService.load_player_box_scores()
+
+    # The rows saved before each stream was cut off are rolled back
+    assert {
+        (box_score.season_year, box_score.period) for box_score in PlayerBoxScoreTraditional.query
+    } == {("2024-25", 0), ("2024-25", 1)}
+    assert PlayerBoxScoreTraditional.query.count() == 12
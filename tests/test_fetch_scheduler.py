@@ -0,0 +1,73 @@
+# test_fetch_scheduler.py
+
+import threading
+import time
+
+import pytest
+
+from app.api_clients.fetch_scheduler import FetchScheduler
+
+
+def _fetch_after(seconds: float, fetched: list):
+    def fetch(job_id):
+        time.sleep(seconds)
+        fetched.append(job_id)
+
+        if job_id == 0:
+            raise RuntimeError("bad response")
+
+        return job_id
+
+    return fetch
+
+
+def test_failed_fetch_cancels_pending_jobs():
+    fetched = []
+    scheduler = FetchScheduler(max_workers=2, requests_per_second=0)
+
+    start = time.monotonic()
+
+    with pytest.raises(RuntimeError):
+        for _ in scheduler.run(_fetch_after(0.05, fetched), [(job_id,) for job_id in range(100)]):
+            pass
+
+    # Only the jobs already running were fetched, and they weren't waited for
+    assert time.monotonic() - start < 1
+    time.sleep(0.2)
+    assert len(fetched) <= 4
+
+
+def test_early_close_cancels_pending_jobs():
+    fetched = []
+    scheduler = FetchScheduler(max_workers=2, requests_per_second=0)
+
+    results = scheduler.run(_fetch_after(0.05, fetched), [(job_id,) for job_id in range(1, 101)])
+    next(results)
+    results.close()
+
+    time.sleep(0.2)
+    assert len(fetched) <= 4
+    assert threading.active_count() < 10
+
+
+def test_streamed_results_hold_request_slots():
+    lock = threading.Lock()
+    open_results = {"now": 0, "max": 0}
+
+    def fetch(job_id):
+        with lock:
+            open_results["now"] += 1
+            open_results["max"] = max(open_results["max"], open_results["now"])
+
+        return job_id
+
+    scheduler = FetchScheduler(max_workers=3, requests_per_second=0)
+
+    for _ in scheduler.run(fetch, [(job_id,) for job_id in range(20)], streamed=True):
+        # The caller reads the response slower than it arrives, then closes it
+        time.sleep(0.01)
+
+        with lock:
+            open_results["now"] -= 1
+
+    assert open_results["max"] <= 3
@@ -0,0 +1,83 @@
+# test_player_name_resolver.py
+
+import pytest
+
+from app.services.player_name_resolver import PlayerNameResolver
+
+PLAYERS = [
+    (1, "Nicolas Claxton"),
+    (2, "Alperen Şengün"),
+    (3, "P.J. Tucker"),
+    (4, "Jaylen Brown"),
+    (5, "Shai Gilgeous-Alexander"),
+    (6, "Marcus Morris Sr."),
+    (7, "Brandon Williams"),
+    (8, "Brandon Williams"),
+    (9, "Karl-Anthony Towns"),
+    (10, "Nikola Jokić"),
+]
+
+
+@pytest.fixture
+def resolver():
+    return PlayerNameResolver(PLAYERS)
+
+
+@pytest.mark.parametrize(
+    "player_name, player_ids",
+    [
+        ("Nic Claxton", [1]),
+        ("Alperen Sengun", [2]),
+        ("P.J. Tucker Jr.", [3]),
+        ("PJ Tucker", [3]),
+        ("shai gilgeous alexander", [5]),
+        ("Marcus Morris", [6]),
+        ("Nikola Jokic", [10]),
+    ],
+)
+def test_normalized_names_match(resolver, player_name, player_ids):
+    assert resolver.resolve(player_name) == player_ids
+
+
+def test_ambiguous_full_names_match_every_player(resolver):
+    assert resolver.resolve("Brandon Williams") == [7, 8]
+
+
+@pytest.mark.parametrize(
+    "player_name, player_ids",
+    [
+        ("Karl Anthony Town", [9]),
+        ("Shai Gilgeous-Alexandre", [5]),
+        ("Jalen Brown", [4]),
+    ],
+)
+def test_misspelled_names_match_the_closest_name(resolver, player_name, player_ids):
+    assert resolver.resolve(player_name) == player_ids
+
+
+def test_names_without_shared_trigrams_match_the_closest_name():
+    assert PlayerNameResolver([(1, "Al Horford"), (2, "Bol Bol")]).resolve("Xq") == [2]
+    assert PlayerNameResolver([]).resolve("Jaylen Brown") == []
+
+
+def test_resolutions_are_memoized_per_source(resolver, monkeypatch):
+    find_closest = resolver._find_closest
+    searched = []
+
+    def count_searches(name):
+        searched.append(name)
+        return find_closest(name)
+
+    monkeypatch.setattr(resolver, "_find_closest", count_searches)
+
+    assert resolver.resolve("Jalen Brown", "prizepicks") == [4]
+    assert resolver.resolve("Jalen Brown", "prizepicks") == [4]
+    assert searched == ["jalen brown"]
+
+    assert resolver.resolve("Jalen Brown", "draftkings") == [4]
+    assert searched == ["jalen brown"] * 2
+
+    # Callers get their own copy of the memoized ids
+    resolver.resolve("Brandon Williams", "prizepicks").clear()
+
+    assert resolver.resolve("Brandon Williams", "prizepicks") == [7, 8]
@@ -0,0 +1,178 @@
+# test_prop_stats.py
+
+from datetime import date
+
+from app.extensions import db
+from app.models.nba_models import DataVersion, Player, PlayerBoxScoreTraditional
+from app.services.bulk_writer import BulkWriter
+from app.services.nba_stats_api_service import NBAStatsAPIService
+
+HAWKS, CELTICS, KNICKS = 1610612737, 1610612738, 1610612752
+
+
+def _load_box_scores(rows: list[dict]) -> None:
+    NBAStatsAPIService.load_teams()
+    Player.__table__.create(db.engine, checkfirst=True)
+    PlayerBoxScoreTraditional.__table__.create(db.engine, checkfirst=True)
+    DataVersion.__table__.create(db.engine, checkfirst=True)
+
+    BulkWriter.insert(Player, [
+        dict(id=player_id, first_name="F", last_name=f"L{player_id}", full_name=f"F L{player_id}",
+             team_id=HAWKS, on_roster=True)
+        for player_id in {row["player_id"] for row in rows}
+    ])
+    NBAStatsAPIService._upsert_player_box_scores("Base", rows)
+    db.session.commit()
+
+    NBAStatsAPIService.initialize_box_scores_df()
+
+
+def _game(box_score, player_id: int, game: int, points: int, period: int = 0, **stats) -> dict:
+    """Box score of the player's game-th game, dated so a higher game is more recent."""
+    return box_score(
+        player_id, HAWKS, f"00224{game:05d}", period, game_date=date(2024, 11, game), points=points, **stats
+    )
+
+
+def _box_scores(box_score) -> list[dict]:
+    """
+    Player 1 has 12 games, the first 3 of them last season and 4 of them against the Knicks.
+    Player 2 has 3 games, with first and second quarter box scores but the last game's second quarter.
+    """
+    rows = [
+        _game(
+            box_score, 1, game, points,
+            season_year="2023-24" if game <= 3 else "2024-25",
+            opponent_team_id=KNICKS if game in [2, 5, 9, 12] else CELTICS,
+        )
+        for game, points in enumerate([12, 25, 18, 30, 22, 15, 25, 28, 19, 33, 25, 27], 1)
+    ]
+
+    for game, quarters in enumerate([(5, 7), (8, 4), (6,)], 1):
+        rows.append(_game(box_score, 2, game, 20))
+        rows.extend(
+            _game(box_score, 2, game, points, period=period)
+            for period, points in enumerate(quarters, 1)
+        )
+
+    return rows
+
+
+def test_games_under_two_season_types_count_once(app, box_score):
+    rows = [_game(box_score, 1, game, points) for game, points in enumerate([10, 20, 30, 40, 50], 1)]
+
+    # Game 5 was an IST group game, so it is stored as an IST and as a Regular Season game
+    rows.append(_game(box_score, 1, 5, 50, season_type="IST"))
+    _load_box_scores(rows)
+
+    assert len(NBAStatsAPIService.get_player_box_scores(1, period=0)) == 6
+
+    prop_stats = NBAStatsAPIService.compute_prop_stats(1, "player_points", 25.5, CELTICS)["Over"]
+
+    assert prop_stats["season_games"] == 5
+    assert prop_stats["head_to_head_matchups"] == 5
+    assert prop_stats["last_five_games_hits"] == 3
+    assert prop_stats["last_five_games_average"] == 30
+    assert prop_stats["hot_streak"] == 3
+
+
+def test_prop_stats_windows(app, box_score):
+    _load_box_scores(_box_scores(box_score))
+
+    # Most recent first: 27, 25, 33, 19, 28, 25, 15, 22, 30 this season, then 18, 25, 12 last season
+    prop_stats = NBAStatsAPIService.compute_prop_stats(1, "player_points", 25, KNICKS)
+
+    # A total at the line is a push, neither an Over nor an Under hit
+    assert prop_stats["Over"]["last_five_games_hits"] == 3
+    assert prop_stats["Under"]["last_five_games_hits"] == 1
+    assert prop_stats["Over"]["last_five_games_hit_rate"] == 3 / 5
+    assert prop_stats["Under"]["last_five_games_average"] == 132 / 5
+
+    assert prop_stats["Over"]["last_ten_games_hits"] == 4
+    assert prop_stats["Under"]["last_ten_games_hits"] == 4
+    assert prop_stats["Over"]["last_ten_games_average"] == 242 / 10
+
+    assert prop_stats["Over"]["last_twenty_games_hits"] is None
+    assert prop_stats["Under"]["last_thirty_games_average"] is None
+
+    assert prop_stats["Over"]["season_games"] == 9
+    assert prop_stats["Over"]["season_hits"] == 4
+    assert prop_stats["Under"]["season_hits"] == 3
+    assert prop_stats["Under"]["season_hit_rate"] == 3 / 9
+    assert prop_stats["Over"]["season_average"] == 224 / 9
+
+    # Knicks games: 27, 19, 22, 25
+    assert prop_stats["Over"]["head_to_head_matchups"] == 4
+    assert prop_stats["Over"]["head_to_head_hits"] == 1
+    assert prop_stats["Under"]["head_to_head_hits"] == 2
+    assert prop_stats["Under"]["head_to_head_average"] == 93 / 4
+
+    assert prop_stats["Over"]["hot_streak"] == 1
+    assert prop_stats["Under"]["hot_streak"] == 0
+
+
+def test_prop_stats_hot_streaks(app, box_score):
+    _load_box_scores(_box_scores(box_score))
+
+    assert NBAStatsAPIService.compute_prop_stats(1, "player_points", 24.5, KNICKS)["Over"]["hot_streak"] == 3
+    assert NBAStatsAPIService.compute_prop_stats(1, "player_points", 33, KNICKS)["Under"]["hot_streak"] == 2
+    assert NBAStatsAPIService.compute_prop_stats(1, "player_points", 34, KNICKS)["Under"]["hot_streak"] == 12
+    assert NBAStatsAPIService.compute_prop_stats(1, "player_points", 34, KNICKS)["Over"]["hot_streak"] == 0
+
+
+def test_prop_stats_of_quarter_and_half_markets(app, box_score):
+    _load_box_scores(_box_scores(box_score))
+
+    # First halves, most recent first: 6 (no second quarter), 12, 12
+    prop_stats = NBAStatsAPIService.compute_prop_stats(2, "1H Points", 10.5, KNICKS)
+
+    assert prop_stats["Over"]["season_games"] == 3
+    assert prop_stats["Over"]["season_hits"] == 2
+    assert prop_stats["Under"]["season_hits"] == 1
+    assert prop_stats["Over"]["season_average"] == 10
+    assert prop_stats["Over"]["hot_streak"] == 0
+    assert prop_stats["Under"]["hot_streak"] == 1
+
+    # Fewer than 5 games and no Knicks games
+    assert prop_stats["Over"]["last_five_games_hits"] is None
+    assert prop_stats["Over"]["last_five_games_hit_rate"] is None
+    assert prop_stats["Over"]["head_to_head_matchups"] == 0
+    assert prop_stats["Under"]["head_to_head_hits"] is None
+
+    # First quarters: 6, 8, 5
+    prop_stats = NBAStatsAPIService.compute_prop_stats(2, "player_points_q1", 5.5, KNICKS)
+
+    assert prop_stats["Over"]["season_hits"] == 2
+    assert prop_stats["Over"]["hot_streak"] == 2
+    assert prop_stats["Under"]["season_average"] == 19 / 3
+
+
+def test_prop_stats_ladder_matches_single_lines(app, box_score):
+    _load_box_scores(_box_scores(box_score))
+
+    lines = [12, 24.5, 25, 25.5, 34]
+    ladder = NBAStatsAPIService.compute_prop_stats_ladder(1, "player_points_alternate", lines, KNICKS)
+
+    assert ladder == [
+        NBAStatsAPIService.compute_prop_stats(1, "player_points", line, KNICKS) for line in lines
+    ]
+    assert ladder[0]["Under"]["season_hits"] == 0
+
+
+def test_calculate_hit_rate_stats(app, box_score):
+    _load_box_scores(_box_scores(box_score))
+    market_stats = [(0, ["points"])]
+
+    assert NBAStatsAPIService.calculate_last_n_games_hit_rate_stats(1, market_stats, 25, 5) == {
+        "hits": 3, "average": 132 / 5,
+    }
+    assert NBAStatsAPIService.calculate_last_n_games_hit_rate_stats(2, market_stats, 25, 5) == {
+        "hits": None, "average": None,
+    }
+    assert NBAStatsAPIService.calculate_h2h_hit_rate_stats(1, market_stats, 25, KNICKS) == {
+        "games": 4, "hits": 1, "average": 93 / 4,
+    }
+    assert NBAStatsAPIService.calculate_season_hit_rate_stats(1, market_stats, 25) == {
+        "games": 9, "hits": 4, "average": 224 / 9,
+    }
+    assert NBAStatsAPIService.calculate_hot_streak(1, market_stats, 24.5) == 3
@@ -0,0 +1,107 @@
+# test_response_cache.py
+
+import gzip
+import json
+from unittest import mock
+
+import pytest
+
+from app.api_clients.http_transport import HTTPTransport
+from app.api_clients.nba_stats_api_client import NBAStatsAPIClient
+from app.api_clients.response_cache import ResponseCache
+
+URL = "https://stats.nba.com/stats/playergamelogs"
+PARAMS = {"Season": "2024-25", "Period": 0}
+
+
+def _body(points: int) -> bytes:
+    return json.dumps({"resultSets": [{"headers": ["PTS"], "rowSet": [[points]]}]}).encode()
+
+
+@pytest.fixture
+def server(monkeypatch, tmp_path):
+    """
+    Fakes stats.nba.com, answering conditional requests with a 304 while the body is unchanged.
+    Returns the server state to edit: the current body, its version and the requests received.
+    """
+    server = {"body": _body(20), "version": 1, "requests": []}
+
+    def get(url, params=None, headers=None, stream=False):
+        server["requests"].append(headers)
+        etag = f'"v{server["version"]}"'
+
+        if headers.get("If-None-Match") == etag:
+            return mock.Mock(status_code=304, headers={"ETag": etag})
+
+        body = server["body"]
+        response = mock.Mock(
+            status_code=200,
+            headers={"ETag": etag, "Last-Modified": f"Fri, 01 Nov 2024 0{server['version']}:00:00 GMT"},
+            content=body,
+            iter_content=lambda chunk_size: (body[start:start + 8] for start in range(0, len(body), 8)),
+        )
+        response.json.return_value = json.loads(body)
+
+        return response
+
+    monkeypatch.setattr(HTTPTransport, "get", staticmethod(get))
+    monkeypatch.setattr(ResponseCache, "ENABLED", True)
+    monkeypatch.setattr(ResponseCache, "DIRECTORY", str(tmp_path / "http_cache"))
+
+    return server
+
+
+def _fetch(ttl: float | None) -> dict:
+    return NBAStatsAPIClient._fetch_data(URL, PARAMS, "Error", ttl)
+
+
+def _stream(ttl: float | None) -> list:
+    chunks = NBAStatsAPIClient._stream_data(URL, PARAMS, "Error", ttl, chunk_size=10)
+
+    return [row for chunk in chunks for row in chunk["resultSets"][0]["rowSet"]]
+
+
+def test_fresh_responses_are_served_from_the_cache(server):
+    assert _fetch(None) == json.loads(_body(20))
+    assert _fetch(None) == json.loads(_body(20))
+    assert len(server["requests"]) == 1
+
+    # Entries are stored gzip compressed
+    body_path, _ = ResponseCache._get_paths(URL, PARAMS)
+
+    with gzip.open(body_path, "rb") as body_file:
+        assert body_file.read() == _body(20)
+
+
+def test_expired_responses_are_revalidated(server):
+    _fetch(0)
+
+    # Unchanged: a 304 serves the cached body
+    assert _fetch(0) == json.loads(_body(20))
+    assert server["requests"][-1]["If-None-Match"] == '"v1"'
+    assert server["requests"][-1]["If-Modified-Since"] == "Fri, 01 Nov 2024 01:00:00 GMT"
+
+    # Changed: a 200 replaces the cached body and its validators
+    server["body"], server["version"] = _body(31), 2
+
+    assert _fetch(0) == json.loads(_body(31))
+    assert ResponseCache.get(URL, PARAMS)["body"] == _body(31)
+    assert ResponseCache.get(URL, PARAMS)["etag"] == '"v2"'
+
+    # A 304 extends the expiry, so the entry is fresh again
+    assert _fetch(3600) == json.loads(_body(31))
+    assert _fetch(3600) == json.loads(_body(31))
+    assert len(server["requests"]) == 4
+
+
+def test_expired_streamed_responses_are_revalidated(server):
+    assert _stream(0) == [[20]]
+
+    assert _stream(0) == [[20]]
+    assert server["requests"][-1]["If-None-Match"] == '"v1"'
+
+    server["body"], server["version"] = _body(31), 2
+
+    assert _stream(0) == [[31]]
+    assert ResponseCache.get(URL, PARAMS)["body"] == _body(31)
+    assert len(server["requests"]) == 3
@@ -0,0 +1,74 @@
+# test_result_set_parser.py
+
+import json
+
+import pytest
+
+from app.api_clients.result_set_parser import ResultSetParser
+
+HEADERS = ["PLAYER_ID", "PLAYER_NAME", "GAME_ID", "PTS", "FG_PCT"]
+
+ROWS = [
+    [1630578, "Alperen Şengün", "0022400001", 21, 0.524],
+    [203999, "Nikola Jokić", "0022400002", 35, None],
+    [1628386, "Jarrett Allen", "0022400003", 8, 0.5],
+    [1630178, "Tyrese Maxey — \"TM\"", "0022400004", 40, 0.611],
+    [1641705, "Victor Wembanyama", "0022400005", -0, 1e-3],
+]
+
+
+def _body(rows: list) -> bytes:
+    return json.dumps(
+        {
+            "resource": "playergamelogs",
+            "parameters": {"MeasureType": "Base", "Season": "2024-25"},
+            "resultSets": [{"name": "PlayerGameLogs", "headers": HEADERS, "rowSet": rows}],
+        },
+        ensure_ascii=False,
+    ).encode()
+
+
+def _split(body: bytes, size: int) -> list[bytes]:
+    return [body[start:start + size] for start in range(0, len(body), size)]
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 10**6])
+def test_values_split_across_chunks(size):
+    body = _body(ROWS)
+
+    # A size of 1 splits every json value and every multi-byte character of the names
+    chunks = list(ResultSetParser(_split(body, size)).iter_chunks(chunk_size=2))
+
+    assert [headers for headers, _ in chunks] == [HEADERS] * 3
+    assert [len(rows) for _, rows in chunks] == [2, 2, 1]
+    assert [row for _, rows in chunks for row in rows] == json.loads(body)["resultSets"][0]["rowSet"]
+
+
+def test_multi_byte_characters_split_mid_character():
+    body = _body(ROWS[:1])
+    start = body.index("Ş".encode())
+
+    # "Ş" is 2 bytes in utf-8; cut between them
+    chunks = [body[:start + 1], body[start + 1:]]
+
+    assert list(ResultSetParser(chunks).iter_chunks(chunk_size=10)) == [(HEADERS, ROWS[:1])]
+
+
+def test_empty_row_set():
+    assert list(ResultSetParser(_split(_body([]), 5)).iter_chunks(chunk_size=10)) == []
+
+
+def test_cut_off_bodies_raise():
+    body = _body(ROWS)
+    row_set_end = body.index(b"]]") + 2
+
+    for cut in range(row_set_end):
+        with pytest.raises(ValueError):
+            list(ResultSetParser(_split(body[:cut], 7)).iter_chunks(chunk_size=2))
+
+
+def test_malformed_rows_raise():
+    body = _body(ROWS).replace(b"0.524", b"0.5.24")
+
+    with pytest.raises(ValueError):
+        list(ResultSetParser([body]).iter_chunks(chunk_size=2))
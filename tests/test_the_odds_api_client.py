@@ -0,0 +1,80 @@
+# test_the_odds_api_client.py
+
+import threading
+from unittest import mock
+
+import pytest
+import requests
+
+from app.api_clients.http_transport import HTTPTransport
+from app.api_clients.the_odds_api_client import TheOddsAPIClient
+
+
+@pytest.fixture
+def odds_api(monkeypatch):
+    """Fakes The Odds API with a quota of credits, each event costing 10, returning the quota to edit."""
+    quota = {"remaining": 35, "used": 0}
+    lock = threading.Lock()
+
+    def get(url, params=None, headers=None, stream=False):
+        with lock:
+            quota["remaining"] -= 10
+            quota["used"] += 10
+
+            response = mock.Mock(
+                status_code=200,
+                headers={
+                    "x-requests-remaining": str(quota["remaining"]),
+                    "x-requests-used": str(quota["used"]),
+                    "x-requests-last": "10",
+                },
+            )
+
+        response.json.return_value = {"id": url.split("/")[-2]}
+        return response
+
+    monkeypatch.setattr(HTTPTransport, "get", staticmethod(get))
+    monkeypatch.setattr(TheOddsAPIClient, "QUOTA_RESERVE", 5)
+    monkeypatch.setattr(
+        TheOddsAPIClient, "_quota", {"remaining": None, "used": None, "last_cost": None, "in_flight": 0}
+    )
+
+    return quota
+
+
+def test_player_props_stop_at_quota_reserve(odds_api):
+    event_ids = [f"ev{i}" for i in range(10)]
+    player_props = TheOddsAPIClient.get_player_props("key", "us_dfs", event_ids, max_workers=1)
+
+    assert [odds["id"] for odds in player_props] == ["ev0", "ev1", "ev2"]
+    assert TheOddsAPIClient.get_quota() == {"remaining": 5, "used": 30}
+
+
+def test_player_props_probe_a_renewed_quota(odds_api):
+    event_ids = [f"ev{i}" for i in range(10)]
+    TheOddsAPIClient.get_player_props("key", "us_dfs", event_ids, max_workers=1)
+
+    # The quota renewed since, which only a response tells
+    odds_api["remaining"] = 45
+    player_props = TheOddsAPIClient.get_player_props("key", "us_dfs", event_ids, max_workers=1)
+
+    assert [odds["id"] for odds in player_props] == ["ev0", "ev1", "ev2", "ev3"]
+    assert TheOddsAPIClient._quota["in_flight"] == 0
+
+
+def test_player_props_drop_failed_events(odds_api, monkeypatch):
+    get = HTTPTransport.get
+
+    def get_or_time_out(url, params=None, headers=None, stream=False):
+        if "/ev1/" in url:
+            raise requests.ConnectionError("read timed out")
+
+        return get(url, params, headers, stream)
+
+    monkeypatch.setattr(HTTPTransport, "get", staticmethod(get_or_time_out))
+    odds_api["remaining"] = 100
+
+    player_props = TheOddsAPIClient.get_player_props("key", "us_dfs", ["ev0", "ev1", "ev2", "ev3"], max_workers=2)
+
+    assert [odds["id"] for odds in player_props] == ["ev0", "ev2", "ev3"]
+    assert TheOddsAPIClient._quota["in_flight"] == 0